@@ -1,25 +1,54 @@
-# Natalia Raz
+# Natalia Raz
 # ShotlistCreator v2.1.14 for DaVinci Resolve Studio
-
-import os
-import json
-import platform
+
+import os
+import argparse
+import bisect
+import concurrent.futures
+import contextlib
+import csv
+import glob
+import hashlib
+import io
+import json
+import multiprocessing
+import platform
+import queue
+import re
+import shutil
+import sqlite3
 import subprocess
 import time
-import webbrowser
 import sys
-import urllib.request
-
-# Windows-only dependencies
-try:
-    import psutil
-    import win32gui
-    import win32process
-    import win32con
-except ImportError:
-    # On macOS, these won't import, so we ignore them
-    pass
-
+import tempfile
+import threading
+
+# Heavy modules that only some stages need (xlsxwriter, Pillow, pynput, the
+# Windows focus helpers, webbrowser) are imported inside the functions that use
+# them, so startup doesn't pay for them. Plain import statements keep them
+# visible to PyInstaller. PySide6 is imported at module level for the dialog
+# and thread classes, except in resize worker processes (see _QtPlaceholder).
+
+# Startup steps and how long they took, reported once the options dialog is up
+STARTUP_STARTED = time.perf_counter()
+STARTUP_TIMINGS = []
+
+
+@contextlib.contextmanager
+def _timed(step):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS.append((step, time.perf_counter() - started))
+
+
+def startup_report():
+    """Time since startup and per step, as one log line."""
+    total = time.perf_counter() - STARTUP_STARTED
+    steps = ", ".join(f"{step} {seconds * 1000:.0f} ms" for step, seconds in STARTUP_TIMINGS)
+    return f"{total * 1000:.0f} ms ({steps})"
+
 def _bootstrap_resolve_scripting():
     """Make DaVinci Resolve scripting module discoverable on macOS/Windows."""
     resolve_script_api = os.environ.get("RESOLVE_SCRIPT_API")
@@ -51,6 +80,52 @@ def _bootstrap_resolve_scripting():
 _bootstrap_resolve_scripting()
 
 
+def _is_worker_process():
+    """True inside resize worker processes, which re-run this module's top level."""
+    return multiprocessing.parent_process() is not None or "--multiprocessing-fork" in sys.argv
+
+
+_resolve_lock = threading.Lock()
+_resolve_app = None
+
+
+def get_resolve():
+    """
+    The Resolve scripting connection, made on first use and shared by everything
+    in the process. None if Resolve is not running, and always None in worker
+    processes, which only resize images. Raises RuntimeError if the scripting
+    module cannot be loaded.
+    """
+    global _resolve_app
+    with _resolve_lock:
+        if _resolve_app is None and not _is_worker_process():
+            with _timed("Resolve connection"):
+                try:
+                    import DaVinciResolveScript as dvr_script
+                except Exception as exc:
+                    raise RuntimeError(
+                        "Could not load DaVinci Resolve scripting API.\n\n"
+                        "Please install DaVinci Resolve Studio and launch it once, then try again."
+                    ) from exc
+                _resolve_app = dvr_script.scriptapp("Resolve")
+        if _resolve_app is not None and _profiler is not None:
+            return _profiler.wrap(_resolve_app)
+        return _resolve_app
+
+
+def _connect_resolve_in_background():
+    # get_resolve() from the main thread waits for this attempt, and tries again if it failed
+    try:
+        get_resolve()
+    except Exception:
+        pass
+
+
+if __name__ == "__main__" and not _is_worker_process():
+    # Connect to Resolve while Qt loads
+    threading.Thread(target=_connect_resolve_in_background, daemon=True).start()
+
+
 def _show_startup_error(message):
     print(message)
     system = platform.system()
@@ -102,90 +177,111 @@ def _request_macos_accessibility_permission(prompt=False):
     return _is_macos_accessibility_trusted()
 
 
-try:
-    import DaVinciResolveScript as dvr_script
-except Exception as exc:
-    _show_startup_error(
-        "Could not load DaVinci Resolve scripting API.\n\n"
-        "Please install DaVinci Resolve Studio and launch it once, then try again."
-    )
-    raise RuntimeError("DaVinciResolveScript import failed.") from exc
-import xlsxwriter
-from PySide6 import QtWidgets, QtCore, QtGui
-from PIL import Image
-from pynput.keyboard import Controller
-
-
-# -----------------------------------------------------------------------------
-# 1) DaVinci Resolve focusing logic, cross-platform
-# -----------------------------------------------------------------------------
-
-def get_resolve_main_window_handle_windows():
-    """
-    Find DaVinci Resolve's main window on Windows by enumerating processes named 'Resolve.exe'.
-    Returns the first top-level visible window handle, or None if not found.
-    """
-    resolve_pid = None
-    for proc in psutil.process_iter(['pid', 'name']):
-        if proc.info['name'] and proc.info['name'].lower() == "resolve.exe":
-            resolve_pid = proc.info['pid']
-            break
-
-    if not resolve_pid:
-        return None
-
-    def enum_windows_callback(hwnd, hwnd_list):
-        if win32gui.IsWindowVisible(hwnd):
-            _, window_pid = win32process.GetWindowThreadProcessId(hwnd)
-            if window_pid == resolve_pid:
-                hwnd_list.append(hwnd)
-        return True
-
-    windows = []
-    win32gui.EnumWindows(enum_windows_callback, windows)
-    return windows[0] if windows else None
-
-
-def focus_on_resolve_windows():
-    """
-    Restore & focus the main Resolve window on Windows.
-    """
-    hwnd = get_resolve_main_window_handle_windows()
-    if hwnd:
-        # Restore if minimized
-        win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-        time.sleep(0.3)
-        # Foreground
-        win32gui.SetForegroundWindow(hwnd)
-    else:
-        print("Could not find a visible DaVinci Resolve window.")
-
-
-def focus_on_timeline():
-    """
-    Cross-platform function to ensure DaVinci Resolve is frontmost
-    before sending keyboard events.
-    """
-    system = platform.system()
-    if system == "Windows":
-        try:
-            focus_on_resolve_windows()
-        except Exception as e:
-            print("Failed to focus DaVinci Resolve on Windows:", e)
-    elif system == "Darwin":
-        # macOS
-        subprocess.run(["osascript", "-e", 'tell application "DaVinci Resolve" to activate'])
-    else:
-        # Linux or others - do nothing or adapt as needed
-        pass
-
-
-# -----------------------------------------------------------------------------
-# 2) Standard I/O routines for saving Excel, subfolders, etc.
-# -----------------------------------------------------------------------------
-
-resolve = dvr_script.scriptapp("Resolve")
-keyboard = Controller()
+class _QtPlaceholder:
+    """
+    Stands in for the PySide6 modules in resize worker processes. Spawned workers
+    re-run this module's top level but only call resize_thumbnail(), so they skip
+    loading Qt; the Qt subclasses below are then defined on plain object.
+    """
+
+    def __getattr__(self, name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __mro_entries__(self, bases):
+        return (object,)
+
+
+if _is_worker_process():
+    QtWidgets = QtCore = QtGui = _QtPlaceholder()
+else:
+    with _timed("PySide6"):
+        from PySide6 import QtWidgets, QtCore, QtGui
+
+
+def preload_export_modules():
+    """Import what the export stages need, e.g. in a thread while the options dialog is open."""
+    import xlsxwriter  # noqa: F401
+    from PIL import Image  # noqa: F401
+    from pynput.keyboard import Controller  # noqa: F401
+
+
+# -----------------------------------------------------------------------------
+# 1) DaVinci Resolve focusing logic, cross-platform
+# -----------------------------------------------------------------------------
+
+def get_resolve_main_window_handle_windows():
+    """
+    Find DaVinci Resolve's main window on Windows by enumerating processes named 'Resolve.exe'.
+    Returns the first top-level visible window handle, or None if not found.
+    """
+    import psutil
+    import win32gui
+    import win32process
+
+    resolve_pid = None
+    for proc in psutil.process_iter(['pid', 'name']):
+        if proc.info['name'] and proc.info['name'].lower() == "resolve.exe":
+            resolve_pid = proc.info['pid']
+            break
+
+    if not resolve_pid:
+        return None
+
+    def enum_windows_callback(hwnd, hwnd_list):
+        if win32gui.IsWindowVisible(hwnd):
+            _, window_pid = win32process.GetWindowThreadProcessId(hwnd)
+            if window_pid == resolve_pid:
+                hwnd_list.append(hwnd)
+        return True
+
+    windows = []
+    win32gui.EnumWindows(enum_windows_callback, windows)
+    return windows[0] if windows else None
+
+
+def focus_on_resolve_windows():
+    """
+    Restore & focus the main Resolve window on Windows.
+    """
+    import win32con
+    import win32gui
+
+    hwnd = get_resolve_main_window_handle_windows()
+    if hwnd:
+        # Restore if minimized
+        win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+        time.sleep(0.3)
+        # Foreground
+        win32gui.SetForegroundWindow(hwnd)
+    else:
+        print("Could not find a visible DaVinci Resolve window.")
+
+
+def focus_on_timeline():
+    """
+    Cross-platform function to ensure DaVinci Resolve is frontmost
+    before sending keyboard events.
+    """
+    system = platform.system()
+    if system == "Windows":
+        try:
+            focus_on_resolve_windows()
+        except Exception as e:
+            print("Failed to focus DaVinci Resolve on Windows:", e)
+    elif system == "Darwin":
+        # macOS
+        subprocess.run(["osascript", "-e", 'tell application "DaVinci Resolve" to activate'])
+    else:
+        # Linux or others - do nothing or adapt as needed
+        pass
+
+
+# -----------------------------------------------------------------------------
+# 2) Standard I/O routines for saving Excel, subfolders, etc.
+# -----------------------------------------------------------------------------
 
 APP_NAME = "ShotlistCreator"
 APP_VERSION = "2.1.14"
@@ -194,11 +290,67 @@ RELEASE_FLAG = True
 APP_TITLE = f"{APP_NAME} v{APP_VERSION}" if RELEASE_FLAG else f"{APP_NAME} v{APP_VERSION} (dev)"
 README_URL = "https://github.com/natlrazfx/Shotlist-Creator#how-it-works"
 SETUP_VIDEO_URL = "https://youtu.be/lGYmBYw0BuA"
-SETUP_THUMBNAIL_URL = "https://img.youtube.com/vi/lGYmBYw0BuA/maxresdefault.jpg"
 SETUP_LOCAL_IMAGE = os.path.join("assets", "next_marker_bind.png")
 SUPPORT_URL = "https://aescripts.com/shotlist-creator-for-davinci-resolve/"
 THUMBNAIL_FIELD = "Still/Thumbnail"
 TIMELINE_PREFIX = "Timeline:"
+DISCOVERY_WORKERS = 4
+DISCOVERY_BATCH_SIZE = 32
+STANDARD_FIELDS = [
+    THUMBNAIL_FIELD,
+    "Frame",
+    "Timecode",
+    "Name",
+    "Note",
+    "Duration",
+    "Color",
+    "Record In",
+    "Record Out",
+    "Source In",
+    "Source Out",
+    "Record Duration",
+    "Source Start Time",
+    "Source End Time",
+    "Track Type",
+    "Track Index",
+]
+# Fields checked in the options dialog until a preset is loaded
+DEFAULT_SELECTED_FIELDS = [
+    THUMBNAIL_FIELD, "Frame", "Timecode", "Name", "Note", "Duration", "Color",
+    "Record In", "Record Out",
+    "Source In", "Source Out", "Record Duration",
+    "Track Type", "Track Index",
+    "Clip Name", "FPS", "File Path", "Video Codec",
+    "Resolution", "Start TC", "End TC"
+]
+TIMELINE_FIELDS = {
+    "Record In",
+    "Record Out",
+    "Record Duration",
+    "Source In",
+    "Source Out",
+    "Source Start Time",
+    "Source End Time",
+    "Track Type",
+    "Track Index",
+}
+FIELD_SECTIONS = ["Standard Fields", "Timeline Fields", "Clip Metadata"]
+METADATA_CACHE_FILENAME = "metadata_cache.sqlite3"
+METADATA_CACHE_MAX_MB = 64
+STILL_EXPORT_BATCH_SIZE = 50
+DEFAULT_THUMBNAIL_OPTIONS = {"format": "png", "quality": 85, "keep_files": True}
+CONSTANT_MEMORY_MIN_ROWS = 1000
+# Column widths in character units, as passed to set_column(). 255 is Excel's limit
+# and the same ceiling worksheet.autofit() uses.
+MAX_COLUMN_WIDTH = 255
+COLUMN_WIDTH_CAPS = {"File Path": 100}
+PIPELINE_QUEUE_SIZE = 8
+# Output formats by file extension, with their Save dialog filter names
+OUTPUT_FORMATS = {".xlsx": "Excel Files", ".csv": "CSV Files", ".jsonl": "JSON Lines"}
+THUMBNAIL_STORE_DIRNAME = "thumbnail_store"
+# Manifests and thumbnails of a replaced export, kept for the next export to reuse
+PREVIOUS_EXPORTS_DIRNAME = "previous_exports"
+THUMBNAIL_STORE_MAX_MB = 2048
 
 
 def _get_config_path():
@@ -246,21 +398,19 @@ def _current_app_path():
     return exe_path
 
 
+def _open_url(url):
+    import webbrowser
+
+    webbrowser.open(url)
+
+
 def _load_setup_thumbnail():
     local_image_path = _resource_path(SETUP_LOCAL_IMAGE)
     if os.path.exists(local_image_path):
         pixmap = QtGui.QPixmap(local_image_path)
         if not pixmap.isNull():
             return pixmap
-
-    try:
-        with urllib.request.urlopen(SETUP_THUMBNAIL_URL, timeout=3) as resp:
-            img_data = resp.read()
-        pixmap = QtGui.QPixmap()
-        if pixmap.loadFromData(img_data):
-            return pixmap
-    except Exception:
-        pass
+    # No download fallback: the dialog must not wait on the network
     return None
 
 
@@ -302,9 +452,10 @@ def _ensure_macos_accessibility_permission():
         msg = QtWidgets.QMessageBox()
         msg.setWindowTitle(APP_TITLE)
         msg.setIcon(QtWidgets.QMessageBox.Warning)
-        msg.setText("Accessibility permission is required.")
+        msg.setText("Accessibility permission is needed for the Next Marker key.")
         msg.setInformativeText(
-            "ShotlistCreator uses keyboard control to jump between markers.\n\n"
+            "Resolve did not accept a direct move to a marker, so ShotlistCreator\n"
+            "falls back to pressing the Next Marker key, which needs this permission.\n\n"
             "Open System Settings -> Privacy & Security -> Accessibility,\n"
             "enable ShotlistCreator, then click Recheck.\n\n"
             f"Current app path:\n{app_path}"
@@ -313,7 +464,7 @@ def _ensure_macos_accessibility_permission():
         open_btn = msg.addButton("Open Settings", QtWidgets.QMessageBox.ActionRole)
         open_apps_btn = msg.addButton("Open Applications Folder", QtWidgets.QMessageBox.ActionRole)
         recheck_btn = msg.addButton("Recheck", QtWidgets.QMessageBox.AcceptRole)
-        exit_btn = msg.addButton("Exit", QtWidgets.QMessageBox.RejectRole)
+        exit_btn = msg.addButton("Stop Export", QtWidgets.QMessageBox.RejectRole)
         msg.setDefaultButton(recheck_btn)
         msg.exec()
 
@@ -348,7 +499,7 @@ def _show_bind_setup_dialog(force=False):
     dialog.resize(980, 760)
 
     layout = QtWidgets.QVBoxLayout(dialog)
-    title = QtWidgets.QLabel("One-time setup required: bind Next Marker to keyboard key 0.")
+    title = QtWidgets.QLabel("Keyboard fallback: bind Next Marker to keyboard key 0.")
     title.setWordWrap(True)
     title.setStyleSheet("font-size: 30px; font-weight: 700;")
     layout.addWidget(title)
@@ -362,7 +513,8 @@ def _show_bind_setup_dialog(force=False):
 
     body = QtWidgets.QLabel(
         "DaVinci Resolve -> Keyboard Customization -> Playback -> Next Marker -> set key 0.\n\n"
-        "ShotlistCreator uses this key to move through timeline markers."
+        "ShotlistCreator moves the playhead onto each marker through the scripting API.\n"
+        "Only when Resolve refuses that does it press this key instead."
     )
     body.setWordWrap(True)
     body.setStyleSheet("font-size: 24px;")
@@ -377,8 +529,8 @@ def _show_bind_setup_dialog(force=False):
     watch_btn = QtWidgets.QPushButton("Watch Tutorial")
     continue_btn = QtWidgets.QPushButton("Continue")
     continue_btn.setDefault(True)
-    read_btn.clicked.connect(lambda: webbrowser.open(README_URL))
-    watch_btn.clicked.connect(lambda: webbrowser.open(SETUP_VIDEO_URL))
+    read_btn.clicked.connect(lambda: _open_url(README_URL))
+    watch_btn.clicked.connect(lambda: _open_url(SETUP_VIDEO_URL))
     continue_btn.clicked.connect(dialog.accept)
     buttons.addWidget(read_btn)
     buttons.addWidget(watch_btn)
@@ -391,6 +543,18 @@ def _show_bind_setup_dialog(force=False):
     _save_settings(settings)
 
 
+def confirm_keyboard_navigation():
+    """
+    Run on the GUI thread before an export first falls back to the Next Marker
+    key: the macOS permission to send keys and the key binding setup. Returns
+    False if keys cannot be sent.
+    """
+    if not _ensure_macos_accessibility_permission():
+        return False
+    _show_bind_setup_dialog()
+    return True
+
+
 def _safe_timeline_item_call(timeline_item, method_name, *args):
     method = getattr(timeline_item, method_name, None)
     if not callable(method):
@@ -439,728 +603,4108 @@ def _collect_timeline_item_metadata(timeline_item):
 
 
 def get_save_file_name(project_name):
-    app = QtWidgets.QApplication.instance()
-    if not app:
-        app = QtWidgets.QApplication([])
-    options = QtWidgets.QFileDialog.Options()
-    default_filename = f"{project_name}_shotlist_v001.xlsx" if project_name else ""
-    file_name, _ = QtWidgets.QFileDialog.getSaveFileName(
-        None,
-        "Save As",
-        default_filename,
-        "Excel Files (*.xlsx);;All Files (*)",
-        options=options,
-    )
-    return file_name
-
-def ask_replace_or_rename(file_or_folder):
-    msgBox = QtWidgets.QMessageBox()
-    msgBox.setIcon(QtWidgets.QMessageBox.Question)
-    msgBox.setText(f"'{file_or_folder}' already exists. What would you like to do?")
-    msgBox.setWindowTitle("File/Folder Exists")
-    replace_button = msgBox.addButton("Replace", QtWidgets.QMessageBox.AcceptRole)
-    rename_button = msgBox.addButton("Rename", QtWidgets.QMessageBox.NoRole)
-    cancel_button = msgBox.addButton("Cancel", QtWidgets.QMessageBox.RejectRole)
-    msgBox.setDefaultButton(replace_button)
-
-    msgBox.exec()
-
-    if msgBox.clickedButton() == replace_button:
-        return "replace"
-    elif msgBox.clickedButton() == rename_button:
-        return "rename"
-    else:
-        return "cancel"
-
-def ask_create_subfolder(output_path, file_name):
-    subfolder_name = os.path.splitext(file_name)[0]
-    subfolder_path = os.path.join(output_path, subfolder_name)
-
-    while True:
-        if os.path.exists(subfolder_path):
-            action = ask_replace_or_rename(subfolder_name)
-            if action == "replace":
-                for root, dirs, files in os.walk(subfolder_path, topdown=False):
-                    for f in files:
-                        os.remove(os.path.join(root, f))
-                    for d in dirs:
-                        os.rmdir(os.path.join(root, d))
-                break
-            elif action == "rename":
-                app = QtWidgets.QApplication.instance()
-                if not app:
-                    app = QtWidgets.QApplication([])
-                new_name, ok = QtWidgets.QInputDialog.getText(
-                    None,
-                    "Rename",
-                    "Enter new name for the folder and file:",
-                    text=subfolder_name,
-                )
-                if ok and new_name:
-                    subfolder_path = os.path.join(output_path, new_name)
-                    file_name = f"{new_name}.xlsx"
-                    subfolder_name = new_name
-                else:
-                    return None, None
-            else:
-                return None, None
-        else:
-            os.makedirs(subfolder_path)
-            break
-
-    return subfolder_path, file_name
-
-def get_color_format(workbook, color_name):
-    color_map = {
-        "Rose": "#FF007F",
-        "Pink": "#FFC0CB",
-        "Lavender": "#E6E6FA",
-        "Cyan": "#00FFFF",
-        "Fuchsia": "#FF00FF",
-        "Mint": "#98FF98",
-        "Sand": "#C2B280",
-        "Yellow": "#FFFF00",
-        "Green": "#00FF00",
-        "Blue": "#0000FF",
-        "Purple": "#800080",
-        "Red": "#FF0000",
-        "Cocoa": "#D2691E",
-        "Sky": "#87CEEB",
-        "Lemon": "#FFF44F",
-        "Cream": "#FFFDD0",
-    }
-    hex_color = color_map.get(color_name, "#FFFFFF")
-    return workbook.add_format({"bg_color": hex_color, "valign": "vcenter", "align": "center"})
-
-def open_folder_in_explorer(output_path):
-    system = platform.system()
-    if system == "Windows":
-        subprocess.Popen(["explorer", os.path.normpath(output_path)])
-    elif system == "Darwin":
-        subprocess.Popen(["open", output_path])
-    else:
-        print("Unsupported OS for auto-opening folder.")
-
-
-# -----------------------------------------------------------------------------
-# 3) Collecting all metadata keys from the entire timeline
-# -----------------------------------------------------------------------------
-
-def gather_all_metadata_keys_from_timeline(timeline):
-    """
-    Loop over all video tracks in the current timeline,
-    gather the union of all clip properties from each MediaPoolItem,
-    and return them as a list of keys (with standard fields at front).
-    """
-    standard_fields = [
-        THUMBNAIL_FIELD,
-        "Frame",
-        "Timecode",
-        "Name",
-        "Note",
-        "Duration",
-        "Color",
-        "Record In",
-        "Record Out",
-        "Source In",
-        "Source Out",
-        "Record Duration",
-        "Source Start Time",
-        "Source End Time",
-        "Track Type",
-        "Track Index",
-    ]
-
-    # We'll store all discovered keys in a set
-    discovered_keys = set()
-
-    # For each video track, get all timeline items
-    track_count = timeline.GetTrackCount("video")
-    for track_idx in range(1, track_count + 1):
-        timeline_items = timeline.GetItemListInTrack("video", track_idx)
-        for ti in timeline_items:
-            discovered_keys.update(_collect_timeline_item_metadata(ti).keys())
-            mp_item = ti.GetMediaPoolItem()
-            if mp_item:
-                props = mp_item.GetClipProperty()
-                discovered_keys.update(props.keys())
-
-    # Exclude standard fields from discovered so we don't duplicate
-    discovered_keys.difference_update(standard_fields)
-
-    # Sort them (alphabetically, for instance)
-    discovered_sorted = sorted(discovered_keys)
-
-    # The final list has standard fields at front
-    all_fields = standard_fields + discovered_sorted
-    return all_fields
-
-
-# -----------------------------------------------------------------------------
-# 4) Export Markers to Excel
-# -----------------------------------------------------------------------------
-
-def export_markers(timeline, output_path, timecodes, excel_filename, metadata_list, selected_fields, image_size):
-    markers = timeline.GetMarkers()
-    workbook = xlsxwriter.Workbook(os.path.join(output_path, excel_filename))
-    worksheet = workbook.add_worksheet()
-
-    text_format = workbook.add_format({"valign": "vcenter", "align": "left"})
-    max_size = image_size
-
-    headers = selected_fields
-    for col_num, header in enumerate(headers):
-        worksheet.write(0, col_num, header, text_format)
-
-    row = 1
-
-    currentProject = resolve.GetProjectManager().GetCurrentProject()
-    gallery = currentProject.GetGallery()
-    currentStillAlbum = gallery.GetCurrentStillAlbum()
-    stills = currentStillAlbum.GetStills()
-
-    # Write each marker's data
-    for idx, (frame, marker) in enumerate(markers.items()):
-        col = 0
-        data_row = {
-            "Frame": frame,
-            "Name": marker["name"],
-            "Note": marker["note"],
-            "Duration": marker["duration"],
-            "Color": marker["color"],
-            "Timecode": timecodes[idx]
-        }
-        data_row.update(metadata_list[idx])
-
-        for field in selected_fields:
-            if field == THUMBNAIL_FIELD:
-                worksheet.write(row, col, "", text_format)
-            elif field == "Color":
-                worksheet.write(row, col, "", get_color_format(workbook, data_row.get(field, "")))
-            else:
-                worksheet.write(row, col, data_row.get(field, ""), text_format)
-            col += 1
-        row += 1
-
-    image_col_index = headers.index(THUMBNAIL_FIELD) if THUMBNAIL_FIELD in headers else None
-    row = 1
-
-    # Export stills
-    for i, still in enumerate(stills):
-        suffix = f"{i + 1:03}"
-        tmp_name = f"tmp_{suffix}"
-        currentStillAlbum.ExportStills([still], output_path, tmp_name, "png")
-
-    files = sorted(os.listdir(output_path))
-    for file in files:
-        if file.startswith("tmp") and file.endswith(".png"):
-            file_number = int(file.split("_")[1])
-            new_name = f"thumb{file_number:03d}.png"
-
-            while os.path.exists(os.path.join(output_path, new_name)):
-                action = ask_replace_or_rename(new_name)
-                if action == "replace":
-                    os.remove(os.path.join(output_path, new_name))
-                elif action == "rename":
-                    new_name, ok = QtWidgets.QInputDialog.getText(
-                        None, "Rename", "Enter new name for the image:", text=new_name
-                    )
-                    if not ok or not new_name:
-                        return
-                else:
-                    return
-
-            os.rename(os.path.join(output_path, file), os.path.join(output_path, new_name))
-
-            image_file_path = os.path.normpath(os.path.join(output_path, new_name))
-            print("Exported image:", image_file_path)
-
-            image = Image.open(image_file_path)
-            width, height = image.size
-            if width > height:
-                new_width = int(max_size)
-                new_height = int((max_size / width) * height)
-            else:
-                new_height = int(max_size)
-                new_width = int((max_size / height) * width)
-
-            resized_image = image.resize((new_width, new_height))
-            resized_image.save(image_file_path)
-
-            if image_col_index is not None:
-                worksheet.insert_image(row, image_col_index, image_file_path, {"x_scale": 1, "y_scale": 1, "object_position": 1})
-                worksheet.set_column(image_col_index, image_col_index, new_width / 6)
-                worksheet.set_row(row, new_height / 1.33)
-
-            row += 1
-
-    worksheet.autofit()
-    workbook.close()
-
-
-# -----------------------------------------------------------------------------
-# 5) Dark theme
-# -----------------------------------------------------------------------------
-
-def set_dark_theme(app):
-    app.setStyle('Fusion')
-    dark_palette = QtGui.QPalette()
-
-    dark_color = QtGui.QColor(45, 45, 45)
-    disabled_color = QtGui.QColor(127, 127, 127)
-
-    dark_palette.setColor(QtGui.QPalette.Window, dark_color)
-    dark_palette.setColor(QtGui.QPalette.WindowText, QtCore.Qt.white)
-    dark_palette.setColor(QtGui.QPalette.Base, QtGui.QColor(18, 18, 18))
-    dark_palette.setColor(QtGui.QPalette.AlternateBase, dark_color)
-    dark_palette.setColor(QtGui.QPalette.ToolTipBase, QtCore.Qt.white)
-    dark_palette.setColor(QtGui.QPalette.ToolTipText, QtCore.Qt.white)
-    dark_palette.setColor(QtGui.QPalette.Text, QtCore.Qt.white)
-    dark_palette.setColor(QtGui.QPalette.Disabled, QtGui.QPalette.Text, disabled_color)
-    dark_palette.setColor(QtGui.QPalette.Button, dark_color)
-    dark_palette.setColor(QtGui.QPalette.ButtonText, QtCore.Qt.white)
-    dark_palette.setColor(QtGui.QPalette.Disabled, QtGui.QPalette.ButtonText, disabled_color)
-    dark_palette.setColor(QtGui.QPalette.BrightText, QtCore.Qt.red)
-    dark_palette.setColor(QtGui.QPalette.Link, QtGui.QColor(42, 130, 218))
-    dark_palette.setColor(QtGui.QPalette.Highlight, QtGui.QColor(42, 130, 218))
-    dark_palette.setColor(QtGui.QPalette.Disabled, QtGui.QPalette.Highlight, QtGui.QColor(80, 80, 80))
-    dark_palette.setColor(QtGui.QPalette.HighlightedText, QtCore.Qt.white)
-    dark_palette.setColor(QtGui.QPalette.Disabled, QtGui.QPalette.HighlightedText, disabled_color)
-
-    app.setPalette(dark_palette)
-
-
-# -----------------------------------------------------------------------------
-# 6) The main reordering/presets UI
-# -----------------------------------------------------------------------------
-
-class UserInputDialog(QtWidgets.QDialog):
-    def __init__(self, all_fields, parent=None):
-        super(UserInputDialog, self).__init__(parent)
-
-        # Keep window on top
-        self.setWindowFlag(QtCore.Qt.WindowStaysOnTopHint)
-        # Large default size
-        self.resize(1200, 800)
-        self.setWindowTitle(f"{APP_TITLE} Options")
-
-        self.search_results = []
-        self.search_index = 0
-        self.field_role = QtCore.Qt.UserRole
-
-        layout = QtWidgets.QVBoxLayout(self)
-
-        instructions = QtWidgets.QLabel("Please set the options below:")
-        layout.addWidget(instructions)
-
-        # Timecode
-        timecode_label = QtWidgets.QLabel("Enter custom timecode (default is 01:00:00:00):")
-        layout.addWidget(timecode_label)
-        self.timecode_input = QtWidgets.QLineEdit("01:00:00:00")
-        layout.addWidget(self.timecode_input)
-
-        # Delete stills
-        self.delete_stills_checkbox = QtWidgets.QCheckBox("Delete all stills from the gallery album")
-        layout.addWidget(self.delete_stills_checkbox)
-
-        # Search
-        search_label = QtWidgets.QLabel("Search in metadata fields:")
-        layout.addWidget(search_label)
-
-        search_layout = QtWidgets.QHBoxLayout()
-        self.search_field = QtWidgets.QLineEdit()
-        self.search_field.setPlaceholderText("Type something (e.g. 'audio', 'tape', etc.)")
-        self.search_field.textChanged.connect(self.search_in_list)
-        self.find_next_button = QtWidgets.QPushButton("Find Next")
-        self.find_next_button.clicked.connect(self.find_next_match)
-
-        search_layout.addWidget(self.search_field)
-        search_layout.addWidget(self.find_next_button)
-        layout.addLayout(search_layout)
-
-        # Preset load/save
-        preset_buttons_layout = QtWidgets.QHBoxLayout()
-        load_preset_button = QtWidgets.QPushButton("Load Preset")
-        save_preset_button = QtWidgets.QPushButton("Save Preset")
-        setup_guide_button = QtWidgets.QPushButton("Show Setup Guide")
-
-
-        load_preset_button.clicked.connect(self.on_load_preset_clicked)
-        save_preset_button.clicked.connect(self.on_save_preset_clicked)
-        setup_guide_button.clicked.connect(self.on_show_setup_guide_clicked)
-
-        # Support button
-        donate_button = QtWidgets.QPushButton("Support")
-        donate_button.setStyleSheet("""
-                    QPushButton {
-                        background-color: #8A2BE2; /* Purple */
-                        color: white;
-                        font-weight: bold;
-                    }
-                    QPushButton:hover {
-                        background-color: #9E47FF; /* Slightly lighter on hover */
-                    }
-                """)
-        donate_button.clicked.connect(lambda: webbrowser.open(SUPPORT_URL))
-
-        preset_buttons_layout.addWidget(load_preset_button)
-        preset_buttons_layout.addWidget(save_preset_button)
-        preset_buttons_layout.addWidget(setup_guide_button)
-        preset_buttons_layout.addWidget(donate_button)
-        layout.addLayout(preset_buttons_layout)
-
-        info_layout = QtWidgets.QHBoxLayout()
-
-        # We can use HTML for clickable links
-        # setOpenExternalLinks(True) allows user to click the links.
-        self.info_label = QtWidgets.QLabel(
-            '<span style="font-size:10px;">'
-            '<a href="https://www.linkedin.com/in/natalia-raz-0b8329120/">Natalia Raz</a> &nbsp;|&nbsp; '
-            '<a href="https://github.com/natlrazfx">GitHub</a> &nbsp;|&nbsp; '
-            '<a href="https://vimeo.com/552106671">Vimeo</a>'
-            '</span>'
-        )
-        self.info_label.setOpenExternalLinks(True)
-
-        info_layout.addStretch(1)  # pushes label to the right if you like
-        info_layout.addWidget(self.info_label)
-        # info_layout.addStretch(1)  # or comment out if you don't want right alignment
-
-        layout.addLayout(info_layout)
-
-        # Metadata label
-        metadata_label = QtWidgets.QLabel("Select and reorder the metadata fields:")
-        layout.addWidget(metadata_label)
-
-        # QListWidget (reorderable + checkable)
-        self.list_widget = QtWidgets.QListWidget()
-        self.list_widget.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
-        self.list_widget.setDragDropMode(QtWidgets.QAbstractItemView.InternalMove)
-        self.list_widget.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
-        layout.addWidget(self.list_widget, stretch=1)
-
-        # Default fields that are checked
-        self.default_selected_fields = [
-            THUMBNAIL_FIELD, "Frame", "Timecode", "Name", "Note", "Duration", "Color",
-            "Record In", "Record Out",
-            "Source In", "Source Out", "Record Duration",
-            "Track Type", "Track Index",
-            "Clip Name", "FPS", "File Path", "Video Codec",
-            "Resolution", "Start TC", "End TC"
-        ]
-        self.all_fields = list(all_fields)
-        self._rebuild_field_list(self.all_fields, set(self.default_selected_fields))
-
-        # Select All / Deselect All
-        button_layout = QtWidgets.QHBoxLayout()
-        select_all_button = QtWidgets.QPushButton("Select All")
-        deselect_all_button = QtWidgets.QPushButton("Deselect All")
-        select_all_button.clicked.connect(self.select_all_items)
-        deselect_all_button.clicked.connect(self.deselect_all_items)
-        button_layout.addWidget(select_all_button)
-        button_layout.addWidget(deselect_all_button)
-        layout.addLayout(button_layout)
-
-        # Image size
-        size_label = QtWidgets.QLabel("Choose the size for the still images:")
-        layout.addWidget(size_label)
-
-        size_layout = QtWidgets.QHBoxLayout()
-        self.size_combo = QtWidgets.QComboBox()
-        self.size_combo.addItems(["SMALL", "LARGE", "CUSTOM"])
-        size_layout.addWidget(self.size_combo)
-
-        self.custom_size_input = QtWidgets.QDoubleSpinBox()
-        self.custom_size_input.setRange(0.1, 10)
-        self.custom_size_input.setSingleStep(0.1)
-        self.custom_size_input.setValue(1)
-        self.custom_size_input.setVisible(False)
-        size_layout.addWidget(self.custom_size_input)
-        layout.addLayout(size_layout)
-
-        def on_size_change():
-            self.custom_size_input.setVisible(self.size_combo.currentText() == "CUSTOM")
-
-        self.size_combo.currentIndexChanged.connect(on_size_change)
-
-        # OK / Cancel
-        ok_cancel_layout = QtWidgets.QHBoxLayout()
-        ok_button = QtWidgets.QPushButton("OK")
-        cancel_button = QtWidgets.QPushButton("Cancel")
-        ok_button.clicked.connect(self.accept)
-        cancel_button.clicked.connect(self.reject)
-        ok_cancel_layout.addWidget(ok_button)
-        ok_cancel_layout.addWidget(cancel_button)
-        layout.addLayout(ok_cancel_layout)
+    app = QtWidgets.QApplication.instance()
+    if not app:
+        app = QtWidgets.QApplication([])
+    options = QtWidgets.QFileDialog.Options()
+    default_filename = f"{project_name}_shotlist_v001.xlsx" if project_name else ""
+    filters = [f"{name} (*{extension})" for extension, name in OUTPUT_FORMATS.items()]
+    file_name, selected_filter = QtWidgets.QFileDialog.getSaveFileName(
+        None,
+        "Save As",
+        default_filename,
+        ";;".join(filters + ["All Files (*)"]),
+        options=options,
+    )
+    if file_name and selected_filter in filters:
+        # Without an extension typed, the chosen file type decides the format
+        file_name = output_file_name(file_name, list(OUTPUT_FORMATS)[filters.index(selected_filter)])
+    return file_name
 
-    def _is_timeline_field(self, field_name):
-        return field_name.startswith(f"{TIMELINE_PREFIX} ") or field_name in {
-            "Record In",
-            "Record Out",
-            "Record Duration",
-            "Source In",
-            "Source Out",
-            "Source Start Time",
-            "Source End Time",
-            "Track Type",
-            "Track Index",
-        }
 
-    def _add_separator_item(self, label):
-        item = QtWidgets.QListWidgetItem(f"────────  {label}  ────────")
-        item.setFlags(QtCore.Qt.NoItemFlags)
-        item.setForeground(QtGui.QColor(140, 140, 140))
-        item.setData(self.field_role, "separator")
-        self.list_widget.addItem(item)
+def output_file_name(file_name, default_extension=".xlsx"):
+    """file_name with an output format extension, default_extension added if it has none."""
+    if os.path.splitext(file_name)[1].lower() in OUTPUT_FORMATS:
+        return file_name
+    return file_name + default_extension
 
-    def _add_field_item(self, field_name, checked_fields):
-        item = QtWidgets.QListWidgetItem(field_name)
-        item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable | QtCore.Qt.ItemIsEnabled)
-        item.setData(self.field_role, "field")
-        if field_name in checked_fields:
-            item.setCheckState(QtCore.Qt.Checked)
+def ask_replace_or_rename(file_or_folder):
+    msgBox = QtWidgets.QMessageBox()
+    msgBox.setIcon(QtWidgets.QMessageBox.Question)
+    msgBox.setText(f"'{file_or_folder}' already exists. What would you like to do?")
+    msgBox.setWindowTitle("File/Folder Exists")
+    replace_button = msgBox.addButton("Replace", QtWidgets.QMessageBox.AcceptRole)
+    rename_button = msgBox.addButton("Rename", QtWidgets.QMessageBox.NoRole)
+    cancel_button = msgBox.addButton("Cancel", QtWidgets.QMessageBox.RejectRole)
+    msgBox.setDefaultButton(replace_button)
+
+    msgBox.exec()
+
+    if msgBox.clickedButton() == replace_button:
+        return "replace"
+    elif msgBox.clickedButton() == rename_button:
+        return "rename"
+    else:
+        return "cancel"
+
+def ask_resume_export(file_name, done_count):
+    msgBox = QtWidgets.QMessageBox()
+    msgBox.setIcon(QtWidgets.QMessageBox.Question)
+    msgBox.setText(
+        f"An unfinished export of '{file_name}' was found ({done_count} markers done).\n\n"
+        "Resume it, or start over?"
+    )
+    msgBox.setWindowTitle("Resume Export")
+    resume_button = msgBox.addButton("Resume", QtWidgets.QMessageBox.AcceptRole)
+    msgBox.addButton("Start Over", QtWidgets.QMessageBox.NoRole)
+    msgBox.setDefaultButton(resume_button)
+
+    msgBox.exec()
+
+    return msgBox.clickedButton() == resume_button
+
+def _clear_folder(folder_path):
+    for root, dirs, files in os.walk(folder_path, topdown=False):
+        for f in files:
+            os.remove(os.path.join(root, f))
+        for d in dirs:
+            os.rmdir(os.path.join(root, d))
+
+def ask_create_subfolder(output_path, file_name):
+    subfolder_name = os.path.splitext(file_name)[0]
+    subfolder_path = os.path.join(output_path, subfolder_name)
+
+    while True:
+        if os.path.exists(subfolder_path):
+            action = ask_replace_or_rename(subfolder_name)
+            if action == "replace":
+                set_aside_previous_exports(subfolder_path)
+                _clear_folder(subfolder_path)
+                break
+            elif action == "rename":
+                app = QtWidgets.QApplication.instance()
+                if not app:
+                    app = QtWidgets.QApplication([])
+                new_name, ok = QtWidgets.QInputDialog.getText(
+                    None,
+                    "Rename",
+                    "Enter new name for the folder and file:",
+                    text=subfolder_name,
+                )
+                if ok and new_name:
+                    subfolder_path = os.path.join(output_path, new_name)
+                    file_name = new_name + os.path.splitext(file_name)[1]
+                    subfolder_name = new_name
+                else:
+                    return None, None
+            else:
+                return None, None
         else:
-            item.setCheckState(QtCore.Qt.Unchecked)
-        self.list_widget.addItem(item)
+            os.makedirs(subfolder_path)
+            break
 
-    def _rebuild_field_list(self, field_order, checked_fields):
-        self.list_widget.clear()
+    return subfolder_path, file_name
 
-        standard_fields = [f for f in field_order if f in self.default_selected_fields and not self._is_timeline_field(f)]
-        timeline_fields = [f for f in field_order if self._is_timeline_field(f)]
-        clip_fields = [f for f in field_order if f not in standard_fields and f not in timeline_fields]
+def get_color_format(formats, color_name):
+    color_map = {
+        "Rose": "#FF007F",
+        "Pink": "#FFC0CB",
+        "Lavender": "#E6E6FA",
+        "Cyan": "#00FFFF",
+        "Fuchsia": "#FF00FF",
+        "Mint": "#98FF98",
+        "Sand": "#C2B280",
+        "Yellow": "#FFFF00",
+        "Green": "#00FF00",
+        "Blue": "#0000FF",
+        "Purple": "#800080",
+        "Red": "#FF0000",
+        "Cocoa": "#D2691E",
+        "Sky": "#87CEEB",
+        "Lemon": "#FFF44F",
+        "Cream": "#FFFDD0",
+    }
+    hex_color = color_map.get(color_name, "#FFFFFF")
+    return formats.get({"bg_color": hex_color, "valign": "vcenter", "align": "center"})
 
-        if standard_fields:
-            self._add_separator_item("Standard Fields")
-            for field in standard_fields:
-                self._add_field_item(field, checked_fields)
-        if timeline_fields:
-            self._add_separator_item("Timeline Fields")
-            for field in timeline_fields:
-                self._add_field_item(field, checked_fields)
-        if clip_fields:
-            self._add_separator_item("Clip Metadata")
-            for field in clip_fields:
-                self._add_field_item(field, checked_fields)
-
-    # ----------------------------------------------------------------
-    # Preset: one preset per JSON
-    # ----------------------------------------------------------------
-    def on_save_preset_clicked(self):
-        path, _ = QtWidgets.QFileDialog.getSaveFileName(
-            self,
-            "Save Preset",
-            "",
-            "JSON Files (*.json);;All Files (*)"
-        )
-        if not path:
-            return
-        fields_in_order = []
-        checked_list = []
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item.data(self.field_role) != "field":
-                continue
-            fields_in_order.append(item.text())
-            if item.checkState() == QtCore.Qt.Checked:
-                checked_list.append(item.text())
-
-        data = {"order": fields_in_order, "checked": checked_list}
-        try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=4)
-        except Exception as e:
-            QtWidgets.QMessageBox.warning(self, "Error", f"Failed to save preset:\n{e}")
-
-    def on_load_preset_clicked(self):
-        path, _ = QtWidgets.QFileDialog.getOpenFileName(
-            self,
-            "Load Preset",
-            "",
-            "JSON Files (*.json);;All Files (*)"
-        )
-        if not path:
-            return
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as e:
-            QtWidgets.QMessageBox.warning(self, "Error", f"Failed to read preset:\n{e}")
-            return
-
-        fields_order = [f for f in data.get("order", []) if f in self.all_fields]
-        for f in self.all_fields:
-            if f not in fields_order:
-                fields_order.append(f)
-        checked_fields = {f for f in data.get("checked", []) if f in self.all_fields}
-        self._rebuild_field_list(fields_order, checked_fields)
+def open_folder_in_explorer(output_path):
+    system = platform.system()
+    if system == "Windows":
+        subprocess.Popen(["explorer", os.path.normpath(output_path)])
+    elif system == "Darwin":
+        subprocess.Popen(["open", output_path])
+    else:
+        print("Unsupported OS for auto-opening folder.")
 
-    def on_show_setup_guide_clicked(self):
-        _show_bind_setup_dialog(force=True)
-
-    # ----------------------------------------------------------------
-    # Searching
-    # ----------------------------------------------------------------
-    def search_in_list(self):
-        query = self.search_field.text().strip().lower()
-        self.search_results.clear()
-        self.search_index = 0
-
-        if not query:
-            self.list_widget.clearSelection()
-            return
-
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item.data(self.field_role) != "field":
-                continue
-            txt = item.text().lower()
-            if query in txt:
-                self.search_results.append(i)
-
-        if self.search_results:
-            idx = self.search_results[0]
-            item = self.list_widget.item(idx)
-            self.list_widget.setCurrentItem(item)
-            self.list_widget.scrollToItem(item)
-        else:
-            QtWidgets.QMessageBox.information(self, "Not Found", f"No fields match '{self.search_field.text()}'")
-
-    def find_next_match(self):
-        if not self.search_results:
-            return
-        self.search_index += 1
-        if self.search_index >= len(self.search_results):
-            self.search_index = 0
-        idx = self.search_results[self.search_index]
-        item = self.list_widget.item(idx)
-        self.list_widget.setCurrentItem(item)
-        self.list_widget.scrollToItem(item)
-
-    # ----------------------------------------------------------------
-    # Select All / Deselect All
-    # ----------------------------------------------------------------
-    def select_all_items(self):
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item.data(self.field_role) == "field":
-                item.setCheckState(QtCore.Qt.Checked)
 
-    def deselect_all_items(self):
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item.data(self.field_role) == "field":
-                item.setCheckState(QtCore.Qt.Unchecked)
-
-    # ----------------------------------------------------------------
-    # Return final selections
-    # ----------------------------------------------------------------
-    def get_values(self):
-        selected_fields = []
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item.data(self.field_role) != "field":
+# -----------------------------------------------------------------------------
+# 3) Collecting all metadata keys from the entire timeline
+# -----------------------------------------------------------------------------
+
+class TimelineItemIndex:
+    """
+    Sorted per-track intervals of a timeline's items, built once from
+    GetStart()/GetEnd(), so the item(s) under any frame are found with a
+    binary search instead of moving the playhead and calling GetCurrentVideoItem().
+    Frames are absolute timeline frames; item_under_marker() takes marker frames.
+    """
+
+    def __init__(self, timeline, track_type="video"):
+        self.track_type = track_type
+        self.timeline_id = _safe_timeline_item_call(timeline, "GetUniqueId")
+        try:
+            self.start_frame = int(timeline.GetStartFrame())
+        except Exception:
+            self.start_frame = 0
+        self.track_count = timeline.GetTrackCount(track_type) or 0
+        # track index -> (starts, prefix max of ends, ends, items), sorted by start
+        self.tracks = {}
+        self.enabled_tracks = set()
+        self.item_count = 0
+        for track_idx in range(1, self.track_count + 1):
+            intervals = []
+            for ti in timeline.GetItemListInTrack(track_type, track_idx) or []:
+                try:
+                    start = int(_safe_timeline_item_call(ti, "GetStart", False))
+                    end = int(_safe_timeline_item_call(ti, "GetEnd", False))
+                except (TypeError, ValueError):
+                    continue
+                intervals.append((start, end, ti))
+            intervals.sort(key=lambda interval: interval[0])
+            starts, max_ends, ends, items = [], [], [], []
+            running_end = None
+            for start, end, ti in intervals:
+                running_end = end if running_end is None else max(running_end, end)
+                starts.append(start)
+                max_ends.append(running_end)
+                ends.append(end)
+                items.append(ti)
+            self.tracks[track_idx] = (starts, max_ends, ends, items)
+            self.item_count += len(items)
+            if _safe_timeline_item_call(timeline, "GetIsTrackEnabled", track_type, track_idx) is not False:
+                self.enabled_tracks.add(track_idx)
+
+    def all_items(self):
+        for track_idx in range(1, self.track_count + 1):
+            for ti in self.tracks[track_idx][3]:
+                yield ti
+
+    def items_at(self, frame, track_idx):
+        """All items on track_idx whose [start, end) covers frame."""
+        starts, max_ends, ends, items = self.tracks.get(track_idx, ((), (), (), ()))
+        found = []
+        i = bisect.bisect_right(starts, frame) - 1
+        while i >= 0 and max_ends[i] > frame:
+            if ends[i] > frame:
+                found.append(items[i])
+            i -= 1
+        found.reverse()
+        return found
+
+    def topmost_item_at(self, frame):
+        """The item on the highest enabled track that covers frame, or None."""
+        for track_idx in range(self.track_count, 0, -1):
+            if track_idx not in self.enabled_tracks:
                 continue
-            if item.checkState() == QtCore.Qt.Checked:
-                selected_fields.append(item.text())
-
-        size_text = self.size_combo.currentText()
-        if size_text == "CUSTOM":
-            multiplier = self.custom_size_input.value()
-            image_size = 260 * multiplier
-        elif size_text == "LARGE":
-            image_size = 520
-        else:
-            image_size = 260
-
-        timecode = self.timecode_input.text() or "01:00:00:00"
-        delete_stills = self.delete_stills_checkbox.isChecked()
-        return selected_fields, image_size, timecode, delete_stills
-
-
-# -----------------------------------------------------------------------------
-# 7) Main script logic
-# -----------------------------------------------------------------------------
-
-if __name__ == "__main__":
-    # Create Qt app
-    app = QtWidgets.QApplication.instance()
-    if not app:
-        app = QtWidgets.QApplication([])
-    set_dark_theme(app)
-    app_icon_path = _resource_path("icon.png")
-    if os.path.exists(app_icon_path):
-        app.setWindowIcon(QtGui.QIcon(app_icon_path))
-    if not _ensure_macos_accessibility_permission():
-        sys.exit(1)
+            found = self.items_at(frame, track_idx)
+            if found:
+                return found[-1]
+        return None
 
-    if resolve is None:
-        QtWidgets.QMessageBox.critical(
-            None,
-            APP_TITLE,
-            "DaVinci Resolve Studio is not available.\n\nOpen Resolve Studio and run ShotlistCreator again.",
-        )
-        sys.exit(1)
+    def item_under_marker(self, frame_id):
+        return self.topmost_item_at(self.start_frame + int(frame_id))
 
-    projectManager = resolve.GetProjectManager()
-    if projectManager is None:
-        QtWidgets.QMessageBox.critical(
-            None,
-            APP_TITLE,
-            "Could not access Resolve project manager.\n\nPlease restart DaVinci Resolve Studio and try again.",
-        )
-        sys.exit(1)
 
-    _show_bind_setup_dialog()
+class MetadataCache:
+    """
+    Run-scoped memo of TimelineItem and MediaPoolItem metadata, keyed by GetUniqueId().
+    Field discovery and every marker that lands on an already seen clip, or on an item
+    sharing a MediaPoolItem, reuse the first result instead of another Resolve call.
+    """
 
-    currentProject = projectManager.GetCurrentProject()
-    if currentProject is None:
-        QtWidgets.QMessageBox.warning(
-            None,
-            APP_TITLE,
-            "No project is currently open.\n\nOpen a project in DaVinci Resolve Studio and run again.",
-        )
-        sys.exit(1)
+    def __init__(self):
+        self.timeline_items = {}
+        self.media_pool_ids = {}
+        self.clip_properties_by_id = {}
+        self.grade_fingerprints = {}
+        # Possibly stale properties from the on-disk cache, only trusted for field discovery.
+        self.persisted_properties = {}
+        self.counters = {
+            "timeline_items": {"hits": 0, "misses": 0},
+            "media_pool_items": {"hits": 0, "misses": 0},
+        }
+        # Discovery fills the cache from several threads; counters need the lock,
+        # single dict stores are atomic and a duplicate fetch is harmless.
+        self._lock = threading.Lock()
 
-    currentTimeline = currentProject.GetCurrentTimeline()
-    if currentTimeline is None:
-        QtWidgets.QMessageBox.warning(
-            None,
-            APP_TITLE,
-            "No timeline is currently active.\n\nOpen a timeline and run ShotlistCreator again.",
-        )
-        sys.exit(1)
+    def _count(self, kind, hit):
+        with self._lock:
+            self.counters[kind]["hits" if hit else "misses"] += 1
 
-    while True:
-        currentProject = projectManager.GetCurrentProject()
-        if currentProject is None:
-            QtWidgets.QMessageBox.warning(
-                None,
-                APP_TITLE,
-                "No project is currently open.\n\nOpen a project in DaVinci Resolve Studio and run again.",
-            )
-            sys.exit(1)
+    def timeline_item(self, timeline_item):
+        """{"name", "metadata"} for a timeline item, fetched from Resolve once per run."""
+        item_id = _safe_timeline_item_call(timeline_item, "GetUniqueId")
+        entry = self.timeline_items.get(item_id) if item_id else None
+        self._count("timeline_items", entry is not None)
+        if entry is None:
+            entry = {
+                "name": _safe_timeline_item_call(timeline_item, "GetName"),
+                "metadata": _collect_timeline_item_metadata(timeline_item),
+            }
+            if item_id:
+                self.timeline_items[item_id] = entry
+        return entry
 
-        currentTimeline = currentProject.GetCurrentTimeline()
-        if currentTimeline is None:
-            QtWidgets.QMessageBox.warning(
-                None,
-                APP_TITLE,
-                "No timeline is currently active.\n\nOpen a timeline and run ShotlistCreator again.",
-            )
-            sys.exit(1)
+    def timeline_item_metadata(self, timeline_item):
+        return self.timeline_item(timeline_item)["metadata"]
 
-        project_name = currentProject.GetName()
-        all_fields = gather_all_metadata_keys_from_timeline(currentTimeline)
+    def _media_pool_id(self, timeline_item):
+        """(media pool unique id, MediaPoolItem or None); id is "" when the item has none."""
+        item_id = _safe_timeline_item_call(timeline_item, "GetUniqueId")
+        mp_id = self.media_pool_ids.get(item_id) if item_id else None
+        if mp_id is not None:
+            return mp_id, None
+        mp_item = timeline_item.GetMediaPoolItem()
+        if not mp_item:
+            # No MediaPoolItem (generators, titles, ...)
+            mp_id = ""
+        else:
+            mp_id = _safe_timeline_item_call(mp_item, "GetUniqueId") or None
+        if item_id and mp_id is not None:
+            self.media_pool_ids[item_id] = mp_id
+        return mp_id, mp_item
 
-        dialog = UserInputDialog(all_fields)
-        if dialog.exec() != QtWidgets.QDialog.Accepted:
-            print("Operation cancelled.")
-            break
+    def media_pool_id(self, timeline_item):
+        """Unique id of the item's MediaPoolItem; "" when it has none, None if it cannot be read."""
+        return self._media_pool_id(timeline_item)[0]
 
-        selected_fields, image_size, timecode_to_set, delete_stills = dialog.get_values()
-        if not selected_fields:
-            QtWidgets.QMessageBox.information(
+    def clip_properties(self, timeline_item):
+        """GetClipProperty() of the item's MediaPoolItem, or None when it has none."""
+        mp_id, mp_item = self._media_pool_id(timeline_item)
+        if mp_id == "":
+            return None
+
+        props = self.clip_properties_by_id.get(mp_id) if mp_id else None
+        self._count("media_pool_items", props is not None)
+        if props is None:
+            if mp_item is None:
+                mp_item = timeline_item.GetMediaPoolItem()
+            props = (mp_item.GetClipProperty() if mp_item else None) or {}
+            if mp_id:
+                self.clip_properties_by_id[mp_id] = props
+        return props
+
+    def clip_property_keys(self, timeline_item):
+        """
+        Keys of the item's clip properties. Unlike clip_properties(), this may be
+        answered from properties persisted by an earlier run (see seed_persisted()).
+        """
+        mp_id, _ = self._media_pool_id(timeline_item)
+        if mp_id == "":
+            return ()
+        if mp_id and mp_id not in self.clip_properties_by_id and mp_id in self.persisted_properties:
+            self._count("media_pool_items", True)
+            return self.persisted_properties[mp_id].keys()
+        return (self.clip_properties(timeline_item) or {}).keys()
+
+    def seed_persisted(self, properties_by_id):
+        self.persisted_properties.update(properties_by_id)
+
+    def stats(self):
+        with self._lock:
+            return {kind: dict(counts) for kind, counts in self.counters.items()}
+
+
+def _collect_marker_clip_metadata(timeline_item, cache=None):
+    if cache is None:
+        cache = MetadataCache()
+    clip_metadata = {}
+    if timeline_item:
+        entry = cache.timeline_item(timeline_item)
+        clip_metadata["Clip Name"] = entry["name"]
+        clip_metadata.update(entry["metadata"])
+        props = cache.clip_properties(timeline_item)
+        if props:
+            for k, v in props.items():
+                clip_metadata[k] = v
+    else:
+        clip_metadata["Clip Name"] = "N/A"
+        clip_metadata["Record In"] = ""
+        clip_metadata["Record Out"] = ""
+        clip_metadata["Source In"] = ""
+        clip_metadata["Source Out"] = ""
+        clip_metadata["Record Duration"] = ""
+        clip_metadata["Source Start Time"] = ""
+        clip_metadata["Source End Time"] = ""
+        clip_metadata["Track Type"] = ""
+        clip_metadata["Track Index"] = ""
+    return clip_metadata
+
+
+def collect_marker_metadata(item_index, markers, cache=None):
+    """Clip metadata for every marker, resolved through the item index without navigation."""
+    if cache is None:
+        cache = MetadataCache()
+    return [_collect_marker_clip_metadata(item_index.item_under_marker(frame_id), cache) for frame_id in markers]
+
+
+def marker_source(item_index, frame_id, cache):
+    """
+    (clip id, source frame) of the picture under a marker: the timeline item's
+    unique id, which survives edits around it and carries the clip's grade, and the
+    source frame the marker lands on, from cached metadata. (None, None) where no
+    clip is under the marker.
+    """
+    timeline_item = item_index.item_under_marker(frame_id)
+    if not timeline_item:
+        return None, None
+    clip_id = _safe_timeline_item_call(timeline_item, "GetUniqueId") or None
+    metadata = cache.timeline_item_metadata(timeline_item)
+    try:
+        source_frame = (
+            int(metadata["Source In"]) + item_index.start_frame + int(frame_id) - int(metadata["Record In"])
+        )
+    except (KeyError, TypeError, ValueError):
+        source_frame = None
+    return clip_id, source_frame
+
+
+def grade_fingerprint(timeline_item, cache):
+    """
+    sha1 over what the scripting API exposes about an item's look: its transform,
+    crop and composite properties, the current grade version, the node count and
+    the LUT of every node. Node parameters are not readable through the API, so a
+    grade edited in place keeps its fingerprint. Memoized per item in the cache.
+    """
+    item_id = _safe_timeline_item_call(timeline_item, "GetUniqueId")
+    fingerprint = cache.grade_fingerprints.get(item_id) if item_id else None
+    if fingerprint is not None:
+        return fingerprint
+    node_count = _safe_timeline_item_call(timeline_item, "GetNumNodes")
+    parts = {
+        "properties": {
+            key: value for key, value in cache.timeline_item_metadata(timeline_item).items()
+            if key.startswith(TIMELINE_PREFIX)
+        },
+        "version": _safe_timeline_item_call(timeline_item, "GetCurrentVersion"),
+        "nodes": node_count,
+        "luts": [
+            _safe_timeline_item_call(timeline_item, "GetLUT", node)
+            for node in range(1, node_count + 1 if isinstance(node_count, int) else 1)
+        ],
+    }
+    fingerprint = hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    if item_id:
+        cache.grade_fingerprints[item_id] = fingerprint
+    return fingerprint
+
+
+def timeline_fingerprint(timeline):
+    """
+    Cheap change fingerprint of a timeline: start/end frames and the item count of
+    every video track. Costs one call per track, not per item.
+    """
+    parts = [
+        _safe_timeline_item_call(timeline, "GetStartFrame"),
+        _safe_timeline_item_call(timeline, "GetEndFrame"),
+    ]
+    track_count = timeline.GetTrackCount("video") or 0
+    for track_idx in range(1, track_count + 1):
+        parts.append(len(timeline.GetItemListInTrack("video", track_idx) or []))
+    return hashlib.sha1(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+
+def project_timelines(project):
+    """[(index, timeline)] of every timeline in the project; indices are 1-based as in GetTimelineByIndex()."""
+    timelines = []
+    try:
+        count = int(project.GetTimelineCount() or 0)
+    except Exception:
+        return timelines
+    for index in range(1, count + 1):
+        timeline = project.GetTimelineByIndex(index)
+        if timeline:
+            timelines.append((index, timeline))
+    return timelines
+
+
+class PersistentMetadataCache:
+    """
+    SQLite cache next to settings.json that survives between runs: the field list of
+    each timeline (valid while its fingerprint matches) and clip properties by media
+    pool item unique id. Least recently used rows are evicted past max_bytes.
+    Any database error turns the cache into a no-op rather than failing the run.
+    """
+
+    def __init__(self, path=None, max_bytes=None):
+        if path is None:
+            path = os.path.join(os.path.dirname(_get_config_path()), METADATA_CACHE_FILENAME)
+        if max_bytes is None:
+            max_bytes = int(_load_settings().get("metadata_cache_max_mb", METADATA_CACHE_MAX_MB)) * 1024 * 1024
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = None
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS timeline_fields (
+                    project_id TEXT, timeline_id TEXT, fingerprint TEXT, fields TEXT,
+                    size INTEGER, last_used REAL, PRIMARY KEY (project_id, timeline_id));
+                CREATE TABLE IF NOT EXISTS clip_properties (
+                    project_id TEXT, media_pool_id TEXT, properties TEXT,
+                    size INTEGER, last_used REAL, PRIMARY KEY (project_id, media_pool_id));
+                """
+            )
+        except sqlite3.Error as e:
+            print("Metadata cache disabled:", e)
+            self._db = None
+
+    def _execute(self, sql, params=(), many=False):
+        if self._db is None:
+            return []
+        with self._lock:
+            try:
+                with self._db:
+                    if many:
+                        self._db.executemany(sql, params)
+                        return []
+                    return self._db.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                print("Metadata cache error:", e)
+                return []
+
+    def get_fields(self, project_id, timeline_id, fingerprint):
+        rows = self._execute(
+            "SELECT fields FROM timeline_fields WHERE project_id = ? AND timeline_id = ? AND fingerprint = ?",
+            (project_id, timeline_id, fingerprint),
+        )
+        if not rows:
+            return None
+        self._execute(
+            "UPDATE timeline_fields SET last_used = ? WHERE project_id = ? AND timeline_id = ?",
+            (time.time(), project_id, timeline_id),
+        )
+        return json.loads(rows[0][0])
+
+    def put_fields(self, project_id, timeline_id, fingerprint, fields):
+        payload = json.dumps(fields)
+        self._execute(
+            "INSERT OR REPLACE INTO timeline_fields VALUES (?, ?, ?, ?, ?, ?)",
+            (project_id, timeline_id, fingerprint, payload, len(payload), time.time()),
+        )
+        self._evict()
+
+    def load_clip_properties(self, project_id):
+        rows = self._execute(
+            "SELECT media_pool_id, properties FROM clip_properties WHERE project_id = ?", (project_id,)
+        )
+        if rows:
+            self._execute("UPDATE clip_properties SET last_used = ? WHERE project_id = ?", (time.time(), project_id))
+        return {mp_id: json.loads(props) for mp_id, props in rows}
+
+    def store_clip_properties(self, project_id, properties_by_id):
+        now = time.time()
+        rows = []
+        for mp_id, props in properties_by_id.items():
+            payload = json.dumps(props, default=str)
+            rows.append((project_id, mp_id, payload, len(payload), now))
+        if rows:
+            self._execute("INSERT OR REPLACE INTO clip_properties VALUES (?, ?, ?, ?, ?)", rows, many=True)
+            self._evict()
+
+    def _evict(self):
+        total = self._execute(
+            "SELECT (SELECT IFNULL(SUM(size), 0) FROM timeline_fields)"
+            " + (SELECT IFNULL(SUM(size), 0) FROM clip_properties)"
+        )
+        if not total or total[0][0] <= self.max_bytes:
+            return
+        rows = self._execute(
+            "SELECT table_name, row_id, size FROM ("
+            " SELECT 'timeline_fields' AS table_name, rowid AS row_id, size, last_used FROM timeline_fields"
+            " UNION ALL"
+            " SELECT 'clip_properties', rowid, size, last_used FROM clip_properties"
+            ") ORDER BY last_used DESC"
+        )
+        # Keep the most recently used rows that fit into 90% of the budget, drop the rest.
+        budget = self.max_bytes * 0.9
+        kept = 0
+        doomed = {"timeline_fields": [], "clip_properties": []}
+        for table_name, row_id, size in rows:
+            kept += size
+            if kept > budget:
+                doomed[table_name].append((row_id,))
+        for table_name, row_ids in doomed.items():
+            if row_ids:
+                self._execute(f"DELETE FROM {table_name} WHERE rowid = ?", row_ids, many=True)
+
+    def close(self):
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
+
+
+def _item_metadata_keys(items, cache):
+    keys = set()
+    for ti in items:
+        keys.update(cache.timeline_item_metadata(ti).keys())
+        keys.update(cache.clip_property_keys(ti))
+    return keys
+
+
+def discover_metadata_keys(
+    items, cache=None, workers=None, batch_size=DISCOVERY_BATCH_SIZE, on_progress=None, should_stop=None
+):
+    """
+    Union of timeline item and clip property keys over items.
+
+    Items are split into batches spread over a bounded pool of worker threads
+    (workers from settings.json "discovery_workers"); workers=1 runs serially in
+    the calling thread for setups where concurrent scripting calls are unsafe.
+    on_progress(scanned, total, new_keys) is called as each batch is merged; once
+    should_stop() returns True the remaining batches are skipped.
+    """
+    if cache is None:
+        cache = MetadataCache()
+    if workers is None:
+        workers = _load_settings().get("discovery_workers", DISCOVERY_WORKERS)
+    workers = max(1, int(workers))
+    items = list(items)
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+    discovered_keys = set()
+    scanned = 0
+    started = time.perf_counter()
+
+    def merge(batch, keys):
+        nonlocal scanned
+        new_keys = keys - discovered_keys
+        discovered_keys.update(new_keys)
+        scanned += len(batch)
+        if on_progress:
+            on_progress(scanned, len(items), new_keys)
+
+    if workers == 1 or len(batches) <= 1:
+        for batch in batches:
+            if should_stop and should_stop():
+                break
+            merge(batch, _item_metadata_keys(batch, cache))
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_item_metadata_keys, batch, cache): batch for batch in batches}
+            for future in concurrent.futures.as_completed(futures):
+                if should_stop and should_stop():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+                merge(futures[future], future.result())
+
+    elapsed = time.perf_counter() - started
+    rate = scanned / elapsed if elapsed > 0 else 0.0
+    print(f"Scanned {scanned} timeline items in {elapsed:.2f}s ({rate:.0f} items/s, {workers} worker(s)).")
+    return discovered_keys
+
+
+def gather_all_metadata_keys_from_timeline(
+    timeline, item_index=None, cache=None, workers=None, on_progress=None, should_stop=None
+):
+    """
+    Loop over all video tracks in the current timeline,
+    gather the union of all clip properties from each MediaPoolItem,
+    and return them as a list of keys (with standard fields at front).
+    """
+    # Every video track item, as indexed once for the whole run
+    if item_index is None:
+        item_index = TimelineItemIndex(timeline)
+    discovered_keys = discover_metadata_keys(
+        item_index.all_items(), cache, workers, on_progress=on_progress, should_stop=should_stop
+    )
+
+    # Exclude standard fields from discovered so we don't duplicate
+    discovered_keys.difference_update(STANDARD_FIELDS)
+
+    # Sort them (alphabetically, for instance)
+    discovered_sorted = sorted(discovered_keys)
+
+    # The final list has standard fields at front
+    all_fields = STANDARD_FIELDS + discovered_sorted
+    return all_fields
+
+
+def discover_timeline_fields(
+    project, timeline, cache=None, persistent_cache=None, item_index=None, on_progress=None, should_stop=None
+):
+    """
+    Field list for the options dialog. When the timeline's fingerprint is unchanged
+    since an earlier run the list comes straight from the on-disk cache; otherwise
+    the timeline is scanned, with clip properties persisted by earlier runs standing
+    in for GetClipProperty() calls. Returns (fields, item_index); item_index stays
+    None if the cache answered and no index had to be built. on_progress and
+    should_stop are passed to discover_metadata_keys(). A stopped scan still
+    persists the clip properties it fetched, only its field list is dropped.
+    """
+    if cache is None:
+        cache = MetadataCache()
+    project_id = _safe_timeline_item_call(project, "GetUniqueId")
+    timeline_id = _safe_timeline_item_call(timeline, "GetUniqueId")
+    use_persistent = persistent_cache is not None and bool(project_id) and bool(timeline_id)
+
+    fingerprint = None
+    if use_persistent:
+        fingerprint = timeline_fingerprint(timeline)
+        fields = persistent_cache.get_fields(project_id, timeline_id, fingerprint)
+        if fields is not None:
+            print("Metadata fields loaded from cache.")
+            return fields, item_index
+        cache.seed_persisted(persistent_cache.load_clip_properties(project_id))
+
+    if item_index is None:
+        item_index = TimelineItemIndex(timeline)
+    try:
+        fields = gather_all_metadata_keys_from_timeline(
+            timeline, item_index, cache, on_progress=on_progress, should_stop=should_stop
+        )
+    finally:
+        if use_persistent:
+            # A copy, an export may be adding to the cache meanwhile
+            persistent_cache.store_clip_properties(project_id, dict(cache.clip_properties_by_id))
+
+    if use_persistent and not (should_stop and should_stop()):
+        persistent_cache.put_fields(project_id, timeline_id, fingerprint, fields)
+    return fields, item_index
+
+
+def is_timeline_field(field_name):
+    return field_name.startswith(f"{TIMELINE_PREFIX} ") or field_name in TIMELINE_FIELDS
+
+
+def field_section(field_name):
+    """Which of FIELD_SECTIONS the options dialog lists a field under."""
+    if is_timeline_field(field_name):
+        return "Timeline Fields"
+    if field_name in DEFAULT_SELECTED_FIELDS:
+        return "Standard Fields"
+    return "Clip Metadata"
+
+
+def preset_fields(preset):
+    """
+    Checked fields of a preset ({"order": [...], "checked": [...]}, as saved by the
+    options dialog) in the column order the dialog would give them: preset order
+    within each section, sections in FIELD_SECTIONS order.
+    """
+    checked = list(dict.fromkeys(preset.get("checked", [])))
+    ordered = [f for f in dict.fromkeys(preset.get("order", [])) if f in checked]
+    ordered += [f for f in checked if f not in ordered]
+    return sorted(ordered, key=lambda f: FIELD_SECTIONS.index(field_section(f)))
+
+
+# -----------------------------------------------------------------------------
+# 4) Timecode
+# -----------------------------------------------------------------------------
+# Pure-Python SMPTE conversions, no Resolve or Qt calls. Frame numbers are
+# absolute timeline frames (timeline start frame + marker frame).
+
+DEFAULT_START_TIMECODE = "01:00:00:00"
+
+
+def parse_frame_rate(frame_rate, drop_frame=False):
+    """
+    Return (nominal_fps, drop_frame) for a frame rate such as 23.976, "29.97" or 50.
+    Drop-frame counting only applies to 29.97 and its multiples.
+    """
+    try:
+        fps = float(frame_rate)
+    except (TypeError, ValueError):
+        fps = 24.0
+    nominal_fps = int(round(fps)) or 24
+    if nominal_fps % 30 != 0 or abs(fps - nominal_fps) < 0.001:
+        drop_frame = False
+    return nominal_fps, bool(drop_frame)
+
+
+def get_timeline_rate(timeline):
+    """Return (nominal_fps, drop_frame) for a Resolve timeline."""
+    frame_rate = None
+    try:
+        frame_rate = timeline.GetSetting("timelineFrameRate")
+    except Exception:
+        pass
+    drop_frame = False
+    try:
+        drop_frame = str(timeline.GetSetting("timelineDropFrameTimecode")) == "1"
+    except Exception:
+        pass
+    return parse_frame_rate(frame_rate, drop_frame)
+
+
+def _drop_frame_constants(nominal_fps):
+    drop = 2 * (nominal_fps // 30)
+    frames_per_minute = nominal_fps * 60 - drop
+    frames_per_10_minutes = nominal_fps * 600 - drop * 9
+    return drop, frames_per_minute, frames_per_10_minutes
+
+
+def frames_to_timecodes(frames_list, nominal_fps, drop_frame=False):
+    """Convert an iterable of absolute frame numbers to SMPTE timecode strings."""
+    if drop_frame:
+        drop, frames_per_minute, frames_per_10_minutes = _drop_frame_constants(nominal_fps)
+    separator = ";" if drop_frame else ":"
+    frames_per_hour = nominal_fps * 3600
+    frames_per_day = frames_per_hour * 24
+
+    timecodes = []
+    for frames in frames_list:
+        frames = int(frames)
+        if drop_frame:
+            tens, rest = divmod(frames, frames_per_10_minutes)
+            frames += drop * 9 * tens
+            if rest > drop:
+                frames += drop * ((rest - drop) // frames_per_minute)
+        frames %= frames_per_day
+        hh, rest = divmod(frames, frames_per_hour)
+        total_seconds, ff = divmod(rest, nominal_fps)
+        mm, ss = divmod(total_seconds, 60)
+        timecodes.append(f"{hh:02d}:{mm:02d}:{ss:02d}{separator}{ff:02d}")
+    return timecodes
+
+
+def frames_to_timecode(frames, nominal_fps, drop_frame=False):
+    return frames_to_timecodes([frames], nominal_fps, drop_frame)[0]
+
+
+def timecodes_to_frames(timecodes, nominal_fps, drop_frame=False):
+    """
+    Convert SMPTE timecode strings (":", ";" or "." separated) to absolute frame numbers.
+    Raises ValueError for malformed values.
+    """
+    if drop_frame:
+        drop = _drop_frame_constants(nominal_fps)[0]
+
+    frames_list = []
+    for timecode in timecodes:
+        parts = str(timecode).strip().replace(";", ":").replace(".", ":").split(":")
+        if len(parts) != 4 or not all(p.isdigit() for p in parts):
+            raise ValueError(f"Invalid timecode: {timecode!r}")
+        hh, mm, ss, ff = (int(p) for p in parts)
+        if mm > 59 or ss > 59 or ff >= nominal_fps:
+            raise ValueError(f"Invalid timecode: {timecode!r}")
+        total_minutes = hh * 60 + mm
+        frames = (total_minutes * 60 + ss) * nominal_fps + ff
+        if drop_frame:
+            if ss == 0 and ff < drop and mm % 10 != 0:
+                raise ValueError(f"Timecode {timecode!r} does not exist in drop-frame counting")
+            frames -= drop * (total_minutes - total_minutes // 10)
+        frames_list.append(frames)
+    return frames_list
+
+
+def timecode_to_frames(timecode, nominal_fps, drop_frame=False):
+    return timecodes_to_frames([timecode], nominal_fps, drop_frame)[0]
+
+
+def get_timeline_timecode_base(timeline, fallback_start_timecode=DEFAULT_START_TIMECODE):
+    """
+    Return (start_frame, nominal_fps, drop_frame) for a timeline, read once per run.
+    The start frame comes from Resolve; the user's custom start timecode is used
+    only when the timeline does not report one.
+    """
+    nominal_fps, drop_frame = get_timeline_rate(timeline)
+    start_frame = None
+    try:
+        start_frame = int(timeline.GetStartFrame())
+    except Exception:
+        pass
+    if start_frame is None:
+        for timecode in (_safe_timeline_item_call(timeline, "GetStartTimecode"), fallback_start_timecode):
+            try:
+                start_frame = timecode_to_frames(timecode, nominal_fps, drop_frame)
+                break
+            except ValueError:
+                continue
+    return start_frame, nominal_fps, drop_frame
+
+
+def marker_timecodes(timeline, frame_ids, fallback_start_timecode=DEFAULT_START_TIMECODE):
+    """Timecodes for marker frames (relative to the timeline start), without moving the playhead."""
+    start_frame, nominal_fps, drop_frame = get_timeline_timecode_base(timeline, fallback_start_timecode)
+    if start_frame is None:
+        start_frame = 0
+    return frames_to_timecodes((start_frame + int(f) for f in frame_ids), nominal_fps, drop_frame)
+
+
+# -----------------------------------------------------------------------------
+# 5) Marker filter and navigation
+# -----------------------------------------------------------------------------
+
+MARKER_COLORS = [
+    "Blue", "Cyan", "Green", "Yellow", "Red", "Pink", "Purple", "Fuchsia",
+    "Rose", "Lavender", "Sky", "Mint", "Lemon", "Sand", "Cocoa", "Cream",
+]
+MARKER_FILTER_KEYS = ("colors", "text", "start", "end", "min_duration", "max_duration", "custom_data")
+
+
+class MarkerFilter:
+    """
+    Which markers of a timeline are exported. The filter is saved in presets as
+    {"colors": [...], "text": regex, "start": ..., "end": ..., "min_duration": frames,
+    "max_duration": frames, "custom_data": regex}; every key is optional and all
+    the ones that are set must match. text is searched for in the marker name and
+    note, custom_data in its custom data. start and end are inclusive, either a
+    timecode (as in the Timecode column) or a marker frame.
+    Raises ValueError for a bad regular expression, timecode or number.
+    """
+
+    def __init__(self, spec=None):
+        spec = spec or {}
+        self.spec = {key: spec[key] for key in MARKER_FILTER_KEYS if spec.get(key) not in (None, "", [])}
+        self.colors = {str(color).lower() for color in self.spec.get("colors", [])}
+        self.text = self._regex("text", "name/note")
+        self.custom_data = self._regex("custom_data", "custom data")
+        self.start = self._position("start")
+        self.end = self._position("end")
+        self.min_duration = self._frames("min_duration", "minimum duration")
+        self.max_duration = self._frames("max_duration", "maximum duration")
+
+    def __bool__(self):
+        return bool(self.spec)
+
+    def _regex(self, key, label):
+        pattern = self.spec.get(key)
+        if pattern is None:
+            return None
+        try:
+            return re.compile(str(pattern), re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(f"Invalid {label} pattern {pattern!r}: {e}") from None
+
+    def _frames(self, key, label):
+        value = self.spec.get(key)
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid {label}: {value!r}") from None
+
+    def _position(self, key):
+        # A timecode stays a string until the timeline's rate is known
+        value = self.spec.get(key)
+        if value is None:
+            return None
+        text = str(value).strip()
+        if any(separator in text for separator in ":;."):
+            timecodes_to_frames([text], 1000)
+            return text
+        return self._frames(key, f"{key} frame")
+
+    def _marker_frame(self, position, start_frame, nominal_fps, drop_frame):
+        if position is None or isinstance(position, int):
+            return position
+        return timecode_to_frames(position, nominal_fps, drop_frame) - start_frame
+
+    def apply(self, timeline, markers, fallback_start_timecode=DEFAULT_START_TIMECODE):
+        """
+        The markers ({frame: marker} from GetMarkers()) that match, in their order.
+        Only reads the timeline's rate and start when a timecode range is set.
+        """
+        if not self.spec:
+            return markers
+        first = last = None
+        if self.start is not None or self.end is not None:
+            base = get_timeline_timecode_base(timeline, fallback_start_timecode)
+            start_frame = base[0] or 0
+            try:
+                first = self._marker_frame(self.start, start_frame, *base[1:])
+                last = self._marker_frame(self.end, start_frame, *base[1:])
+            except ValueError:
+                raise ValueError(
+                    f"Marker range {self.spec.get('start', '')} - {self.spec.get('end', '')} is not "
+                    f"valid for timeline '{timeline.GetName()}' at {base[1]} fps."
+                ) from None
+        return {
+            frame: marker for frame, marker in markers.items()
+            if self._matches(frame, marker, first, last)
+        }
+
+    def _matches(self, frame, marker, first, last):
+        if self.colors and str(marker.get("color", "")).lower() not in self.colors:
+            return False
+        if first is not None and frame < first:
+            return False
+        if last is not None and frame > last:
+            return False
+        duration = marker.get("duration") or 0
+        if self.min_duration is not None and duration < self.min_duration:
+            return False
+        if self.max_duration is not None and duration > self.max_duration:
+            return False
+        if self.text is not None and not (
+            self.text.search(str(marker.get("name", ""))) or self.text.search(str(marker.get("note", "")))
+        ):
+            return False
+        if self.custom_data is not None and not self.custom_data.search(str(marker.get("customData", ""))):
+            return False
+        return True
+
+
+NEXT_MARKER_KEY = "0"
+SETTLE_TIMEOUT_SECONDS = 2.0
+SETTLE_FIRST_POLL_SECONDS = 0.005
+SETTLE_MAX_POLL_SECONDS = 0.1
+
+
+def _normalize_timecode(timecode):
+    return str(timecode or "").strip().replace(";", ":").replace(".", ":")
+
+
+def wait_for_playhead(timeline, expected_timecode=None, previous_timecode=None, timeout=SETTLE_TIMEOUT_SECONDS):
+    """
+    Poll GetCurrentTimecode() with exponential backoff until the playhead reports
+    expected_timecode (or, when it is unknown, anything other than previous_timecode).
+    Returns (timecode, settled, elapsed_seconds).
+    """
+    expected = _normalize_timecode(expected_timecode) if expected_timecode else None
+    previous = _normalize_timecode(previous_timecode) if previous_timecode else None
+    delay = SETTLE_FIRST_POLL_SECONDS
+    started = time.perf_counter()
+    while True:
+        timecode = timeline.GetCurrentTimecode()
+        current = _normalize_timecode(timecode)
+        if expected is not None:
+            settled = current == expected
+        else:
+            settled = bool(current) and current != previous
+        elapsed = time.perf_counter() - started
+        if settled or elapsed >= timeout:
+            return timecode, settled, elapsed
+        time.sleep(min(delay, max(timeout - elapsed, 0)))
+        delay = min(delay * 2, SETTLE_MAX_POLL_SECONDS)
+
+
+class MarkerNavigator:
+    """
+    Moves the playhead onto each marker.
+
+    Markers are reached by seeking straight to their frame through the scripting
+    API, so Resolve does not need window focus. If Resolve refuses a seek, the
+    navigator switches to pressing the "Next Marker" key for the rest of the run,
+    once for every marker passed on the way, so markers left out by a filter or
+    already done are skipped over. After every move the playhead is polled until
+    it has settled on the marker.
+
+    confirm_keyboard() is called once before the first key press; if it returns
+    False the navigator raises RuntimeError instead of pressing keys.
+    """
+
+    def __init__(self, timeline, start_timecode=DEFAULT_START_TIMECODE, settle_timeout=None, confirm_keyboard=None):
+        self.timeline = timeline
+        self.confirm_keyboard = confirm_keyboard
+        self.start_frame, self.nominal_fps, self.drop_frame = get_timeline_timecode_base(timeline, start_timecode)
+        if settle_timeout is None:
+            settle_timeout = _load_settings().get("settle_timeout", SETTLE_TIMEOUT_SECONDS)
+        self.settle_timeout = float(settle_timeout)
+        self.settle_latencies = []
+        self.settle_timeouts = 0
+        self.use_keyboard = self.start_frame is None
+        self._keyboard = None
+        # Frames of all the timeline's markers and the last one moved onto, for key presses
+        self._marker_frames = None
+        self._frame = None
+        if self.use_keyboard:
+            self._enable_keyboard()
+
+    def _enable_keyboard(self):
+        self.use_keyboard = True
+        if self._keyboard is None:
+            print("Direct seek is not available, using the Next Marker key instead.")
+            if self.confirm_keyboard is not None and not self.confirm_keyboard():
+                raise RuntimeError("Direct seek is not available and keyboard control was not allowed.")
+            focus_on_timeline()
+            from pynput.keyboard import Controller
+
+            self._keyboard = Controller()
+            try:
+                self._marker_frames = sorted(int(f) for f in (self.timeline.GetMarkers() or {}))
+            except Exception:
+                self._marker_frames = None
+
+    def marker_timecode(self, frame_id):
+        if self.start_frame is None:
+            return None
+        return frames_to_timecode(self.start_frame + int(frame_id), self.nominal_fps, self.drop_frame)
+
+    def goto(self, frame_id):
+        """Move onto the marker at frame_id and return the settled playhead timecode."""
+        expected_timecode = self.marker_timecode(frame_id)
+        previous_timecode = None
+        previous_frame, self._frame = self._frame, int(frame_id)
+        if not self.use_keyboard:
+            try:
+                if self.timeline.SetCurrentTimecode(expected_timecode):
+                    return self._settle(expected_timecode, previous_timecode)
+            except Exception as e:
+                print("Direct seek failed:", e)
+            self._enable_keyboard()
+
+        if expected_timecode is None:
+            previous_timecode = self.timeline.GetCurrentTimecode()
+        presses = 1
+        if self._marker_frames:
+            passed = bisect.bisect_left(self._marker_frames, previous_frame) if previous_frame is not None else -1
+            presses = max(1, bisect.bisect_left(self._marker_frames, self._frame) - passed)
+        for _ in range(presses):
+            self._keyboard.press(NEXT_MARKER_KEY)
+            self._keyboard.release(NEXT_MARKER_KEY)
+        return self._settle(expected_timecode, previous_timecode)
+
+    def _settle(self, expected_timecode, previous_timecode):
+        timecode, settled, elapsed = wait_for_playhead(
+            self.timeline, expected_timecode, previous_timecode, self.settle_timeout
+        )
+        self.settle_latencies.append(elapsed)
+        if not settled:
+            self.settle_timeouts += 1
+            print(f"Playhead did not settle within {self.settle_timeout:.2f}s (at {timecode}).")
+        return timecode
+
+    def settle_summary(self):
+        latencies = sorted(self.settle_latencies)
+        if not latencies:
+            return {"count": 0, "timeouts": 0}
+        return {
+            "count": len(latencies),
+            "timeouts": self.settle_timeouts,
+            "min_ms": round(latencies[0] * 1000, 1),
+            "median_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1),
+        }
+
+
+def delete_album_stills(project):
+    get_resolve().OpenPage("color")
+    gallery = project.GetGallery()
+    currentStillAlbum = gallery.GetCurrentStillAlbum()
+    stills = currentStillAlbum.GetStills()
+    if stills:
+        success = currentStillAlbum.DeleteStills(stills)
+        if success:
+            print("All stills have been successfully deleted.")
+        else:
+            print("Failed to delete stills.")
+    else:
+        print("No stills found in the album.")
+
+
+# -----------------------------------------------------------------------------
+# 6) Export Markers to Excel
+# -----------------------------------------------------------------------------
+
+def _still_export_path(output_path, prefix, label, still_format="png"):
+    return os.path.join(output_path, f"{prefix}_{label}.{still_format}")
+
+
+def export_stills(album, stills, output_path, batch_size=None, still_format="png", first_index=0):
+    """
+    Export stills with one ExportStills() call per batch instead of one per still.
+
+    Resolve names exported files "<prefix>_<still label>", so every still is first
+    labelled with its 1-based position (counted from first_index), which makes each
+    file path known up front and no directory listing is needed. Stills whose file
+    does not show up (older Resolve without SetLabel) are exported again one by one
+    under their own prefix.
+    Returns the exported paths in still order, None where nothing was exported.
+    """
+    if batch_size is None:
+        batch_size = int(_load_settings().get("still_export_batch_size", STILL_EXPORT_BATCH_SIZE))
+    batch_size = max(1, batch_size)
+    paths = [None] * len(stills)
+
+    for batch_start in range(0, len(stills), batch_size):
+        started = time.perf_counter()
+        batch = [(i, still) for i, still in enumerate(stills[batch_start:batch_start + batch_size], batch_start)
+                 if still is not None]
+        labelled = []
+        for i, still in batch:
+            label = f"{first_index + i + 1:03d}"
+            if _safe_timeline_item_call(album, "SetLabel", still, label) is True:
+                labelled.append((i, still, label))
+
+        if labelled:
+            album.ExportStills([still for _, still, _ in labelled], output_path, "tmp", still_format)
+            for i, _, label in labelled:
+                path = _still_export_path(output_path, "tmp", label, still_format)
+                if os.path.exists(path):
+                    paths[i] = path
+
+        for i, still in batch:
+            if paths[i] is not None:
+                continue
+            prefix = f"tmp_{first_index + i + 1:03d}"
+            album.ExportStills([still], output_path, prefix, still_format)
+            label = _safe_timeline_item_call(album, "GetLabel", still)
+            path = _still_export_path(output_path, prefix, label, still_format) if label else None
+            if path and os.path.exists(path):
+                paths[i] = path
+            else:
+                found = sorted(glob.glob(os.path.join(glob.escape(output_path), f"{prefix}_*.{still_format}")))
+                paths[i] = found[0] if found else None
+
+        batch_end = batch_start + len(stills[batch_start:batch_start + batch_size])
+        print(
+            f"Exported stills {first_index + batch_start + 1}-{first_index + batch_end} "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+    return paths
+
+
+def _thumbnail_size(width, height, max_size):
+    if width > height:
+        new_width = int(max_size)
+        new_height = int((max_size / width) * height)
+    else:
+        new_height = int(max_size)
+        new_width = int((max_size / height) * width)
+    return max(new_width, 1), max(new_height, 1)
+
+
+def resize_thumbnail(job):
+    """
+    Downscale one exported still and encode it in memory. Runs in worker processes,
+    so it takes and returns plain values:
+    (source_path, max_size, options, target_path) -> (image bytes, width, height).
+    The encoded thumbnail is also written to target_path unless it is None, and
+    the full-size source is removed.
+    """
+    from PIL import Image
+
+    source_path, max_size, options, target_path = job
+    with Image.open(source_path) as image:
+        new_size = _thumbnail_size(image.width, image.height, max_size)
+        # Decode at reduced scale where the format supports it (JPEG), then let
+        # reduce() do the bulk of the downscale before the final filter.
+        image.draft(image.mode, new_size)
+        try:
+            resized_image = image.resize(new_size, reducing_gap=3.0)
+        except ValueError:
+            resized_image = image.resize(new_size)
+
+    buffer = io.BytesIO()
+    if options.get("format") == "jpeg":
+        if resized_image.mode != "RGB":
+            resized_image = resized_image.convert("RGB")
+        resized_image.save(buffer, "JPEG", quality=int(options.get("quality", 85)), optimize=True)
+    else:
+        resized_image.save(buffer, "PNG")
+    data = buffer.getvalue()
+
+    if target_path is not None:
+        with open(target_path, "wb") as f:
+            f.write(data)
+    if os.path.abspath(source_path) != os.path.abspath(target_path or ""):
+        os.remove(source_path)
+    return data, new_size[0], new_size[1]
+
+
+def _process_pool_supported():
+    # Worker processes are started from sys.executable. That is fine for a frozen
+    # build or a Python interpreter, but not when Resolve itself hosts the script.
+    if getattr(sys, "frozen", False):
+        return True
+    return os.path.basename(sys.executable).lower().startswith("python")
+
+
+def _resize_workers(workers=None):
+    # settings.json "resize_workers", default one per core
+    if workers is None:
+        workers = int(_load_settings().get("resize_workers", 0)) or os.cpu_count() or 1
+    return max(1, workers)
+
+
+def _resize_executor(workers):
+    """A process pool for resize_thumbnail(), or None to resize in this process."""
+    if workers <= 1 or not _process_pool_supported():
+        return None
+    try:
+        return concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    except (OSError, NotImplementedError) as e:
+        print("Resize process pool unavailable, resizing in this process:", e)
+        return None
+
+
+def _thumbnail_extension(thumbnail_options):
+    return "jpg" if thumbnail_options.get("format") == "jpeg" else "png"
+
+
+class FormatRegistry:
+    """Interns xlsxwriter formats, so each distinct style is added to the workbook once."""
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self._formats = {}
+
+    def get(self, properties):
+        key = tuple(sorted(properties.items()))
+        cell_format = self._formats.get(key)
+        if cell_format is None:
+            cell_format = self.workbook.add_format(properties)
+            self._formats[key] = cell_format
+        return cell_format
+
+
+class ShotlistWorkbook:
+    """
+    An xlsxwriter workbook with its format registry, shared by one
+    ShotlistWorkbookWriter per sheet. Sheets of a batch export are written from
+    several pipelines at once, so writers hold the lock while touching it.
+    Spilled thumbnails are kept until close(), when xlsxwriter reads them.
+    """
+
+    def __init__(self, workbook_path, constant_memory=False):
+        self.path = workbook_path
+        self.constant_memory = constant_memory
+        import xlsxwriter
+
+        self.workbook = xlsxwriter.Workbook(workbook_path, {"constant_memory": constant_memory})
+        self.formats = FormatRegistry(self.workbook)
+        self.lock = threading.Lock()
+        self._spill_dir = None
+
+    def spill_dir(self):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.TemporaryDirectory(prefix="shotlist_")
+        return self._spill_dir.name
+
+    def close(self):
+        with self.lock:
+            self.workbook.close()
+        if self._spill_dir is not None:
+            self._spill_dir.cleanup()
+            self._spill_dir = None
+
+
+def _sheet_name(name, used):
+    # Excel sheet names: at most 31 characters, none of []:*?/\, unique in the workbook
+    base = "".join("_" if c in '[]:*?/\\' else c for c in str(name or "Sheet")).strip("'")[:31] or "Sheet"
+    sheet_name = base
+    counter = 2
+    while sheet_name.lower() in used:
+        suffix = f" ({counter})"
+        sheet_name = base[:31 - len(suffix)] + suffix
+        counter += 1
+    used.add(sheet_name.lower())
+    return sheet_name
+
+
+class ShotlistWorkbookWriter:
+    """
+    Writes the shotlist sheet in a single pass, strictly in row order: each
+    write_row() call emits the data cells, the color cell, the thumbnail and the
+    row height of one marker together, and nothing is revisited afterwards.
+
+    With constant_memory=True xlsxwriter flushes every finished row to disk, and
+    thumbnails that only exist in memory are spilled to a temporary folder and
+    inserted by file name (xlsxwriter keeps image_data buffers until close), so
+    memory use does not grow with the number of markers.
+
+    Given a ShotlistWorkbook, the sheet is added to it and the workbook is left
+    open on close() for its owner to close; otherwise the writer has its own.
+    """
+
+    def __init__(self, workbook_path, selected_fields, constant_memory=False, book=None, sheet_name=None):
+        self.selected_fields = list(selected_fields)
+        self.owns_book = book is None
+        if book is None:
+            book = ShotlistWorkbook(workbook_path, constant_memory)
+        self.book = book
+        self.constant_memory = book.constant_memory
+        self.workbook = book.workbook
+        with book.lock:
+            self.worksheet = self.workbook.add_worksheet(sheet_name)
+        self.formats = book.formats
+        self.text_format = self.formats.get({"valign": "vcenter", "align": "left"})
+        self.image_col_index = (
+            self.selected_fields.index(THUMBNAIL_FIELD) if THUMBNAIL_FIELD in self.selected_fields else None
+        )
+        self.image_col_width = None
+        self.col_pixels = {}
+        self._spill_dir = None
+        self.row = 0
+        with book.lock:
+            for col_num, header in enumerate(self.selected_fields):
+                self._write_cell(0, col_num, header, self.text_format)
+
+    def _image_options(self, thumbnail):
+        options = {"x_scale": 1, "y_scale": 1, "object_position": 1}
+        image_path = thumbnail.get("path")
+        if image_path is None and self.constant_memory:
+            if self._spill_dir is None:
+                self._spill_dir = tempfile.mkdtemp(dir=self.book.spill_dir())
+            image_path = os.path.join(self._spill_dir, thumbnail["name"])
+            with open(image_path, "wb") as f:
+                f.write(thumbnail["data"])
+        if image_path is None:
+            options["image_data"] = io.BytesIO(thumbnail["data"])
+            image_path = thumbnail["name"]
+        return image_path, options
+
+    def _write_cell(self, row, col, value, cell_format):
+        self.worksheet.write(row, col, value, cell_format)
+        length = _cell_pixel_width(value)
+        if length > self.col_pixels.get(col, 0):
+            self.col_pixels[col] = length
+
+    def column_widths(self):
+        """
+        Column widths measured the way worksheet.autofit() measures them, with
+        per-field caps applied, and the image column widened to fit the thumbnails.
+        """
+        widths = {}
+        for col, pixels in self.col_pixels.items():
+            cap = COLUMN_WIDTH_CAPS.get(self.selected_fields[col], MAX_COLUMN_WIDTH)
+            widths[col] = min(_pixels_to_width(pixels + 7), cap, MAX_COLUMN_WIDTH)
+        if self.image_col_width is not None:
+            widths[self.image_col_index] = max(widths.get(self.image_col_index, 0), self.image_col_width)
+        return widths
+
+    def write_row(self, data_row, thumbnail=None):
+        """
+        Write the next marker row. thumbnail is a dict with "name", "data" (encoded
+        image bytes), "path" (file on disk or None), "width" and "height".
+        """
+        with self.book.lock:
+            self._write_row(data_row, thumbnail)
+
+    def _write_row(self, data_row, thumbnail):
+        self.row += 1
+        row = self.row
+        if thumbnail is not None and self.image_col_index is not None:
+            self.worksheet.set_row(row, thumbnail["height"] / 1.33)
+
+        for col, field in enumerate(self.selected_fields):
+            if field == THUMBNAIL_FIELD:
+                self.worksheet.write(row, col, "", self.text_format)
+            elif field == "Color":
+                self.worksheet.write(row, col, "", get_color_format(self.formats, data_row.get(field, "")))
+            else:
+                self._write_cell(row, col, data_row.get(field, ""), self.text_format)
+
+        if thumbnail is not None and self.image_col_index is not None:
+            with profile_phase("insert image"):
+                image_path, options = self._image_options(thumbnail)
+                self.worksheet.insert_image(row, self.image_col_index, image_path, options)
+            self.image_col_width = max(self.image_col_width or 0, thumbnail["width"] / 6)
+
+    def close(self):
+        # Widths were tracked while writing, so no pass over the finished sheet is
+        # needed (worksheet.autofit() is also unavailable in constant_memory mode)
+        with self.book.lock:
+            for col, width in self.column_widths().items():
+                self.worksheet.set_column(col, col, width)
+        if self.owns_book:
+            self.book.close()
+
+
+class TextShotlistWriter:
+    """
+    Streams the shotlist as text with the interface of ShotlistWorkbookWriter:
+    every write_row() goes straight to disk as one line, nothing is kept in
+    memory, and a run that is stopped leaves a readable file. Columns follow
+    selected_fields; THUMBNAIL_FIELD holds the thumbnail's path relative to the
+    output file (see output_thumbnail_options()). Subclasses format the lines.
+    """
+
+    def __init__(self, path, selected_fields, constant_memory=False, book=None, sheet_name=None):
+        self.path = path
+        self.folder = os.path.dirname(os.path.abspath(path))
+        self.selected_fields = list(selected_fields)
+        # Line buffered, so every row is on disk as soon as it is written
+        self.file = open(path, "w", encoding="utf-8", newline="", buffering=1)
+        self._write_header()
+
+    def _write_header(self):
+        pass
+
+    def _thumbnail_path(self, thumbnail):
+        if thumbnail is None or thumbnail.get("path") is None:
+            return None
+        return os.path.relpath(thumbnail["path"], self.folder).replace(os.sep, "/")
+
+    def _values(self, data_row, thumbnail):
+        return [
+            self._thumbnail_path(thumbnail) if field == THUMBNAIL_FIELD else data_row.get(field, "")
+            for field in self.selected_fields
+        ]
+
+    def close(self):
+        self.file.close()
+
+
+class CsvShotlistWriter(TextShotlistWriter):
+    def _write_header(self):
+        self.csv = csv.writer(self.file, lineterminator="\n")
+        self.csv.writerow(self.selected_fields)
+
+    def write_row(self, data_row, thumbnail=None):
+        self.csv.writerow(["" if value is None else value for value in self._values(data_row, thumbnail)])
+
+
+class JsonlShotlistWriter(TextShotlistWriter):
+    def write_row(self, data_row, thumbnail=None):
+        row = dict(zip(self.selected_fields, self._values(data_row, thumbnail)))
+        self.file.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+
+
+def output_thumbnail_options(path, thumbnail_options=None):
+    """
+    Thumbnail options for an output file. Only workbooks embed the images, CSV
+    and JSONL refer to the files, so those always keep them.
+    """
+    thumbnail_options = dict(DEFAULT_THUMBNAIL_OPTIONS, **(thumbnail_options or {}))
+    if os.path.splitext(path)[1].lower() in (".csv", ".jsonl"):
+        thumbnail_options["keep_files"] = True
+    return thumbnail_options
+
+
+def open_shotlist_writer(path, selected_fields, constant_memory=False, book=None, sheet_name=None):
+    """The shotlist writer for the format of path: .csv, .jsonl, or an Excel workbook."""
+    writer_class = {
+        ".csv": CsvShotlistWriter,
+        ".jsonl": JsonlShotlistWriter,
+    }.get(os.path.splitext(path)[1].lower(), ShotlistWorkbookWriter)
+    return writer_class(path, selected_fields, constant_memory, book, sheet_name)
+
+
+def _pixels_to_width(pixels):
+    # Same conversion xlsxwriter uses for Calibri 11: 7px per digit, 5px padding
+    if pixels <= 12:
+        return pixels / 12.0
+    return (pixels - 5) / 7.0
+
+
+def _cell_pixel_width(value):
+    """Display width in pixels of a cell value, matching worksheet.autofit()."""
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 31 if value else 36
+    if isinstance(value, (int, float)):
+        return 7 * len(str(value))
+    if isinstance(value, str):
+        from xlsxwriter.utility import xl_pixel_width
+
+        return max(xl_pixel_width(line) for line in value.split("\n"))
+    return 0
+
+
+def _use_constant_memory(row_count):
+    setting = _load_settings().get("constant_memory")
+    if setting is not None:
+        return bool(setting)
+    return row_count >= CONSTANT_MEMORY_MIN_ROWS
+
+
+def _marker_row(frame, marker, timecode, metadata):
+    data_row = {
+        "Frame": frame,
+        "Name": marker["name"],
+        "Note": marker["note"],
+        "Duration": marker["duration"],
+        "Color": marker["color"],
+        "Timecode": timecode
+    }
+    data_row.update(metadata)
+    return data_row
+
+
+class CaptureJournal:
+    """
+    Append-only JSONL checkpoint of a capture run, kept next to the workbook.
+
+    The first line describes the run (timeline, fields, thumbnail settings); every
+    further line is one finished marker with its timecode, row data, still label
+    and thumbnail file. Lines are flushed as they are written, so after a crash or
+    a hung Resolve the run can be resumed from the first marker that is missing.
+    Thumbnails that would only live in memory are kept in a folder beside the
+    journal until the export completes, when both are removed.
+    """
+
+    def __init__(self, workbook_path):
+        folder, file_name = os.path.split(workbook_path)
+        stem = os.path.splitext(file_name)[0]
+        self.path = os.path.join(folder, f".{stem}.journal.jsonl")
+        self.thumbnail_dir = os.path.join(folder, f".{stem}.journal")
+        self._file = None
+        self._lock = threading.Lock()
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        """Return (run header or None, {marker index: entry}) from an existing journal."""
+        header = None
+        entries = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash
+                        continue
+                    if record.get("type") == "run":
+                        header = record
+                    elif record.get("type") == "marker":
+                        entries[record["index"]] = record
+        except OSError:
+            pass
+        return header, entries
+
+    def start(self, header, resume=False):
+        if resume:
+            self._file = open(self.path, "a", encoding="utf-8")
+        else:
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._append(dict(header, type="run"))
+
+    def _append(self, record):
+        with self._lock:
+            self._file.write(json.dumps(record, default=str) + "\n")
+            self._file.flush()
+
+    def record(self, index, data_row, still_label, thumbnail):
+        self._append({
+            "type": "marker",
+            "index": index,
+            "frame": data_row.get("Frame"),
+            "timecode": data_row.get("Timecode"),
+            "still": still_label,
+            "row": data_row,
+            "thumbnail": None if thumbnail is None else {
+                key: thumbnail[key] for key in ("name", "path", "width", "height")
+            },
+        })
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+        if os.path.isdir(self.thumbnail_dir):
+            for name in os.listdir(self.thumbnail_dir):
+                os.remove(os.path.join(self.thumbnail_dir, name))
+            os.rmdir(self.thumbnail_dir)
+
+
+def manifest_path(workbook_path):
+    return os.path.splitext(workbook_path)[0] + ".manifest.json"
+
+
+def _manifest_variant(image_size, thumbnail_format):
+    return f"{image_size}.{thumbnail_format}"
+
+
+def write_manifest(path, header, markers):
+    """
+    Write the manifest of a finished export, next to its thumbnails: per marker the
+    frame, name, note, color, the clip and source frame under it and the thumbnail
+    file with its hash. If it lists thumbnail files it is remembered in
+    settings.json as the timeline's latest export at that thumbnail size and
+    format, for the next export of that timeline to reuse thumbnails from.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict(header, markers=markers), f, indent=1, default=str)
+    if header.get("timeline") and any((marker.get("thumbnail") or {}).get("file") for marker in markers):
+        settings = _load_settings()
+        manifests = settings.get("manifests") or {}
+        variants = manifests.get(str(header["timeline"]))
+        if not isinstance(variants, dict):
+            variants = {}
+        variant = _manifest_variant(header.get("image_size"), header.get("thumbnail_format"))
+        _discard_set_aside_export(variants.get(variant))
+        variants[variant] = path
+        manifests[str(header["timeline"])] = variants
+        settings["manifests"] = manifests
+        _save_settings(settings)
+    return path
+
+
+def previous_manifest_path(timeline_id, image_size, thumbnail_format):
+    """
+    Manifest of the timeline's last export at this thumbnail size and format,
+    unless settings.json has "reuse_thumbnails": false.
+    """
+    settings = _load_settings()
+    if not timeline_id or settings.get("reuse_thumbnails", True) is False:
+        return None
+    variants = (settings.get("manifests") or {}).get(str(timeline_id))
+    if not isinstance(variants, dict):
+        # Written before manifests were kept per size and format
+        variants = {}
+    path = variants.get(_manifest_variant(image_size, thumbnail_format))
+    return path if path and os.path.exists(path) else None
+
+
+def _previous_exports_dir():
+    return os.path.join(os.path.dirname(_get_config_path()), PREVIOUS_EXPORTS_DIRNAME)
+
+
+def set_aside_previous_exports(folder_path):
+    """
+    Before an export folder is cleared for Replace: move the registered manifests
+    in it, with the thumbnails they list, next to settings.json and point
+    settings.json at the moved copies. The new export then still reuses them.
+    """
+    settings = _load_settings()
+    manifests = settings.get("manifests") or {}
+    folder = os.path.abspath(folder_path) + os.sep
+    moved = False
+    for timeline_id, variants in manifests.items():
+        if not isinstance(variants, dict):
+            continue
+        for variant, path in variants.items():
+            if not path or not os.path.abspath(path).startswith(folder) or not os.path.exists(path):
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    markers = json.load(f).get("markers") or []
+            except (OSError, ValueError):
+                continue
+            target = os.path.join(_previous_exports_dir(), _safe_file_name(timeline_id), variant)
+            _discard_set_aside_export(os.path.join(target, os.path.basename(path)))
+            os.makedirs(target, exist_ok=True)
+            for marker in markers:
+                name = (marker.get("thumbnail") or {}).get("file")
+                if name and os.path.exists(os.path.join(os.path.dirname(path), name)):
+                    shutil.move(os.path.join(os.path.dirname(path), name), os.path.join(target, name))
+            variants[variant] = shutil.move(path, os.path.join(target, os.path.basename(path)))
+            moved = True
+    if moved:
+        settings["manifests"] = manifests
+        _save_settings(settings)
+
+
+def _discard_set_aside_export(path):
+    # A set-aside export is only kept until its timeline is exported again
+    if path and os.path.abspath(path).startswith(os.path.abspath(_previous_exports_dir()) + os.sep):
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+
+def load_reusable_thumbnails(path, image_size, thumbnail_format):
+    """
+    Thumbnails listed in a manifest, keyed by (clip id, source frame, grade
+    fingerprint), as {key: (thumbnail file path, manifest thumbnail entry)}. Empty
+    if the manifest cannot be read or was made with another thumbnail size or
+    format. Markers recorded without a grade fingerprint are left out.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("image_size") != image_size or manifest.get("thumbnail_format") != thumbnail_format:
+        return {}
+    folder = os.path.dirname(path)
+    reusable = {}
+    for marker in manifest.get("markers") or []:
+        thumbnail = marker.get("thumbnail")
+        key = (marker.get("clip"), marker.get("source_frame"), marker.get("grade"))
+        if not thumbnail or not thumbnail.get("file") or None in key:
+            continue
+        reusable[key] = (os.path.join(folder, thumbnail["file"]), thumbnail)
+    return reusable
+
+
+class ThumbnailStore:
+    """
+    Content-addressed store of stills next to settings.json, shared by every
+    timeline and project. It holds the thumbnails of a still per size and format,
+    and with "thumbnail_store_full_resolution": true in settings.json also its
+    full-resolution export, under a key made from the media pool item, the source
+    frame and the grade fingerprint. The same shot in another timeline, version
+    or reel is then taken from disk instead of being grabbed again.
+
+    Files are named after the hash of their content, so identical images are
+    stored once. An SQLite index maps keys to files. Past max_bytes the
+    full-resolution files go first, least recently used first, and thumbnails
+    only once those are gone. Any database error turns the store into a no-op.
+    """
+
+    FULL_RESOLUTION = "full"
+
+    def __init__(self, path=None, max_bytes=None):
+        if path is None:
+            path = os.path.join(os.path.dirname(_get_config_path()), THUMBNAIL_STORE_DIRNAME)
+        if max_bytes is None:
+            max_bytes = int(_load_settings().get("thumbnail_store_max_mb", THUMBNAIL_STORE_MAX_MB)) * 1024 * 1024
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = None
+        try:
+            os.makedirs(path, exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(path, "index.sqlite3"), check_same_thread=False)
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT, variant TEXT, blob TEXT, width INTEGER, height INTEGER,
+                    PRIMARY KEY (key, variant));
+                CREATE TABLE IF NOT EXISTS blobs (
+                    blob TEXT PRIMARY KEY, size INTEGER, last_used REAL);
+                """
+            )
+        except (OSError, sqlite3.Error) as e:
+            print("Thumbnail store disabled:", e)
+            self._db = None
+
+    @staticmethod
+    def key(media_pool_id, source_frame, grade, resolution=None):
+        return hashlib.sha1(
+            json.dumps([media_pool_id, source_frame, grade, resolution], default=str).encode("utf-8")
+        ).hexdigest()
+
+    @staticmethod
+    def variant(image_size, thumbnail_options):
+        if thumbnail_options.get("format") == "jpeg":
+            return f"{image_size}.q{int(thumbnail_options.get('quality', 85))}.jpg"
+        return f"{image_size}.png"
+
+    def _execute(self, sql, params=(), many=False):
+        if self._db is None:
+            return []
+        with self._lock:
+            try:
+                with self._db:
+                    if many:
+                        self._db.executemany(sql, params)
+                        return []
+                    return self._db.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                print("Thumbnail store error:", e)
+                return []
+
+    def _blob_path(self, blob):
+        return os.path.join(self.path, blob[:2], blob)
+
+    def get(self, key, variant):
+        """(file path, width, height) of a stored image, or None."""
+        rows = self._execute(
+            "SELECT blob, width, height FROM entries WHERE key = ? AND variant = ?", (key, variant)
+        )
+        if not rows or not os.path.exists(self._blob_path(rows[0][0])):
+            self.misses += 1
+            return None
+        blob, width, height = rows[0]
+        self._execute("UPDATE blobs SET last_used = ? WHERE blob = ?", (time.time(), blob))
+        self.hits += 1
+        return self._blob_path(blob), width, height
+
+    def put(self, key, variant, data=None, source_path=None, width=None, height=None):
+        """Store image bytes, or a copy of the file at source_path, under (key, variant)."""
+        if self._db is None:
+            return
+        try:
+            if data is None:
+                with open(source_path, "rb") as f:
+                    data = f.read()
+            blob = hashlib.sha1(data).hexdigest() + os.path.splitext(source_path or variant)[1]
+            blob_path = self._blob_path(blob)
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                partial_path = blob_path + f".{threading.get_ident()}.part"
+                with open(partial_path, "wb") as f:
+                    f.write(data)
+                os.replace(partial_path, blob_path)
+        except OSError as e:
+            print("Thumbnail store error:", e)
+            return
+        previous = self._execute("SELECT blob FROM entries WHERE key = ? AND variant = ?", (key, variant))
+        self._execute("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?)", (blob, len(data), time.time()))
+        self._execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)", (key, variant, blob, width, height)
+        )
+        if previous and previous[0][0] != blob:
+            self._drop_unreferenced([previous[0][0]])
+        self._evict()
+
+    def _drop_unreferenced(self, blobs):
+        for blob in blobs:
+            if self._execute("SELECT 1 FROM entries WHERE blob = ? LIMIT 1", (blob,)):
+                continue
+            self._execute("DELETE FROM blobs WHERE blob = ?", (blob,))
+            try:
+                os.remove(self._blob_path(blob))
+            except OSError:
+                pass
+
+    def _evict(self):
+        total = self._execute("SELECT IFNULL(SUM(size), 0) FROM blobs")
+        if not total or total[0][0] <= self.max_bytes:
+            return
+        # Keep the most recently used files that fit into 90% of the quota, drop the
+        # rest. Thumbnails are kept before any full-resolution still: they are small
+        # and are what a later export takes as they are.
+        budget = self.max_bytes * 0.9
+        kept = 0
+        doomed = []
+        rows = self._execute(
+            "SELECT blob, size FROM blobs ORDER BY EXISTS("
+            "SELECT 1 FROM entries WHERE entries.blob = blobs.blob AND variant != ?) DESC, last_used DESC",
+            (self.FULL_RESOLUTION,),
+        )
+        for blob, size in rows:
+            kept += size
+            if kept > budget:
+                doomed.append((blob,))
+        self._execute("DELETE FROM entries WHERE blob = ?", doomed, many=True)
+        self._drop_unreferenced([blob for (blob,) in doomed])
+
+    def close(self):
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
+
+
+def profile_path(workbook_path):
+    return os.path.splitext(workbook_path)[0] + ".profile.json"
+
+
+class _ProfiledObject:
+    """Stands in for a Resolve object and reports each method call to the profiler."""
+
+    __slots__ = ("_target", "_profiler")
+
+    def __init__(self, target, profiler):
+        self._target = target
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+        profiler = self._profiler
+
+        def call(*args, **kwargs):
+            args = [_unwrap_profiled(arg) for arg in args]
+            kwargs = {key: _unwrap_profiled(value) for key, value in kwargs.items()}
+            started = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            finally:
+                profiler.rpc(name, time.perf_counter() - started)
+            return profiler.wrap(result)
+
+        return call
+
+    def __eq__(self, other):
+        return self._target == _unwrap_profiled(other)
+
+    def __hash__(self):
+        return hash(self._target)
+
+
+def _unwrap_profiled(value):
+    if isinstance(value, _ProfiledObject):
+        return value._target
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap_profiled(v) for v in value)
+    if isinstance(value, dict):
+        return {key: _unwrap_profiled(v) for key, v in value.items()}
+    return value
+
+
+# The profiler of the export that is running, if profiling is on
+_profiler = None
+_NO_PHASE = contextlib.nullcontext()
+
+
+def profile_phase(name):
+    """Times a phase of the running export when profiling is on, does nothing otherwise."""
+    profiler = _profiler
+    return _NO_PHASE if profiler is None else profiler.phase(name)
+
+
+def profile_thread():
+    """cProfiles the calling thread while the running export has cProfile on."""
+    profiler = _profiler
+    return _NO_PHASE if profiler is None else profiler.thread()
+
+
+class RunProfiler:
+    """
+    Opt-in instrumentation of one export. Resolve objects passed through wrap()
+    count and time every method call by name, profile_phase() blocks add up per
+    phase, and finish() writes a JSON report next to the workbook. Optionally the
+    run is also profiled with cProfile (every stage thread, saved as .pstats) and
+    tracemalloc (peak and top allocation sites in the report).
+
+    Turned on with "profile": true in settings.json ("profile_cprofile" and
+    "profile_tracemalloc" for the extras) or --profile on the command line. When
+    off, no object is wrapped and profile_phase() returns a shared no-op context.
+    Phases of different stages overlap in time, so phase totals add up to more
+    than the wall time of the run.
+    """
+
+    def __init__(self, report_path, cprofile=False, trace_memory=False):
+        self.report_path = report_path
+        self.cprofile = cprofile
+        self.trace_memory = trace_memory
+        self.rpc_calls = {}
+        self.phases = {}
+        self._profiles = {}
+        self._lock = threading.Lock()
+        self._started = None
+
+    @classmethod
+    def from_settings(cls, workbook_path, enabled=None, cprofile=None, trace_memory=None):
+        """A profiler if profiling is turned on (arguments override settings.json), else None."""
+        settings = _load_settings()
+        cprofile = bool(settings.get("profile_cprofile")) if cprofile is None else cprofile
+        trace_memory = bool(settings.get("profile_tracemalloc")) if trace_memory is None else trace_memory
+        if enabled is None:
+            enabled = bool(settings.get("profile")) or cprofile or trace_memory
+        if not enabled:
+            return None
+        return cls(profile_path(workbook_path), cprofile, trace_memory)
+
+    def wrap(self, value):
+        """value with every Resolve object in it replaced by a counting proxy."""
+        if value is None or isinstance(value, (str, bytes, int, float, _ProfiledObject)):
+            return value
+        if isinstance(value, (list, tuple)):
+            return type(value)(self.wrap(v) for v in value)
+        if isinstance(value, dict):
+            return {key: self.wrap(v) for key, v in value.items()}
+        return _ProfiledObject(value, self)
+
+    def rpc(self, name, seconds):
+        with self._lock:
+            stats = self.rpc_calls.setdefault(name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            with self._lock:
+                stats = self.phases.setdefault(name, [0, 0.0, 0.0])
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+
+    @contextlib.contextmanager
+    def thread(self):
+        """cProfile the calling thread for the duration, if cProfile is on and it isn't already."""
+        ident = threading.get_ident()
+        if not self.cprofile or ident in self._profiles:
+            yield
+            return
+        import cProfile
+
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles[ident] = profile
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                # Finished threads keep their data under a key no live thread has
+                self._profiles[(ident, id(profile))] = self._profiles.pop(ident)
+
+    def start(self):
+        global _profiler
+        self._started = time.perf_counter()
+        if self.trace_memory:
+            import tracemalloc
+
+            tracemalloc.start()
+        self._thread = self.thread()
+        self._thread.__enter__()
+        _profiler = self
+        print("Profiling this export, report:", self.report_path)
+
+    def finish(self, summaries=None):
+        """Stop profiling and write the report. Returns its path."""
+        global _profiler
+        _profiler = None
+        self._thread.__exit__(None, None, None)
+        seconds = time.perf_counter() - self._started
+
+        def table(calls):
+            return {
+                name: {
+                    "count": count,
+                    "seconds": round(total, 4),
+                    "mean_ms": round(total * 1000 / count, 3),
+                    "max_ms": round(longest * 1000, 3),
+                }
+                for name, (count, total, longest) in sorted(calls.items(), key=lambda kv: -kv[1][1])
+            }
+
+        report = {
+            "version": APP_VERSION,
+            "seconds": round(seconds, 3),
+            "phases": table(self.phases),
+            "rpc": {
+                "calls": sum(count for count, _, _ in self.rpc_calls.values()),
+                "seconds": round(sum(total for _, total, _ in self.rpc_calls.values()), 4),
+                "methods": table(self.rpc_calls),
+            },
+            "timelines": summaries or [],
+        }
+        if self.trace_memory:
+            import tracemalloc
+
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            report["tracemalloc"] = {
+                "current_mb": round(current / 1048576, 2),
+                "peak_mb": round(peak / 1048576, 2),
+                "top": [
+                    {"where": str(stat.traceback), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+                    for stat in snapshot.statistics("lineno")[:25]
+                ],
+            }
+        if self._profiles:
+            import pstats
+
+            stats_path = os.path.splitext(self.report_path)[0] + ".pstats"
+            stats = pstats.Stats(*self._profiles.values())
+            stats.dump_stats(stats_path)
+            report["cprofile"] = stats_path
+        try:
+            with open(self.report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        except OSError as e:
+            print("Could not write the profiling report:", e)
+        print(
+            f"Profile: {report['rpc']['calls']} Resolve calls in {report['rpc']['seconds']:.2f}s, "
+            f"run {seconds:.2f}s, report {self.report_path}"
+        )
+        return self.report_path
+
+
+def plan_thumbnail_files(output_path, count, thumbnail_options, ask=True):
+    """
+    Name the thumbnail of every marker before anything is captured, so the
+    pipeline never has to stop for a prompt. With ask=True a clash with an
+    existing file is resolved by asking the user. Returns (name, path) pairs in
+    marker order, path None when files are not kept, or None if the user cancelled.
+    """
+    thumbnail_options = dict(DEFAULT_THUMBNAIL_OPTIONS, **(thumbnail_options or {}))
+    extension = _thumbnail_extension(thumbnail_options)
+    planned = []
+    for i in range(count):
+        new_name = f"thumb{i + 1:03d}.{extension}"
+        image_file_path = None
+
+        if thumbnail_options["keep_files"]:
+            while ask and os.path.exists(os.path.join(output_path, new_name)):
+                action = ask_replace_or_rename(new_name)
+                if action == "replace":
+                    os.remove(os.path.join(output_path, new_name))
+                elif action == "rename":
+                    new_name, ok = QtWidgets.QInputDialog.getText(
+                        None, "Rename", "Enter new name for the image:", text=new_name
+                    )
+                    if not ok or not new_name:
+                        return None
+                else:
+                    return None
+            image_file_path = os.path.normpath(os.path.join(output_path, new_name))
+        planned.append((new_name, image_file_path))
+    return planned
+
+
+class CapturePipeline:
+    """
+    Captures the markers and writes the shotlist as one pipeline instead of phase
+    by phase.
+
+    The calling thread moves the playhead onto each marker, grabs a still and
+    collects the clip metadata. An export thread sends the grabbed stills to disk,
+    one ExportStills() call for whatever has queued up, and hands each file to the
+    resize process pool. A writer thread adds the rows to the workbook in marker
+    order as their thumbnails come back. So marker N+1 is being grabbed while still
+    N is exported, resized and written. The queues between the stages are bounded:
+    a slow stage holds the earlier ones back instead of letting work pile up.
+
+    Without the thumbnail column the playhead is not moved and no stills are
+    grabbed; rows go straight from the markers to the writer.
+
+    progress_callback(stage, done, total) is called from the stage threads, stage
+    being one of STAGES. Once should_stop() returns True no further marker is
+    captured; the markers captured so far are still exported and written, so the
+    workbook is complete up to that marker. confirm_keyboard is passed on to the
+    MarkerNavigator.
+
+    With a CaptureJournal every written marker is checkpointed. With resume=True
+    the markers already in a matching journal are not captured again: their rows
+    and thumbnails come from the journal and capture continues from the first
+    missing marker. The journal is removed once a run completes.
+
+    A finished run writes a manifest next to the workbook. Given the manifest of
+    an earlier export (previous_manifest), markers that land on the same clip and
+    source frame as a marker there, with the same grade fingerprint, reuse its
+    thumbnail file instead of being navigated to and grabbed again, so a
+    re-export only grabs what has changed.
+    Markers on a shot found in the ThumbnailStore are taken from there: as a
+    finished thumbnail, or as a full-resolution still that only needs resizing.
+    """
+
+    STAGES = ("capture", "export", "resize", "write")
+
+    def __init__(
+        self, project, timeline, item_index, markers, start_timecode, workbook_path, selected_fields, image_size,
+        thumbnail_options=None, thumbnail_files=None, delete_stills=False, cache=None, queue_size=None,
+        resize_workers=None, progress_callback=None, should_stop=None, journal=None, resume=False,
+        previous_manifest=None, thumbnail_store=None, output_path=None, book=None, sheet_name=None, executor=None,
+        confirm_keyboard=None,
+    ):
+        self.project = project
+        self.timeline = timeline
+        self.item_index = item_index
+        self.markers = markers
+        self.start_timecode = start_timecode
+        self.workbook_path = workbook_path
+        # Thumbnails, exported stills and the manifest go to output_path, by default the workbook's folder
+        self.output_path = output_path or os.path.dirname(workbook_path)
+        self.manifest_file = os.path.join(self.output_path, os.path.basename(manifest_path(workbook_path)))
+        self.book = book
+        self.sheet_name = sheet_name
+        self.executor = executor
+        self.selected_fields = list(selected_fields)
+        self.image_size = image_size
+        self.thumbnail_options = output_thumbnail_options(workbook_path, thumbnail_options)
+        self.grab_stills = THUMBNAIL_FIELD in self.selected_fields
+        if thumbnail_files is None and self.grab_stills:
+            thumbnail_files = plan_thumbnail_files(self.output_path, len(markers), self.thumbnail_options, ask=False)
+        self.thumbnail_files = thumbnail_files
+        # Thumbnails that are not kept still get a file in the journal's folder to
+        # resume from; the workbook inserts them from memory all the same
+        self.journal_files = {}
+        if journal is not None and thumbnail_files is not None:
+            self.journal_files = {
+                idx: os.path.join(journal.thumbnail_dir, name)
+                for idx, (name, path) in enumerate(thumbnail_files) if path is None
+            }
+        self.journal = journal
+        self.journal_finished = False
+        self.resume = resume
+        self.completed = {}
+        self.reusable = {}
+        if previous_manifest and self.grab_stills:
+            self.reusable = load_reusable_thumbnails(previous_manifest, image_size, self.thumbnail_options["format"])
+        self.reused = 0
+        self.store = thumbnail_store if self.grab_stills else None
+        self.store_variant = ThumbnailStore.variant(image_size, self.thumbnail_options)
+        self.store_keys = {}
+        self.from_store = 0
+        self.resolution = (
+            _safe_timeline_item_call(timeline, "GetSetting", "timelineResolutionWidth"),
+            _safe_timeline_item_call(timeline, "GetSetting", "timelineResolutionHeight"),
+        )
+        self.sources = {}
+        self.grades = {}
+        self.manifest_markers = []
+        self.delete_stills = delete_stills
+        self.cache = cache if cache is not None else MetadataCache()
+        self.progress_callback = progress_callback
+        self.should_stop = should_stop
+        self.confirm_keyboard = confirm_keyboard
+        self.total = len(markers)
+        self.timecodes = marker_timecodes(timeline, markers.keys(), start_timecode)
+
+        settings = _load_settings()
+        if queue_size is None:
+            queue_size = int(settings.get("pipeline_queue_size", PIPELINE_QUEUE_SIZE))
+        self.resize_workers = _resize_workers(resize_workers)
+        self.batch_size = max(1, int(settings.get("still_export_batch_size", STILL_EXPORT_BATCH_SIZE)))
+        # Copying every full-size still into the store costs a read, a hash and a
+        # write per marker on the export thread, so it is opt-in
+        self.store_full_resolution = bool(settings.get("thumbnail_store_full_resolution", False))
+        # Stills waiting for export, and rows (with their resize in flight) waiting to be written
+        self._export_queue = queue.Queue(max(1, queue_size))
+        self._write_queue = queue.Queue(max(queue_size, 2 * self.resize_workers))
+
+        self.done = dict.fromkeys(self.STAGES, 0)
+        self.stage_seconds = dict.fromkeys(self.STAGES, 0.0)
+        self.cancelled = False
+        self._lock = threading.Lock()
+        self._failed = threading.Event()
+        self._error = None
+
+    def _advance(self, stage, count=1, seconds=0.0):
+        with self._lock:
+            self.done[stage] += count
+            self.stage_seconds[stage] += seconds
+            done = self.done[stage]
+        if self.progress_callback is not None:
+            self.progress_callback(stage, done, self.total)
+
+    def _put(self, q, item):
+        # Blocks while the next stage is behind; gives up if a stage has failed
+        while not self._failed.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _get(self, q):
+        # None marks the end of the stream, or a failed stage
+        while not self._failed.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return None
+
+    def _run_stage(self, stage, *args):
+        try:
+            with profile_thread():
+                stage(*args)
+        except Exception as e:
+            if self._error is None:
+                self._error = e
+            self._failed.set()
+
+    def _run_header(self):
+        return {
+            "timeline": _safe_timeline_item_call(self.timeline, "GetUniqueId"),
+            "start_timecode": self.start_timecode,
+            "marker_count": self.total,
+            "fields": self.selected_fields,
+            "image_size": self.image_size,
+            "thumbnail_format": self.thumbnail_options["format"],
+            "keep_files": bool(self.thumbnail_options["keep_files"]),
+        }
+
+    def _load_journal(self, header):
+        """Journal entries of markers that are finished and still match the timeline."""
+        if not self.resume or not self.journal.exists():
+            return {}
+        previous, entries = self.journal.load()
+        if previous is None or any(previous.get(key) != value for key, value in header.items()):
+            print("The journal belongs to a different export, starting over.")
+            return {}
+        frames = list(self.markers.keys())
+        completed = {}
+        for idx, entry in entries.items():
+            thumbnail = entry.get("thumbnail")
+            if idx >= len(frames) or entry.get("frame") != frames[idx]:
+                continue
+            if thumbnail is not None and not os.path.exists(thumbnail.get("path") or ""):
+                continue
+            completed[idx] = entry
+        print(f"Resuming: {len(completed)} of {self.total} markers are already done.")
+        return completed
+
+    def _start_journal(self):
+        if self.journal is None:
+            return
+        header = self._run_header()
+        self.completed = self._load_journal(header)
+        if self.journal_files:
+            os.makedirs(self.journal.thumbnail_dir, exist_ok=True)
+        self.journal.start(header, resume=bool(self.completed))
+
+    def _finish_journal(self, closed):
+        if self.journal is None:
+            return
+        if closed and self._error is None and not self.cancelled:
+            if self.book is None:
+                self.journal.discard()
+                return
+            # A shared workbook is only written when its owner closes it, so the
+            # owner removes the journal after that
+            self.journal.close()
+            self.journal_finished = True
+        else:
+            self.journal.close()
+            print("Checkpoint kept for resuming:", self.journal.path)
+
+    def run(self):
+        """Run all stages to the end. Returns a summary dict."""
+        self.start()
+        return self.finish()
+
+    def start(self):
+        """
+        Start the export and write stages and run capture on the calling thread.
+        Returns once every marker is captured, while the last stills may still be
+        exported, resized and written; finish() waits for those. In a batch the
+        next timeline is captured in between.
+        """
+        self._started = time.perf_counter()
+        self._start_journal()
+        self.writer = open_shotlist_writer(
+            self.workbook_path, self.selected_fields, _use_constant_memory(self.total), self.book, self.sheet_name
+        )
+        self._own_executor = self.executor is None
+        if self.grab_stills and self.executor is None:
+            self.executor = _resize_executor(self.resize_workers)
+        self._threads = [threading.Thread(target=self._run_stage, args=(self._write_stage,), daemon=True)]
+        if self.grab_stills:
+            self._threads.append(
+                threading.Thread(target=self._run_stage, args=(self._export_stage, self.executor), daemon=True)
+            )
+        for thread in self._threads:
+            thread.start()
+        try:
+            self._run_stage(self._capture_stage)
+        finally:
+            self._put(self._export_queue if self.grab_stills else self._write_queue, None)
+
+    def finish(self):
+        """Wait for the remaining stages, close the sheet and return a summary dict."""
+        try:
+            for thread in self._threads:
+                thread.join()
+        finally:
+            if self._own_executor and self.executor is not None:
+                self.executor.shutdown()
+            closed = False
+            try:
+                with profile_phase("workbook close"):
+                    self.writer.close()
+                closed = True
+            finally:
+                self._finish_journal(closed)
+        if self._error is not None:
+            raise self._error
+        if not self.cancelled:
+            with profile_phase("manifest"):
+                write_manifest(self.manifest_file, self._run_header(), self.manifest_markers)
+
+        summary = {
+            "markers": self.total,
+            "written": self.done["write"],
+            "cancelled": self.cancelled,
+            "resumed": len(self.completed),
+            "reused": self.reused,
+            "from_store": self.from_store,
+            "seconds": round(time.perf_counter() - self._started, 2),
+            "stage_seconds": {stage: round(seconds, 2) for stage, seconds in self.stage_seconds.items()},
+        }
+        print("Pipeline:", summary)
+        return summary
+
+    def _capture_stage(self):
+        navigator = None
+        if self.grab_stills:
+            # Set timecode
+            self.timeline.SetCurrentTimecode(self.start_timecode)
+            # Delete stills if requested
+            if self.delete_stills:
+                delete_album_stills(self.project)
+            navigator = MarkerNavigator(self.timeline, self.start_timecode, confirm_keyboard=self.confirm_keyboard)
+
+        for idx, (frame_id, marker) in enumerate(self.markers.items()):
+            if self._failed.is_set():
+                break
+            if self.should_stop is not None and self.should_stop():
+                self.cancelled = True
+                print(f"Stopped after {idx} of {self.total} markers.")
+                break
+            self.sources[idx] = marker_source(self.item_index, frame_id, self.cache)
+            if self.grab_stills:
+                # Thumbnails from the previous export or the store must have the same look
+                timeline_item = self.item_index.item_under_marker(frame_id)
+                if timeline_item:
+                    self.grades[idx] = grade_fingerprint(timeline_item, self.cache)
+            entry = self.completed.get(idx)
+            if entry is not None:
+                # Finished in an earlier run; its row and thumbnail come from the journal
+                self._advance("capture")
+                ready = self._journal_thumbnail(entry.get("thumbnail"))
+                if navigator is None:
+                    self._put(self._write_queue, (idx, entry["row"], None, None, None))
+                else:
+                    self._put(self._export_queue, (idx, entry["row"], None, ready, None))
+                continue
+
+            started = time.perf_counter()
+            with profile_phase("metadata"):
+                metadata = _collect_marker_clip_metadata(self.item_index.item_under_marker(frame_id), self.cache)
+                data_row = _marker_row(frame_id, marker, self.timecodes[idx], metadata)
+            if navigator is None:
+                self._advance("capture", seconds=time.perf_counter() - started)
+                self._put(self._write_queue, (idx, data_row, None, None, None))
+                continue
+
+            with profile_phase("reuse lookup"):
+                ready = self._reuse_thumbnail(idx)
+            if ready is not None:
+                self.reused += 1
+                self._advance("capture", seconds=time.perf_counter() - started)
+                self._put(self._export_queue, (idx, data_row, None, ready, None))
+                continue
+
+            with profile_phase("store lookup"):
+                ready, stored_still = self._from_store(idx, frame_id)
+            if ready is not None or stored_still is not None:
+                self.from_store += 1
+                self._advance("capture", seconds=time.perf_counter() - started)
+                self._put(self._export_queue, (idx, data_row, None, ready, stored_still))
+                continue
+
+            print("Number of markers until the end of the timeline:", self.total - (idx + 1))
+            # Move the playhead onto the marker, wait for it to settle and grab the still
+            with profile_phase("navigate"):
+                navigator.goto(frame_id)
+            with profile_phase("grab still"):
+                still = self.timeline.GrabStill()
+            self._advance("capture", seconds=time.perf_counter() - started)
+            self._put(self._export_queue, (idx, data_row, still, None, None))
+
+        if navigator is not None:
+            print("Playhead settle latency:", navigator.settle_summary())
+        if self.reusable:
+            print(f"Reused {self.reused} thumbnails from the previous export.")
+        if self.store is not None:
+            print(f"Took {self.from_store} stills from the thumbnail store.")
+
+    def _thumbnail_target(self, idx):
+        # Where a thumbnail file goes: the kept file, else the journal's copy (or nowhere)
+        return self.thumbnail_files[idx][1] or self.journal_files.get(idx)
+
+    def _journal_thumbnail(self, thumbnail):
+        """A thumbnail recorded in the journal, read back into memory if it is only the journal's copy."""
+        if thumbnail is None:
+            return None
+        path = thumbnail.get("path")
+        if not path or os.path.dirname(path) != self.journal.thumbnail_dir:
+            return dict(thumbnail, data=None)
+        with open(path, "rb") as f:
+            return dict(thumbnail, data=f.read(), path=None)
+
+    def _from_store(self, idx, frame_id):
+        """
+        (ready thumbnail, None) if the store has this shot at the wanted size,
+        (None, path of a copy of its full-resolution still) if it has only that,
+        (None, None) otherwise.
+        """
+        if self.store is None:
+            return None, None
+        timeline_item = self.item_index.item_under_marker(frame_id)
+        source_frame = self.sources[idx][1]
+        mp_id = self.cache.media_pool_id(timeline_item) if timeline_item else None
+        if not mp_id or source_frame is None:
+            return None, None
+        key = ThumbnailStore.key(mp_id, source_frame, self.grades.get(idx), self.resolution)
+        self.store_keys[idx] = key
+
+        image_name, image_file_path = self.thumbnail_files[idx]
+        target_path = self._thumbnail_target(idx)
+        found = self.store.get(key, self.store_variant)
+        if found is not None:
+            stored_path, width, height = found
+            try:
+                with open(stored_path, "rb") as f:
+                    image_data = f.read()
+                if target_path:
+                    shutil.copyfile(stored_path, target_path)
+            except OSError:
+                return None, None
+            return {
+                "name": image_name, "data": image_data, "path": image_file_path, "width": width, "height": height,
+            }, None
+
+        found = self.store.get(key, ThumbnailStore.FULL_RESOLUTION)
+        if found is not None:
+            # resize_thumbnail() consumes its source, so it gets a copy
+            still_path = _still_export_path(
+                self.output_path, "store", f"{idx + 1:03d}", os.path.splitext(found[0])[1].lstrip(".")
+            )
+            try:
+                shutil.copyfile(found[0], still_path)
+            except OSError:
+                return None, None
+            return None, still_path
+        return None, None
+
+    def _reuse_thumbnail(self, idx):
+        """The previous export's thumbnail for the same clip, source frame and grade, copied into place."""
+        found = self.reusable.get(self.sources[idx] + (self.grades.get(idx),))
+        if found is None:
+            return None
+        previous_path, previous = found
+        try:
+            with open(previous_path, "rb") as f:
+                image_data = f.read()
+        except OSError:
+            return None
+        if hashlib.sha1(image_data).hexdigest() != previous.get("sha1"):
+            return None
+        image_name, image_file_path = self.thumbnail_files[idx]
+        target_path = self._thumbnail_target(idx)
+        if target_path and os.path.abspath(target_path) != os.path.abspath(previous_path):
+            shutil.copyfile(previous_path, target_path)
+        return {
+            "name": image_name,
+            "data": image_data,
+            "path": image_file_path,
+            "width": previous["width"],
+            "height": previous["height"],
+        }
+
+    def _export_stage(self, executor):
+        album = self.project.GetGallery().GetCurrentStillAlbum()
+        finished = False
+        while not finished:
+            item = self._get(self._export_queue)
+            if item is None:
+                break
+            # Export everything that has queued up in one call
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._export_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    finished = True
+                    break
+                batch.append(item)
+
+            started = time.perf_counter()
+            stills = [still for _, _, still, _, _ in batch]
+            paths = [None] * len(batch)
+            if any(still is not None for still in stills):
+                with profile_phase("export stills"):
+                    paths = export_stills(album, stills, self.output_path, len(batch), first_index=batch[0][0])
+            self._advance("export", len(batch), time.perf_counter() - started)
+
+            for (idx, data_row, _, ready, stored_still), path in zip(batch, paths):
+                job = pending = None
+                if stored_still is not None:
+                    path = stored_still
+                elif path is not None and idx in self.store_keys and self.store_full_resolution:
+                    with profile_phase("store still"):
+                        self.store.put(self.store_keys[idx], ThumbnailStore.FULL_RESOLUTION, source_path=path)
+                if path is not None:
+                    image_name, image_file_path = self.thumbnail_files[idx]
+                    job = (path, self.image_size, self.thumbnail_options, self._thumbnail_target(idx))
+                    pending = self._submit_resize(executor, job)
+                    if image_file_path:
+                        print("Exported image:", image_file_path)
+                self._put(self._write_queue, (idx, data_row, job, pending, ready))
+        self._put(self._write_queue, None)
+
+    def _submit_resize(self, executor, job):
+        if executor is None:
+            return None
+        try:
+            return executor.submit(resize_thumbnail, job)
+        except (RuntimeError, concurrent.futures.BrokenExecutor):
+            return None
+
+    def _resize_result(self, job, pending):
+        if pending is not None:
+            try:
+                return pending.result()
+            except concurrent.futures.BrokenExecutor as e:
+                print("Resize process pool failed, resizing in this process:", e)
+        return resize_thumbnail(job)
+
+    def _write_stage(self):
+        while True:
+            item = self._get(self._write_queue)
+            if item is None:
+                break
+            idx, data_row, job, pending, thumbnail = item
+            if job is not None:
+                started = time.perf_counter()
+                with profile_phase("resize"):
+                    image_data, new_width, new_height = self._resize_result(job, pending)
+                self._advance("resize", seconds=time.perf_counter() - started)
+                if idx in self.store_keys:
+                    with profile_phase("store thumbnail"):
+                        self.store.put(
+                            self.store_keys[idx], self.store_variant, image_data, None, new_width, new_height
+                        )
+                thumbnail = {
+                    "name": self.thumbnail_files[idx][0],
+                    "data": image_data,
+                    "path": self.thumbnail_files[idx][1],
+                    "width": new_width,
+                    "height": new_height,
+                }
+            started = time.perf_counter()
+            with profile_phase("write row"):
+                self.writer.write_row(data_row, thumbnail)
+            if self.journal is not None and idx not in self.completed:
+                journal_thumbnail = thumbnail
+                if thumbnail is not None and thumbnail["path"] is None:
+                    journal_thumbnail = dict(thumbnail, path=self.journal_files.get(idx))
+                with profile_phase("journal"):
+                    self.journal.record(idx, data_row, idx + 1 if job is not None else None, journal_thumbnail)
+            with profile_phase("manifest"):
+                self.manifest_markers.append(self._manifest_marker(idx, data_row, thumbnail))
+            self._advance("write", seconds=time.perf_counter() - started)
+
+    def _manifest_marker(self, idx, data_row, thumbnail):
+        clip_id, source_frame = self.sources.get(idx, (None, None))
+        marker = {
+            "frame": data_row.get("Frame"),
+            "name": data_row.get("Name"),
+            "note": data_row.get("Note"),
+            "color": data_row.get("Color"),
+            "clip": clip_id,
+            "source_frame": source_frame,
+            "grade": self.grades.get(idx),
+            "thumbnail": None,
+        }
+        if thumbnail is not None:
+            image_data = thumbnail.get("data")
+            path = thumbnail.get("path")
+            if image_data is None:
+                with open(path, "rb") as f:
+                    image_data = f.read()
+            # Only files saved with the export can be reused by a later one
+            kept = path and os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.output_path)
+            marker["thumbnail"] = {
+                "file": os.path.basename(path) if kept else None,
+                "width": thumbnail["width"],
+                "height": thumbnail["height"],
+                "sha1": hashlib.sha1(image_data).hexdigest(),
+            }
+        return marker
+
+
+def _safe_file_name(name):
+    return "".join("_" if c in '<>:"/\\|?*' else c for c in str(name or "")).strip(" .") or "Timeline"
+
+
+def batch_layout(output_path, excel_filename, timelines, batch_mode="workbooks"):
+    """
+    Where each timeline of an export goes. A single timeline keeps the usual
+    layout, workbook and thumbnails in output_path. In a batch every timeline gets
+    a folder for its thumbnails; with batch_mode "workbooks" its own workbook
+    "<name>_<timeline>.xlsx" goes in there too, with "sheets" all timelines are
+    sheets of excel_filename in output_path. CSV and JSONL files have no sheets,
+    so they always get a file per timeline.
+    Returns a dict per timeline: "timeline", "name", "folder", "workbook", "sheet"
+    (None for a workbook of its own) and "journal".
+    """
+    if len(timelines) == 1:
+        workbook_path = os.path.join(output_path, excel_filename)
+        return [{
+            "timeline": timelines[0],
+            "name": _safe_timeline_item_call(timelines[0], "GetName"),
+            "folder": output_path,
+            "workbook": workbook_path,
+            "sheet": None,
+            "journal": CaptureJournal(workbook_path),
+        }]
+
+    stem, extension = os.path.splitext(excel_filename)
+    if extension.lower() != ".xlsx":
+        batch_mode = "workbooks"
+    layout = []
+    used_folders = set()
+    used_sheets = set()
+    for timeline in timelines:
+        name = _safe_timeline_item_call(timeline, "GetName") or "Timeline"
+        folder_name = _safe_file_name(name)
+        counter = 2
+        while folder_name.lower() in used_folders:
+            folder_name = f"{_safe_file_name(name)} ({counter})"
+            counter += 1
+        used_folders.add(folder_name.lower())
+        folder = os.path.join(output_path, folder_name)
+        if batch_mode == "sheets":
+            workbook_path = os.path.join(output_path, excel_filename)
+            sheet_name = _sheet_name(name, used_sheets)
+        else:
+            workbook_path = os.path.join(folder, f"{stem}_{folder_name}{extension}")
+            sheet_name = None
+        layout.append({
+            "timeline": timeline,
+            "name": name,
+            "folder": folder,
+            "workbook": workbook_path,
+            "sheet": sheet_name,
+            "journal": CaptureJournal(os.path.join(folder, os.path.basename(workbook_path))),
+        })
+    return layout
+
+
+def export_timelines(
+    project, layout, selected_fields, image_size, start_timecode, thumbnail_options=None, delete_stills=False,
+    cache=None, thumbnail_store=None, item_indexes=None, resume=False, ask=True, progress_callback=None,
+    should_stop=None, profiler=None, plan=None, marker_filter=None, confirm_keyboard=None,
+):
+    """
+    Export every timeline of a batch_layout() with one field selection and size.
+    The metadata cache, the thumbnail store and the resize process pool are shared
+    by all timelines. Each timeline is made current in turn to be captured, and
+    its last stills are exported, resized and written while the next one is
+    being captured. Timelines without markers are skipped.
+    Returns a summary per exported timeline, or None if the user cancelled a
+    thumbnail file prompt. With a RunProfiler the run is profiled and its report
+    written at the end.
+
+    plan is the result of plan_timelines() for the layout, for callers that name
+    the thumbnails (and ask about existing files) on another thread. In a batch
+    progress_callback(stage, done, total) counts the markers of all timelines.
+    With a MarkerFilter only the markers it matches are captured. confirm_keyboard()
+    is called before the Next Marker key is first pressed, see MarkerNavigator.
+    """
+    if cache is None:
+        cache = MetadataCache()
+    item_indexes = dict(item_indexes or {})
+    thumbnail_options = dict(DEFAULT_THUMBNAIL_OPTIONS, **(thumbnail_options or {}))
+    if profiler is not None:
+        # Every Resolve call of the run goes through the profiler, including the
+        # ones an item index built before the run would have skipped
+        project = profiler.wrap(project)
+        layout = [dict(entry, timeline=profiler.wrap(entry["timeline"])) for entry in layout]
+        if plan is not None:
+            plan = [(dict(entry, timeline=profiler.wrap(entry["timeline"])), m, f) for entry, m, f in plan]
+        item_indexes = {}
+        profiler.start()
+
+    summaries = []
+    try:
+        jobs = plan
+        if jobs is None:
+            jobs = plan_timelines(
+                layout, selected_fields, thumbnail_options, ask and not resume, marker_filter, start_timecode
+            )
+        if jobs is not None:
+            _export_planned_timelines(
+                project, jobs, summaries, selected_fields, image_size, start_timecode, thumbnail_options,
+                delete_stills, cache, thumbnail_store, item_indexes, resume, progress_callback, should_stop,
+                confirm_keyboard,
+            )
+    finally:
+        if profiler is not None:
+            profiler.finish(summaries)
+    return None if jobs is None else summaries
+
+
+def plan_timelines(
+    layout, selected_fields, thumbnail_options=None, ask=True, marker_filter=None,
+    start_timecode=DEFAULT_START_TIMECODE,
+):
+    """
+    Read the markers of every timeline in a batch_layout() and name every
+    thumbnail before anything is captured, see plan_thumbnail_files(). A
+    MarkerFilter drops the markers it does not match here, so they are never
+    navigated to or grabbed. Timelines left without markers are skipped.
+    Returns [(entry, markers, thumbnail files)], or None if the user cancelled a prompt.
+    """
+    jobs = []
+    with profile_phase("plan"):
+        for entry in layout:
+            markers = entry["timeline"].GetMarkers() or {}
+            if markers and marker_filter:
+                marker_count = len(markers)
+                markers = marker_filter.apply(entry["timeline"], markers, start_timecode)
+                print(f"Timeline '{entry['name']}': {len(markers)} of {marker_count} markers match the filter.")
+            if not markers:
+                print(f"No markers on timeline '{entry['name']}', skipped.")
+                continue
+            os.makedirs(entry["folder"], exist_ok=True)
+            thumbnail_files = None
+            if THUMBNAIL_FIELD in selected_fields:
+                thumbnail_files = plan_thumbnail_files(
+                    entry["folder"], len(markers), output_thumbnail_options(entry["workbook"], thumbnail_options), ask
+                )
+                if thumbnail_files is None:
+                    return None
+            jobs.append((entry, markers, thumbnail_files))
+    return jobs
+
+
+def _export_planned_timelines(
+    project, jobs, summaries, selected_fields, image_size, start_timecode, thumbnail_options, delete_stills,
+    cache, thumbnail_store, item_indexes, resume, progress_callback, should_stop, confirm_keyboard=None,
+):
+    # Appends to summaries as timelines finish, so a failed batch still reports the finished ones
+    batch = len(jobs) > 1
+    books = {}
+    for entry, markers, _ in jobs:
+        if entry["sheet"] is not None and entry["workbook"] not in books:
+            row_count = sum(len(m) for e, m, _ in jobs if e["workbook"] == entry["workbook"])
+            books[entry["workbook"]] = ShotlistWorkbook(entry["workbook"], _use_constant_memory(row_count))
+    executor = None
+    if batch and THUMBNAIL_FIELD in selected_fields:
+        executor = _resize_executor(_resize_workers())
+    original_timeline = project.GetCurrentTimeline() if batch else None
+    marker_total = sum(len(markers) for _, markers, _ in jobs)
+    marker_offset = 0
+    shared_journals = []
+
+    running = None
+    try:
+        for n, (entry, markers, thumbnail_files) in enumerate(jobs):
+            if should_stop is not None and should_stop():
+                break
+            timeline = entry["timeline"]
+            if batch:
+                print(f"Timeline {n + 1} of {len(jobs)}: {entry['name']}")
+                project.SetCurrentTimeline(timeline)
+            timeline_id = _safe_timeline_item_call(timeline, "GetUniqueId")
+            item_index = item_indexes.get(timeline_id)
+            if item_index is None:
+                with profile_phase("item index"):
+                    item_index = TimelineItemIndex(timeline)
+            timeline_progress = _offset_progress(progress_callback, marker_offset, marker_total)
+            marker_offset += len(markers)
+            pipeline = CapturePipeline(
+                project, timeline, item_index, markers, start_timecode, entry["workbook"], selected_fields,
+                image_size, thumbnail_options, thumbnail_files,
+                # Stills of the previous timeline may still be exporting, so only clear the album once
+                delete_stills and n == 0, cache,
+                progress_callback=timeline_progress, should_stop=should_stop, journal=entry["journal"],
+                resume=resume, previous_manifest=previous_manifest_path(
+                    timeline_id, image_size, output_thumbnail_options(entry["workbook"], thumbnail_options)["format"]
+                ),
+                thumbnail_store=thumbnail_store, output_path=entry["folder"], book=books.get(entry["workbook"]),
+                sheet_name=entry["sheet"], executor=executor, confirm_keyboard=confirm_keyboard,
+            )
+            pipeline.start()
+            if running is not None:
+                summaries.append(_finish_timeline(*running, shared_journals))
+            running = (entry, pipeline)
+        if running is not None:
+            summaries.append(_finish_timeline(*running, shared_journals))
+            running = None
+    finally:
+        if running is not None:
+            try:
+                running[1].finish()
+            except Exception:
+                pass
+        if executor is not None:
+            executor.shutdown()
+        with profile_phase("workbook close"):
+            for book in books.values():
+                book.close()
+        if original_timeline is not None:
+            project.SetCurrentTimeline(original_timeline)
+    # Journals of sheets in a shared workbook, now that the workbook is written
+    for journal in shared_journals:
+        journal.discard()
+
+
+def _offset_progress(progress_callback, offset, total):
+    # A timeline's progress as a count over all the markers of the batch
+    if progress_callback is None:
+        return None
+    return lambda stage, done, _: progress_callback(stage, offset + done, total)
+
+
+def _finish_timeline(entry, pipeline, shared_journals):
+    summary = pipeline.finish()
+    if pipeline.journal_finished:
+        shared_journals.append(pipeline.journal)
+    return dict(summary, timeline=entry["name"], workbook=entry["workbook"], sheet=entry["sheet"])
+
+
+# -----------------------------------------------------------------------------
+# 7) Dark theme
+# -----------------------------------------------------------------------------
+
+def set_dark_theme(app):
+    app.setStyle('Fusion')
+    dark_palette = QtGui.QPalette()
+
+    dark_color = QtGui.QColor(45, 45, 45)
+    disabled_color = QtGui.QColor(127, 127, 127)
+
+    dark_palette.setColor(QtGui.QPalette.Window, dark_color)
+    dark_palette.setColor(QtGui.QPalette.WindowText, QtCore.Qt.white)
+    dark_palette.setColor(QtGui.QPalette.Base, QtGui.QColor(18, 18, 18))
+    dark_palette.setColor(QtGui.QPalette.AlternateBase, dark_color)
+    dark_palette.setColor(QtGui.QPalette.ToolTipBase, QtCore.Qt.white)
+    dark_palette.setColor(QtGui.QPalette.ToolTipText, QtCore.Qt.white)
+    dark_palette.setColor(QtGui.QPalette.Text, QtCore.Qt.white)
+    dark_palette.setColor(QtGui.QPalette.Disabled, QtGui.QPalette.Text, disabled_color)
+    dark_palette.setColor(QtGui.QPalette.Button, dark_color)
+    dark_palette.setColor(QtGui.QPalette.ButtonText, QtCore.Qt.white)
+    dark_palette.setColor(QtGui.QPalette.Disabled, QtGui.QPalette.ButtonText, disabled_color)
+    dark_palette.setColor(QtGui.QPalette.BrightText, QtCore.Qt.red)
+    dark_palette.setColor(QtGui.QPalette.Link, QtGui.QColor(42, 130, 218))
+    dark_palette.setColor(QtGui.QPalette.Highlight, QtGui.QColor(42, 130, 218))
+    dark_palette.setColor(QtGui.QPalette.Disabled, QtGui.QPalette.Highlight, QtGui.QColor(80, 80, 80))
+    dark_palette.setColor(QtGui.QPalette.HighlightedText, QtCore.Qt.white)
+    dark_palette.setColor(QtGui.QPalette.Disabled, QtGui.QPalette.HighlightedText, disabled_color)
+
+    app.setPalette(dark_palette)
+
+
+# -----------------------------------------------------------------------------
+# 8) The main reordering/presets UI
+# -----------------------------------------------------------------------------
+
+class FieldDiscoveryThread(QtCore.QThread):
+    """
+    Runs discover_timeline_fields() off the GUI thread and streams newly found
+    fields into the options dialog while it is already open.
+    """
+
+    fields_discovered = QtCore.Signal(list)
+    progress = QtCore.Signal(int, int)
+    discovery_finished = QtCore.Signal(list)
+
+    def __init__(self, project, timeline, cache, persistent_cache=None, parent=None):
+        super(FieldDiscoveryThread, self).__init__(parent)
+        self.project = project
+        self.timeline = timeline
+        self.cache = cache
+        self.persistent_cache = persistent_cache
+        self.item_index = None
+        self.fields = list(STANDARD_FIELDS)
+
+    def _on_progress(self, scanned, total, new_keys):
+        self.progress.emit(scanned, total)
+        new_fields = sorted(k for k in new_keys if k not in STANDARD_FIELDS)
+        if new_fields:
+            self.fields_discovered.emit(new_fields)
+
+    def run(self):
+        try:
+            self.fields, self.item_index = discover_timeline_fields(
+                self.project,
+                self.timeline,
+                self.cache,
+                self.persistent_cache,
+                on_progress=self._on_progress,
+                should_stop=self.isInterruptionRequested,
+            )
+        except Exception as e:
+            print("Metadata field discovery failed:", e)
+        self.fields_discovered.emit(list(self.fields))
+        self.discovery_finished.emit(list(self.fields))
+
+
+class ExportThread(QtCore.QThread):
+    """
+    Runs export_timelines() off the GUI thread, so the window stays responsive
+    and the export can be stopped. The thumbnails must already be planned (with
+    their prompts) on the GUI thread; see plan_timelines().
+
+    keyboard_needed is emitted when the export has to fall back to the Next
+    Marker key; the GUI thread shows its prompts and answers with answer_keyboard().
+    """
+
+    progress = QtCore.Signal(str, int, int)
+    keyboard_needed = QtCore.Signal()
+
+    def __init__(self, project, layout, plan, export_args, parent=None):
+        super(ExportThread, self).__init__(parent)
+        self.project = project
+        self.layout = layout
+        self.plan = plan
+        self.export_args = export_args
+        self.summaries = None
+        self.error = None
+        self.keyboard_allowed = None
+        self._keyboard_answered = threading.Event()
+
+    def _confirm_keyboard(self):
+        # Called from the capture thread; asked once per export, also in a batch
+        if self.keyboard_allowed is None:
+            self.keyboard_needed.emit()
+            while not self._keyboard_answered.wait(0.1):
+                if self.isInterruptionRequested():
+                    return False
+        return self.keyboard_allowed
+
+    def answer_keyboard(self, allowed):
+        self.keyboard_allowed = bool(allowed)
+        self._keyboard_answered.set()
+
+    def run(self):
+        try:
+            self.summaries = export_timelines(
+                self.project,
+                self.layout,
+                plan=self.plan,
+                ask=False,
+                progress_callback=self.progress.emit,
+                should_stop=self.isInterruptionRequested,
+                confirm_keyboard=self._confirm_keyboard,
+                **self.export_args,
+            )
+        except Exception as e:
+            print("Export failed:", e)
+            self.error = e
+
+
+def _format_duration(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+class ExportProgressDialog(QtWidgets.QDialog):
+    """
+    Progress of a running export: markers done per pipeline stage, throughput and
+    time left. Stop (or closing the window) ends the export after the marker
+    being captured; everything captured up to it is still exported and written.
+    """
+
+    cancel_requested = QtCore.Signal()
+
+    STAGE_LABELS = {"capture": "Captured", "export": "Exported", "resize": "Resized", "write": "Written"}
+
+    def __init__(self, total, parent=None):
+        super(ExportProgressDialog, self).__init__(parent)
+        self.setWindowFlag(QtCore.Qt.WindowStaysOnTopHint)
+        self.setWindowTitle(f"{APP_TITLE} Export")
+        self.resize(520, 180)
+        self.total = total
+        self.stage_counts = dict.fromkeys(CapturePipeline.STAGES, 0)
+        self.started = time.perf_counter()
+        self.stopping = False
+
+        layout = QtWidgets.QVBoxLayout(self)
+        self.progress_bar = QtWidgets.QProgressBar()
+        self.progress_bar.setRange(0, max(total, 1))
+        self.progress_bar.setFormat("%v / %m markers")
+        layout.addWidget(self.progress_bar)
+        self.stage_label = QtWidgets.QLabel()
+        layout.addWidget(self.stage_label)
+        self.rate_label = QtWidgets.QLabel("Starting...")
+        layout.addWidget(self.rate_label)
+
+        buttons = QtWidgets.QHBoxLayout()
+        buttons.addStretch(1)
+        self.stop_button = QtWidgets.QPushButton("Stop")
+        self.stop_button.clicked.connect(self.request_stop)
+        buttons.addWidget(self.stop_button)
+        layout.addLayout(buttons)
+        self._update_stage_label()
+
+    def _update_stage_label(self):
+        self.stage_label.setText("   ".join(
+            f"{self.STAGE_LABELS[stage]}: {self.stage_counts[stage]}" for stage in CapturePipeline.STAGES
+        ))
+
+    def set_progress(self, stage, done, total):
+        self.stage_counts[stage] = max(self.stage_counts[stage], done)
+        self._update_stage_label()
+        if stage != "write":
+            return
+        written = self.stage_counts["write"]
+        self.progress_bar.setValue(written)
+        if self.stopping:
+            return
+        elapsed = time.perf_counter() - self.started
+        rate = written / elapsed if elapsed > 0 else 0.0
+        if rate > 0:
+            eta = (self.total - written) / rate
+            self.rate_label.setText(
+                f"{rate:.1f} markers/s   elapsed {_format_duration(elapsed)}   "
+                f"about {_format_duration(eta)} left"
+            )
+
+    def request_stop(self):
+        if self.stopping:
+            return
+        self.stopping = True
+        self.stop_button.setEnabled(False)
+        self.rate_label.setText("Stopping after the current marker...")
+        self.cancel_requested.emit()
+
+    def closeEvent(self, event):
+        # The export finishes the markers already captured before the dialog goes away
+        self.request_stop()
+        event.ignore()
+
+    def reject(self):
+        # Escape stops the export instead of hiding the dialog while it runs
+        self.request_stop()
+
+
+class UserInputDialog(QtWidgets.QDialog):
+    def __init__(self, all_fields, parent=None, timelines=None, marker_timelines=None):
+        super(UserInputDialog, self).__init__(parent)
+
+        # Keep window on top
+        self.setWindowFlag(QtCore.Qt.WindowStaysOnTopHint)
+        # Large default size
+        self.resize(1200, 800)
+        self.setWindowTitle(f"{APP_TITLE} Options")
+
+        self.search_results = []
+        self.search_index = 0
+        self.field_role = QtCore.Qt.UserRole
+        self.section_role = QtCore.Qt.UserRole + 1
+
+        layout = QtWidgets.QVBoxLayout(self)
+
+        instructions = QtWidgets.QLabel("Please set the options below:")
+        layout.addWidget(instructions)
+
+        # Timecode
+        timecode_label = QtWidgets.QLabel("Enter custom timecode (default is 01:00:00:00):")
+        layout.addWidget(timecode_label)
+        self.timecode_input = QtWidgets.QLineEdit("01:00:00:00")
+        layout.addWidget(self.timecode_input)
+
+        # Delete stills
+        self.delete_stills_checkbox = QtWidgets.QCheckBox("Delete all stills from the gallery album")
+        layout.addWidget(self.delete_stills_checkbox)
+
+        # Timelines (batch export when more than one is checked)
+        self.timeline_list = None
+        self.batch_mode_combo = None
+        if timelines and len(timelines) > 1:
+            layout.addWidget(QtWidgets.QLabel("Timelines to export:"))
+            self.timeline_list = QtWidgets.QListWidget()
+            self.timeline_list.setMaximumHeight(120)
+            for timeline_index, timeline_name, is_current in timelines:
+                item = QtWidgets.QListWidgetItem(timeline_name)
+                item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
+                item.setCheckState(QtCore.Qt.Checked if is_current else QtCore.Qt.Unchecked)
+                item.setData(QtCore.Qt.UserRole, timeline_index)
+                self.timeline_list.addItem(item)
+            layout.addWidget(self.timeline_list)
+
+            self.batch_mode_combo = QtWidgets.QComboBox()
+            self.batch_mode_combo.addItem("One workbook per timeline", "workbooks")
+            self.batch_mode_combo.addItem("One workbook with a sheet per timeline", "sheets")
+            layout.addWidget(self.batch_mode_combo)
+
+        # Marker filter, counted live against the markers of the timelines to export
+        self.timeline_choices = list(timelines or [])
+        self.marker_timelines = dict(marker_timelines or {})
+        self.timeline_markers = {}
+        layout.addWidget(QtWidgets.QLabel("Export only the markers that match (leave empty for all markers):"))
+        self.color_list = QtWidgets.QListWidget()
+        self.color_list.setFlow(QtWidgets.QListView.LeftToRight)
+        self.color_list.setWrapping(True)
+        self.color_list.setMaximumHeight(56)
+        for color in MARKER_COLORS:
+            item = QtWidgets.QListWidgetItem(color)
+            item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
+            item.setCheckState(QtCore.Qt.Unchecked)
+            self.color_list.addItem(item)
+        layout.addWidget(self.color_list)
+
+        filter_layout = QtWidgets.QHBoxLayout()
+        self.filter_text_input = QtWidgets.QLineEdit()
+        self.filter_text_input.setPlaceholderText("Name or note matches (regex)")
+        self.filter_custom_data_input = QtWidgets.QLineEdit()
+        self.filter_custom_data_input.setPlaceholderText("Custom data matches (regex)")
+        self.filter_start_input = QtWidgets.QLineEdit()
+        self.filter_start_input.setPlaceholderText("From timecode or frame")
+        self.filter_end_input = QtWidgets.QLineEdit()
+        self.filter_end_input.setPlaceholderText("To timecode or frame")
+        for widget in (self.filter_text_input, self.filter_custom_data_input, self.filter_start_input,
+                       self.filter_end_input):
+            filter_layout.addWidget(widget)
+        filter_layout.addWidget(QtWidgets.QLabel("Duration:"))
+        self.filter_min_duration_input = QtWidgets.QSpinBox()
+        self.filter_max_duration_input = QtWidgets.QSpinBox()
+        for spin_box, label in ((self.filter_min_duration_input, "min any"), (self.filter_max_duration_input, "max any")):
+            # 0 frames stands for no limit
+            spin_box.setRange(0, 10000000)
+            spin_box.setSpecialValueText(label)
+            spin_box.setSuffix(" fr")
+            filter_layout.addWidget(spin_box)
+        layout.addLayout(filter_layout)
+        self.marker_count_label = QtWidgets.QLabel()
+        layout.addWidget(self.marker_count_label)
+
+        self.color_list.itemChanged.connect(self.update_marker_count)
+        for line_edit in (self.filter_text_input, self.filter_custom_data_input, self.filter_start_input,
+                          self.filter_end_input, self.timecode_input):
+            line_edit.textChanged.connect(self.update_marker_count)
+        self.filter_min_duration_input.valueChanged.connect(self.update_marker_count)
+        self.filter_max_duration_input.valueChanged.connect(self.update_marker_count)
+        if self.timeline_list is not None:
+            self.timeline_list.itemChanged.connect(self.update_marker_count)
+
+        # Search
+        search_label = QtWidgets.QLabel("Search in metadata fields:")
+        layout.addWidget(search_label)
+
+        search_layout = QtWidgets.QHBoxLayout()
+        self.search_field = QtWidgets.QLineEdit()
+        self.search_field.setPlaceholderText("Type something (e.g. 'audio', 'tape', etc.)")
+        self.search_field.textChanged.connect(self.search_in_list)
+        self.find_next_button = QtWidgets.QPushButton("Find Next")
+        self.find_next_button.clicked.connect(self.find_next_match)
+
+        search_layout.addWidget(self.search_field)
+        search_layout.addWidget(self.find_next_button)
+        layout.addLayout(search_layout)
+
+        # Preset load/save
+        preset_buttons_layout = QtWidgets.QHBoxLayout()
+        load_preset_button = QtWidgets.QPushButton("Load Preset")
+        save_preset_button = QtWidgets.QPushButton("Save Preset")
+        setup_guide_button = QtWidgets.QPushButton("Show Setup Guide")
+
+
+        load_preset_button.clicked.connect(self.on_load_preset_clicked)
+        save_preset_button.clicked.connect(self.on_save_preset_clicked)
+        setup_guide_button.clicked.connect(self.on_show_setup_guide_clicked)
+
+        # Support button
+        donate_button = QtWidgets.QPushButton("Support")
+        donate_button.setStyleSheet("""
+                    QPushButton {
+                        background-color: #8A2BE2; /* Purple */
+                        color: white;
+                        font-weight: bold;
+                    }
+                    QPushButton:hover {
+                        background-color: #9E47FF; /* Slightly lighter on hover */
+                    }
+                """)
+        donate_button.clicked.connect(lambda: _open_url(SUPPORT_URL))
+
+        preset_buttons_layout.addWidget(load_preset_button)
+        preset_buttons_layout.addWidget(save_preset_button)
+        preset_buttons_layout.addWidget(setup_guide_button)
+        preset_buttons_layout.addWidget(donate_button)
+        layout.addLayout(preset_buttons_layout)
+
+        info_layout = QtWidgets.QHBoxLayout()
+
+        # We can use HTML for clickable links
+        # setOpenExternalLinks(True) allows user to click the links.
+        self.info_label = QtWidgets.QLabel(
+            '<span style="font-size:10px;">'
+            '<a href="https://www.linkedin.com/in/natalia-raz-0b8329120/">Natalia Raz</a> &nbsp;|&nbsp; '
+            '<a href="https://github.com/natlrazfx">GitHub</a> &nbsp;|&nbsp; '
+            '<a href="https://vimeo.com/552106671">Vimeo</a>'
+            '</span>'
+        )
+        self.info_label.setOpenExternalLinks(True)
+
+        info_layout.addStretch(1)  # pushes label to the right if you like
+        info_layout.addWidget(self.info_label)
+        # info_layout.addStretch(1)  # or comment out if you don't want right alignment
+
+        layout.addLayout(info_layout)
+
+        # Metadata label
+        metadata_label = QtWidgets.QLabel("Select and reorder the metadata fields:")
+        layout.addWidget(metadata_label)
+
+        # Field discovery progress (fields keep arriving while the dialog is open)
+        discovery_layout = QtWidgets.QHBoxLayout()
+        self.discovery_label = QtWidgets.QLabel("Scanning timeline for metadata fields...")
+        self.discovery_progress = QtWidgets.QProgressBar()
+        self.discovery_progress.setRange(0, 0)
+        self.discovery_progress.setFormat("%v / %m items")
+        discovery_layout.addWidget(self.discovery_label)
+        discovery_layout.addWidget(self.discovery_progress, stretch=1)
+        layout.addLayout(discovery_layout)
+
+        # QListWidget (reorderable + checkable)
+        self.list_widget = QtWidgets.QListWidget()
+        self.list_widget.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.list_widget.setDragDropMode(QtWidgets.QAbstractItemView.InternalMove)
+        self.list_widget.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        layout.addWidget(self.list_widget, stretch=1)
+
+        # Default fields that are checked
+        self.default_selected_fields = list(DEFAULT_SELECTED_FIELDS)
+        self.all_fields = list(all_fields)
+        # Last loaded preset, applied to fields that are discovered after loading it
+        self.preset = None
+        self._rebuild_field_list(self.all_fields, set(self.default_selected_fields))
+
+        # Select All / Deselect All
+        button_layout = QtWidgets.QHBoxLayout()
+        select_all_button = QtWidgets.QPushButton("Select All")
+        deselect_all_button = QtWidgets.QPushButton("Deselect All")
+        select_all_button.clicked.connect(self.select_all_items)
+        deselect_all_button.clicked.connect(self.deselect_all_items)
+        button_layout.addWidget(select_all_button)
+        button_layout.addWidget(deselect_all_button)
+        layout.addLayout(button_layout)
+
+        # Image size
+        size_label = QtWidgets.QLabel("Choose the size for the still images:")
+        layout.addWidget(size_label)
+
+        size_layout = QtWidgets.QHBoxLayout()
+        self.size_combo = QtWidgets.QComboBox()
+        self.size_combo.addItems(["SMALL", "LARGE", "CUSTOM"])
+        size_layout.addWidget(self.size_combo)
+
+        self.custom_size_input = QtWidgets.QDoubleSpinBox()
+        self.custom_size_input.setRange(0.1, 10)
+        self.custom_size_input.setSingleStep(0.1)
+        self.custom_size_input.setValue(1)
+        self.custom_size_input.setVisible(False)
+        size_layout.addWidget(self.custom_size_input)
+        layout.addLayout(size_layout)
+
+        def on_size_change():
+            self.custom_size_input.setVisible(self.size_combo.currentText() == "CUSTOM")
+
+        self.size_combo.currentIndexChanged.connect(on_size_change)
+
+        # Thumbnail encoding
+        format_layout = QtWidgets.QHBoxLayout()
+        format_layout.addWidget(QtWidgets.QLabel("Thumbnail format:"))
+        self.format_combo = QtWidgets.QComboBox()
+        self.format_combo.addItems(["PNG", "JPEG"])
+        format_layout.addWidget(self.format_combo)
+
+        self.quality_label = QtWidgets.QLabel("JPEG quality:")
+        self.quality_input = QtWidgets.QSpinBox()
+        self.quality_input.setRange(1, 100)
+        self.quality_input.setValue(DEFAULT_THUMBNAIL_OPTIONS["quality"])
+        format_layout.addWidget(self.quality_label)
+        format_layout.addWidget(self.quality_input)
+
+        self.keep_thumbnails_checkbox = QtWidgets.QCheckBox("Keep thumbnail files next to the workbook")
+        self.keep_thumbnails_checkbox.setChecked(DEFAULT_THUMBNAIL_OPTIONS["keep_files"])
+        format_layout.addWidget(self.keep_thumbnails_checkbox)
+        format_layout.addStretch(1)
+        layout.addLayout(format_layout)
+
+        def on_format_change():
+            is_jpeg = self.format_combo.currentText() == "JPEG"
+            self.quality_label.setVisible(is_jpeg)
+            self.quality_input.setVisible(is_jpeg)
+
+        self.format_combo.currentIndexChanged.connect(on_format_change)
+        on_format_change()
+
+        # OK / Cancel
+        ok_cancel_layout = QtWidgets.QHBoxLayout()
+        ok_button = QtWidgets.QPushButton("OK")
+        cancel_button = QtWidgets.QPushButton("Cancel")
+        ok_button.clicked.connect(self.accept)
+        cancel_button.clicked.connect(self.reject)
+        ok_cancel_layout.addWidget(ok_button)
+        ok_cancel_layout.addWidget(cancel_button)
+        layout.addLayout(ok_cancel_layout)
+
+        self.update_marker_count()
+
+    def accept(self):
+        # Range timecodes only make sense at each timeline's own rate, so run
+        # the filter the way the count does and refuse what it refuses.
+        try:
+            self.get_marker_filter()
+            error = self.update_marker_count()
+        except ValueError as e:
+            error = str(e)
+        if error:
+            QtWidgets.QMessageBox.warning(self, "Marker Filter", error)
+            return
+        super(UserInputDialog, self).accept()
+
+    def _is_timeline_field(self, field_name):
+        return is_timeline_field(field_name)
+
+    def _make_separator_item(self, label):
+        item = QtWidgets.QListWidgetItem(f"────────  {label}  ────────")
+        item.setFlags(QtCore.Qt.NoItemFlags)
+        item.setForeground(QtGui.QColor(140, 140, 140))
+        item.setData(self.field_role, "separator")
+        item.setData(self.section_role, label)
+        return item
+
+    def _add_separator_item(self, label):
+        self.list_widget.addItem(self._make_separator_item(label))
+
+    def _make_field_item(self, field_name, checked):
+        item = QtWidgets.QListWidgetItem(field_name)
+        item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable | QtCore.Qt.ItemIsEnabled)
+        item.setData(self.field_role, "field")
+        if checked:
+            item.setCheckState(QtCore.Qt.Checked)
+        else:
+            item.setCheckState(QtCore.Qt.Unchecked)
+        return item
+
+    def _add_field_item(self, field_name, checked_fields):
+        self.list_widget.addItem(self._make_field_item(field_name, field_name in checked_fields))
+
+    def _field_section(self, field_name):
+        return field_section(field_name)
+
+    def _field_sort_key(self, field_name):
+        # Same order a full rebuild would give: standard fields first, then the rest
+        # alphabetically; a loaded preset's order wins over both.
+        if field_name in STANDARD_FIELDS:
+            default_key = (0, STANDARD_FIELDS.index(field_name), "")
+        else:
+            default_key = (1, 0, field_name)
+        if self.preset is not None:
+            order = self.preset.get("order", [])
+            if field_name in order:
+                return (0, order.index(field_name), "")
+            return (1,) + default_key
+        return default_key
+
+    def _insert_field_item(self, field_name, checked):
+        sections = FIELD_SECTIONS
+        section = self._field_section(field_name)
+        separator_rows = {}
+        for i in range(self.list_widget.count()):
+            item = self.list_widget.item(i)
+            if item.data(self.field_role) == "separator":
+                separator_rows[item.data(self.section_role)] = i
+
+        if section not in separator_rows:
+            later_rows = [separator_rows[s] for s in sections[sections.index(section) + 1:] if s in separator_rows]
+            row = min(later_rows) if later_rows else self.list_widget.count()
+            self.list_widget.insertItem(row, self._make_separator_item(section))
+            section_start = row + 1
+        else:
+            section_start = separator_rows[section] + 1
+
+        key = self._field_sort_key(field_name)
+        row = section_start
+        while row < self.list_widget.count():
+            item = self.list_widget.item(row)
+            if item.data(self.field_role) == "separator" or self._field_sort_key(item.text()) > key:
+                break
+            row += 1
+        self.list_widget.insertItem(row, self._make_field_item(field_name, checked))
+
+    def add_fields(self, fields):
+        """Add newly discovered fields to their section, keeping the user's current choices."""
+        checked_fields = set(self.default_selected_fields)
+        if self.preset is not None:
+            checked_fields = set(self.preset.get("checked", []))
+        for field in fields:
+            if field in self.all_fields:
+                continue
+            self.all_fields.append(field)
+            self._insert_field_item(field, field in checked_fields)
+        if self.search_field.text().strip():
+            self.search_results = self._matching_rows(self.search_field.text().strip().lower())
+            self.search_index = 0
+
+    def set_discovery_progress(self, scanned, total):
+        self.discovery_progress.setRange(0, max(total, 1))
+        self.discovery_progress.setValue(scanned)
+        self.discovery_label.setText("Scanning timeline for metadata fields...")
+
+    def on_discovery_finished(self, fields):
+        self.discovery_progress.setVisible(False)
+        self.discovery_label.setText(f"{len(self.all_fields)} metadata fields available.")
+
+    def _rebuild_field_list(self, field_order, checked_fields):
+        self.list_widget.clear()
+
+        standard_fields = [f for f in field_order if f in self.default_selected_fields and not self._is_timeline_field(f)]
+        timeline_fields = [f for f in field_order if self._is_timeline_field(f)]
+        clip_fields = [f for f in field_order if f not in standard_fields and f not in timeline_fields]
+
+        if standard_fields:
+            self._add_separator_item("Standard Fields")
+            for field in standard_fields:
+                self._add_field_item(field, checked_fields)
+        if timeline_fields:
+            self._add_separator_item("Timeline Fields")
+            for field in timeline_fields:
+                self._add_field_item(field, checked_fields)
+        if clip_fields:
+            self._add_separator_item("Clip Metadata")
+            for field in clip_fields:
+                self._add_field_item(field, checked_fields)
+
+    # ----------------------------------------------------------------
+    # Preset: one preset per JSON
+    # ----------------------------------------------------------------
+    def on_save_preset_clicked(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self,
+            "Save Preset",
+            "",
+            "JSON Files (*.json);;All Files (*)"
+        )
+        if not path:
+            return
+        fields_in_order = []
+        checked_list = []
+        for i in range(self.list_widget.count()):
+            item = self.list_widget.item(i)
+            if item.data(self.field_role) != "field":
+                continue
+            fields_in_order.append(item.text())
+            if item.checkState() == QtCore.Qt.Checked:
+                checked_list.append(item.text())
+
+        data = {"order": fields_in_order, "checked": checked_list, "marker_filter": self.get_marker_filter_spec()}
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4)
+        except Exception as e:
+            QtWidgets.QMessageBox.warning(self, "Error", f"Failed to save preset:\n{e}")
+
+    def on_load_preset_clicked(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self,
+            "Load Preset",
+            "",
+            "JSON Files (*.json);;All Files (*)"
+        )
+        if not path:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            QtWidgets.QMessageBox.warning(self, "Error", f"Failed to read preset:\n{e}")
+            return
+
+        # Fields of the preset that are not discovered yet are placed when they arrive.
+        self.preset = data
+        fields_order = [f for f in data.get("order", []) if f in self.all_fields]
+        for f in self.all_fields:
+            if f not in fields_order:
+                fields_order.append(f)
+        checked_fields = {f for f in data.get("checked", []) if f in self.all_fields}
+        self._rebuild_field_list(fields_order, checked_fields)
+        if "marker_filter" in data:
+            self.set_marker_filter_spec(data["marker_filter"] or {})
+
+    def on_show_setup_guide_clicked(self):
+        _show_bind_setup_dialog(force=True)
+
+    # ----------------------------------------------------------------
+    # Searching
+    # ----------------------------------------------------------------
+    def search_in_list(self):
+        query = self.search_field.text().strip().lower()
+        self.search_results.clear()
+        self.search_index = 0
+
+        if not query:
+            self.list_widget.clearSelection()
+            return
+
+        self.search_results = self._matching_rows(query)
+
+        if self.search_results:
+            idx = self.search_results[0]
+            item = self.list_widget.item(idx)
+            self.list_widget.setCurrentItem(item)
+            self.list_widget.scrollToItem(item)
+        else:
+            QtWidgets.QMessageBox.information(self, "Not Found", f"No fields match '{self.search_field.text()}'")
+
+    def _matching_rows(self, query):
+        rows = []
+        for i in range(self.list_widget.count()):
+            item = self.list_widget.item(i)
+            if item.data(self.field_role) != "field":
+                continue
+            txt = item.text().lower()
+            if query in txt:
+                rows.append(i)
+        return rows
+
+    def find_next_match(self):
+        if not self.search_results:
+            return
+        self.search_index += 1
+        if self.search_index >= len(self.search_results):
+            self.search_index = 0
+        idx = self.search_results[self.search_index]
+        item = self.list_widget.item(idx)
+        self.list_widget.setCurrentItem(item)
+        self.list_widget.scrollToItem(item)
+
+    # ----------------------------------------------------------------
+    # Marker filter
+    # ----------------------------------------------------------------
+    def get_marker_filter_spec(self):
+        colors = [
+            self.color_list.item(i).text() for i in range(self.color_list.count())
+            if self.color_list.item(i).checkState() == QtCore.Qt.Checked
+        ]
+        spec = {
+            "colors": colors,
+            "text": self.filter_text_input.text().strip(),
+            "start": self.filter_start_input.text().strip(),
+            "end": self.filter_end_input.text().strip(),
+            "min_duration": self.filter_min_duration_input.value() or None,
+            "max_duration": self.filter_max_duration_input.value() or None,
+            "custom_data": self.filter_custom_data_input.text().strip(),
+        }
+        return {key: value for key, value in spec.items() if value not in (None, "", [])}
+
+    def set_marker_filter_spec(self, spec):
+        colors = {str(color).lower() for color in spec.get("colors") or []}
+        self.color_list.blockSignals(True)
+        for i in range(self.color_list.count()):
+            item = self.color_list.item(i)
+            item.setCheckState(QtCore.Qt.Checked if item.text().lower() in colors else QtCore.Qt.Unchecked)
+        self.color_list.blockSignals(False)
+        self.filter_text_input.setText(str(spec.get("text") or ""))
+        self.filter_custom_data_input.setText(str(spec.get("custom_data") or ""))
+        self.filter_start_input.setText(str(spec.get("start") or ""))
+        self.filter_end_input.setText(str(spec.get("end") or ""))
+        for spin_box, key in ((self.filter_min_duration_input, "min_duration"),
+                              (self.filter_max_duration_input, "max_duration")):
+            try:
+                spin_box.setValue(int(spec.get(key) or 0))
+            except (TypeError, ValueError):
+                spin_box.setValue(0)
+        self.update_marker_count()
+
+    def get_marker_filter(self):
+        """The MarkerFilter of the dialog. Raises ValueError if it is not valid."""
+        return MarkerFilter(self.get_marker_filter_spec())
+
+    def _counted_timeline_indices(self):
+        # Checked timelines, or the current one when none is (as the export does)
+        indices = self.get_batch_options()[0]
+        if not indices:
+            indices = [index for index, _, is_current in self.timeline_choices if is_current]
+            if not indices:
+                indices = list(self.marker_timelines)[:1]
+        return [index for index in indices if index in self.marker_timelines]
+
+    def update_marker_count(self, *args):
+        if not self.marker_timelines:
+            self.marker_count_label.setText("")
+            return
+        try:
+            marker_filter = self.get_marker_filter()
+            matched = total = 0
+            for index in self._counted_timeline_indices():
+                timeline = self.marker_timelines[index]
+                if index not in self.timeline_markers:
+                    try:
+                        self.timeline_markers[index] = timeline.GetMarkers() or {}
+                    except Exception:
+                        self.timeline_markers[index] = {}
+                markers = self.timeline_markers[index]
+                total += len(markers)
+                matched += len(marker_filter.apply(
+                    timeline, markers, self.timecode_input.text() or DEFAULT_START_TIMECODE
+                ))
+        except ValueError as e:
+            self.marker_count_label.setStyleSheet("color: #e06c6c;")
+            self.marker_count_label.setText(str(e))
+            return str(e)
+        self.marker_count_label.setStyleSheet("")
+        self.marker_count_label.setText(f"{matched} of {total} markers")
+
+    # ----------------------------------------------------------------
+    # Select All / Deselect All
+    # ----------------------------------------------------------------
+    def select_all_items(self):
+        for i in range(self.list_widget.count()):
+            item = self.list_widget.item(i)
+            if item.data(self.field_role) == "field":
+                item.setCheckState(QtCore.Qt.Checked)
+
+    def deselect_all_items(self):
+        for i in range(self.list_widget.count()):
+            item = self.list_widget.item(i)
+            if item.data(self.field_role) == "field":
+                item.setCheckState(QtCore.Qt.Unchecked)
+
+    # ----------------------------------------------------------------
+    # Return final selections
+    # ----------------------------------------------------------------
+    def get_values(self):
+        selected_fields = []
+        for i in range(self.list_widget.count()):
+            item = self.list_widget.item(i)
+            if item.data(self.field_role) != "field":
+                continue
+            if item.checkState() == QtCore.Qt.Checked:
+                selected_fields.append(item.text())
+
+        size_text = self.size_combo.currentText()
+        if size_text == "CUSTOM":
+            multiplier = self.custom_size_input.value()
+            image_size = 260 * multiplier
+        elif size_text == "LARGE":
+            image_size = 520
+        else:
+            image_size = 260
+
+        timecode = self.timecode_input.text() or "01:00:00:00"
+        delete_stills = self.delete_stills_checkbox.isChecked()
+        return selected_fields, image_size, timecode, delete_stills
+
+    def get_batch_options(self):
+        """(checked timeline indices for GetTimelineByIndex(), "workbooks" or "sheets")."""
+        if self.timeline_list is None:
+            return [], "workbooks"
+        indices = []
+        for i in range(self.timeline_list.count()):
+            item = self.timeline_list.item(i)
+            if item.checkState() == QtCore.Qt.Checked:
+                indices.append(item.data(QtCore.Qt.UserRole))
+        return indices, self.batch_mode_combo.currentData()
+
+    def get_thumbnail_options(self):
+        return {
+            "format": "jpeg" if self.format_combo.currentText() == "JPEG" else "png",
+            "quality": self.quality_input.value(),
+            "keep_files": self.keep_thumbnails_checkbox.isChecked(),
+        }
+
+
+# -----------------------------------------------------------------------------
+# 9) Headless command line
+# -----------------------------------------------------------------------------
+# ShotlistCreator --headless --output /path/Project_shotlist_v001.xlsx
+#     [--preset fields.json] [--size 520] [--timeline NAME | --all-timelines] ...
+# Runs the whole export with no dialogs and no Qt event loop, for scripted
+# overnight runs. Progress goes to stderr, a JSON summary to stdout.
+
+OVERWRITE_POLICIES = ("fail", "replace", "rename", "resume")
+
+
+def parse_cli_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog=APP_NAME,
+        description="Export the markers of DaVinci Resolve timelines to a shotlist without the options dialog.",
+    )
+    parser.add_argument("--headless", action="store_true", help="run without any dialogs (required for the options below)")
+    parser.add_argument(
+        "--output", required=True,
+        help="shotlist path, .xlsx, .csv or .jsonl; as with the Save dialog, it goes into a subfolder "
+             "named after the file",
+    )
+    parser.add_argument("--project", help="project to load (default: the current project)")
+    parser.add_argument(
+        "--preset",
+        help='preset saved from the options dialog ({"order": [...], "checked": [...], "marker_filter": {...}})',
+    )
+    parser.add_argument("--size", type=int, default=260, help="thumbnail width in pixels (default: 260, LARGE is 520)")
+    parser.add_argument("--start-timecode", default=DEFAULT_START_TIMECODE, help="timeline start timecode fallback")
+    parser.add_argument(
+        "--timeline", action="append", default=[], metavar="NAME",
+        help="timeline to export, repeat for several (default: the current timeline)",
+    )
+    parser.add_argument("--all-timelines", action="store_true", help="export every timeline of the project")
+    parser.add_argument("--sheets", action="store_true", help="several timelines go to one workbook, a sheet each")
+    parser.add_argument(
+        "--overwrite", choices=OVERWRITE_POLICIES, default="fail",
+        help="when the output folder exists: fail (default), replace it, rename the new export, "
+             "or resume an interrupted export in it",
+    )
+    parser.add_argument("--format", choices=("png", "jpeg"), default="png", help="thumbnail format")
+    parser.add_argument("--quality", type=int, default=DEFAULT_THUMBNAIL_OPTIONS["quality"], help="JPEG quality")
+    parser.add_argument("--no-keep-thumbnails", action="store_true", help="embed thumbnails without keeping the files")
+    parser.add_argument("--delete-stills", action="store_true", help="delete all stills from the gallery album first")
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="write a profiling report (phase timings, Resolve call counts) next to the workbook",
+    )
+    parser.add_argument("--profile-cprofile", action="store_true", help="also save a cProfile dump (.pstats)")
+    parser.add_argument("--profile-tracemalloc", action="store_true", help="also trace memory allocations")
+    return parser.parse_args(argv)
+
+
+def select_timelines(project, names=None, all_timelines=False):
+    """Timelines to export: all of them, the ones named (in that order), or the current one."""
+    timelines = [timeline for _, timeline in project_timelines(project)]
+    if all_timelines:
+        if not timelines:
+            raise RuntimeError("The project has no timelines.")
+        return timelines
+    if not names:
+        current = project.GetCurrentTimeline()
+        if current is None:
+            raise RuntimeError("No timeline is currently active.")
+        return [current]
+
+    by_name = {}
+    for timeline in timelines:
+        by_name.setdefault(timeline.GetName(), timeline)
+    missing = [name for name in names if name not in by_name]
+    if missing:
+        raise ValueError(f"Timeline not found: {', '.join(missing)}")
+    return [by_name[name] for name in dict.fromkeys(names)]
+
+
+def prepare_output_folder(output_path, file_name, overwrite="fail"):
+    """
+    ask_create_subfolder() without the prompts: an existing subfolder is handled
+    by the overwrite policy instead of asking. Returns (subfolder path, file name).
+    """
+    subfolder_name = os.path.splitext(file_name)[0]
+    subfolder_path = os.path.join(output_path, subfolder_name)
+    if os.path.exists(subfolder_path):
+        if overwrite == "replace":
+            set_aside_previous_exports(subfolder_path)
+            _clear_folder(subfolder_path)
+        elif overwrite == "rename":
+            counter = 2
+            while os.path.exists(os.path.join(output_path, f"{subfolder_name}_{counter}")):
+                counter += 1
+            subfolder_name = f"{subfolder_name}_{counter}"
+            subfolder_path = os.path.join(output_path, subfolder_name)
+            file_name = subfolder_name + os.path.splitext(file_name)[1]
+        elif overwrite != "resume":
+            raise FileExistsError(
+                f"'{subfolder_path}' already exists. Use --overwrite replace, rename or resume."
+            )
+    os.makedirs(subfolder_path, exist_ok=True)
+    return subfolder_path, file_name
+
+
+def headless_export(args):
+    """Run an export from parsed command-line arguments. Returns the summary dict."""
+    resolve = get_resolve()
+    if resolve is None:
+        raise RuntimeError("DaVinci Resolve Studio is not available.")
+    project_manager = resolve.GetProjectManager()
+    if project_manager is None:
+        raise RuntimeError("Could not access Resolve project manager.")
+    if args.project:
+        project = project_manager.LoadProject(args.project)
+        if not project:
+            raise RuntimeError(f"Could not open project '{args.project}'.")
+    else:
+        project = project_manager.GetCurrentProject()
+        if project is None:
+            raise RuntimeError("No project is currently open.")
+
+    marker_filter = MarkerFilter()
+    if args.preset:
+        with open(args.preset, "r", encoding="utf-8") as f:
+            preset = json.load(f)
+        selected_fields = preset_fields(preset)
+        marker_filter = MarkerFilter(preset.get("marker_filter"))
+    else:
+        selected_fields = sorted(DEFAULT_SELECTED_FIELDS, key=lambda f: FIELD_SECTIONS.index(field_section(f)))
+    if not selected_fields:
+        raise ValueError("No metadata fields selected in the preset.")
+
+    timelines = select_timelines(project, args.timeline, args.all_timelines)
+    for timeline in timelines:
+        try:
+            timecode_to_frames(args.start_timecode, *get_timeline_rate(timeline))
+        except ValueError:
+            raise ValueError(
+                f"'{args.start_timecode}' is not a valid timecode for timeline '{timeline.GetName()}'."
+            ) from None
+    if not any(timeline.GetMarkers() for timeline in timelines):
+        raise RuntimeError("No markers found on the selected timelines.")
+    if marker_filter and not any(
+        marker_filter.apply(timeline, timeline.GetMarkers() or {}, args.start_timecode) for timeline in timelines
+    ):
+        raise RuntimeError("No markers on the selected timelines match the preset's marker filter.")
+
+    output_path, excel_filename = os.path.split(os.path.abspath(args.output))
+    excel_filename = output_file_name(excel_filename)
+    output_path, excel_filename = prepare_output_folder(output_path, excel_filename, args.overwrite)
+    layout = batch_layout(output_path, excel_filename, timelines, "sheets" if args.sheets else "workbooks")
+    resume = args.overwrite == "resume" and any(entry["journal"].exists() for entry in layout)
+
+    thumbnail_options = {
+        "format": args.format,
+        "quality": args.quality,
+        "keep_files": not args.no_keep_thumbnails,
+    }
+    metadata_cache = MetadataCache()
+    thumbnail_store = ThumbnailStore() if _load_settings().get("thumbnail_store", True) is not False else None
+    profiler = RunProfiler.from_settings(
+        os.path.join(output_path, excel_filename),
+        enabled=(args.profile or args.profile_cprofile or args.profile_tracemalloc) or None,
+        cprofile=args.profile_cprofile or None,
+        trace_memory=args.profile_tracemalloc or None,
+    )
+    try:
+        summaries = export_timelines(
+            project, layout, selected_fields, args.size, args.start_timecode, thumbnail_options,
+            args.delete_stills, metadata_cache, thumbnail_store, resume=resume, ask=False, profiler=profiler,
+            marker_filter=marker_filter,
+        )
+    finally:
+        if thumbnail_store is not None:
+            thumbnail_store.close()
+    return {
+        "project": project.GetName(),
+        "output": output_path,
+        "fields": selected_fields,
+        "marker_filter": marker_filter.spec,
+        "resumed": resume,
+        "metadata_cache": metadata_cache.stats(),
+        "profile": profiler.report_path if profiler is not None else None,
+        "timelines": summaries,
+    }
+
+
+def run_headless(argv=None):
+    """Command-line entry point. Prints the JSON summary and returns the exit code."""
+    args = parse_cli_args(argv)
+    summary = {"ok": False, "version": APP_VERSION}
+    started = time.perf_counter()
+    # Keep stdout machine-readable: the export's progress prints go to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            summary.update(headless_export(args))
+            summary["ok"] = True
+        except Exception as e:
+            print("Export failed:", e)
+            summary["error"] = str(e)
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["ok"] else 1
+
+
+# -----------------------------------------------------------------------------
+# 10) Main script logic
+# -----------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    # Frozen builds re-launch this executable for resize worker processes.
+    multiprocessing.freeze_support()
+
+    if "--headless" in sys.argv[1:]:
+        sys.exit(run_headless(sys.argv[1:]))
+
+    # Create Qt app
+    with _timed("Qt application"):
+        app = QtWidgets.QApplication.instance()
+        if not app:
+            app = QtWidgets.QApplication([])
+        set_dark_theme(app)
+        app_icon_path = _resource_path("icon.png")
+        if os.path.exists(app_icon_path):
+            app.setWindowIcon(QtGui.QIcon(app_icon_path))
+
+    try:
+        resolve = get_resolve()
+    except RuntimeError as e:
+        _show_startup_error(str(e))
+        sys.exit(1)
+    if resolve is None:
+        QtWidgets.QMessageBox.critical(
+            None,
+            APP_TITLE,
+            "DaVinci Resolve Studio is not available.\n\nOpen Resolve Studio and run ShotlistCreator again.",
+        )
+        sys.exit(1)
+
+    projectManager = resolve.GetProjectManager()
+    if projectManager is None:
+        QtWidgets.QMessageBox.critical(
+            None,
+            APP_TITLE,
+            "Could not access Resolve project manager.\n\nPlease restart DaVinci Resolve Studio and try again.",
+        )
+        sys.exit(1)
+
+    currentProject = projectManager.GetCurrentProject()
+    if currentProject is None:
+        QtWidgets.QMessageBox.warning(
+            None,
+            APP_TITLE,
+            "No project is currently open.\n\nOpen a project in DaVinci Resolve Studio and run again.",
+        )
+        sys.exit(1)
+
+    currentTimeline = currentProject.GetCurrentTimeline()
+    if currentTimeline is None:
+        QtWidgets.QMessageBox.warning(
+            None,
+            APP_TITLE,
+            "No timeline is currently active.\n\nOpen a timeline and run ShotlistCreator again.",
+        )
+        sys.exit(1)
+
+    persistent_cache = PersistentMetadataCache()
+    first_dialog = True
+    discovery = None
+    thumbnail_store = ThumbnailStore() if _load_settings().get("thumbnail_store", True) is not False else None
+
+    while True:
+        if discovery is not None:
+            # Back to the options: the scan left running for the last dialog is not needed now
+            discovery.requestInterruption()
+            discovery.wait()
+
+        currentProject = projectManager.GetCurrentProject()
+        if currentProject is None:
+            QtWidgets.QMessageBox.warning(
+                None,
+                APP_TITLE,
+                "No project is currently open.\n\nOpen a project in DaVinci Resolve Studio and run again.",
+            )
+            sys.exit(1)
+
+        currentTimeline = currentProject.GetCurrentTimeline()
+        if currentTimeline is None:
+            QtWidgets.QMessageBox.warning(
+                None,
+                APP_TITLE,
+                "No timeline is currently active.\n\nOpen a timeline and run ShotlistCreator again.",
+            )
+            sys.exit(1)
+
+        project_name = currentProject.GetName()
+        metadata_cache = MetadataCache()
+
+        current_timeline_id = _safe_timeline_item_call(currentTimeline, "GetUniqueId")
+        timeline_choices = [
+            (index, timeline.GetName(), _safe_timeline_item_call(timeline, "GetUniqueId") == current_timeline_id)
+            for index, timeline in project_timelines(currentProject)
+        ]
+
+        # Open the dialog right away; discovered fields stream into it.
+        dialog = UserInputDialog(
+            STANDARD_FIELDS, timelines=timeline_choices, marker_timelines=dict(project_timelines(currentProject))
+        )
+        discovery = FieldDiscoveryThread(currentProject, currentTimeline, metadata_cache, persistent_cache)
+        discovery.fields_discovered.connect(dialog.add_fields)
+        discovery.progress.connect(dialog.set_discovery_progress)
+        discovery.discovery_finished.connect(dialog.on_discovery_finished)
+        discovery.start()
+        if first_dialog:
+            first_dialog = False
+            QtCore.QTimer.singleShot(0, lambda: print("Startup:", startup_report()))
+            threading.Thread(target=preload_export_modules, daemon=True).start()
+        accepted = dialog.exec() == QtWidgets.QDialog.Accepted
+        # After OK the scan keeps going next to the export, so the next run finds
+        # its field list cached; unless scripting calls must not overlap
+        # ("discovery_workers": 1 in settings.json)
+        if not accepted or int(_load_settings().get("discovery_workers", DISCOVERY_WORKERS)) <= 1:
+            discovery.requestInterruption()
+            discovery.wait()
+        item_index = discovery.item_index if discovery.isFinished() else None
+        if not accepted:
+            print("Operation cancelled.")
+            break
+
+        selected_fields, image_size, timecode_to_set, delete_stills = dialog.get_values()
+        thumbnail_options = dialog.get_thumbnail_options()
+        timeline_indices, batch_mode = dialog.get_batch_options()
+        marker_filter = dialog.get_marker_filter()
+        if not selected_fields:
+            QtWidgets.QMessageBox.information(
                 None,
                 APP_TITLE,
                 "No metadata fields selected. Please choose at least one field.",
@@ -1185,105 +4729,140 @@ if __name__ == "__main__":
             )
             continue
 
-        markers = currentTimeline.GetMarkers()
-        if not markers:
+        try:
+            timecode_to_frames(timecode_to_set, *get_timeline_rate(currentTimeline))
+        except ValueError:
+            QtWidgets.QMessageBox.information(
+                None,
+                APP_TITLE,
+                f"'{timecode_to_set}' is not a valid timecode for this timeline.\n\n"
+                "Please enter it as HH:MM:SS:FF.",
+            )
+            continue
+
+        timelines = [currentTimeline]
+        if timeline_indices:
+            timelines = [t for t in map(currentProject.GetTimelineByIndex, timeline_indices) if t]
+        item_indexes = {item_index.timeline_id: item_index} if item_index is not None else {}
+
+        if not any(timeline.GetMarkers() for timeline in timelines):
             QtWidgets.QMessageBox.information(
                 None,
                 APP_TITLE,
-                "No markers found on the current timeline.\n\n"
+                "No markers found on the selected timelines.\n\n"
                 "Please add markers or switch to a timeline with markers,\n"
                 "then press OK to return to options.",
             )
             continue
+        try:
+            filtered = not marker_filter or any(
+                marker_filter.apply(timeline, timeline.GetMarkers() or {}, timecode_to_set) for timeline in timelines
+            )
+        except ValueError as e:
+            QtWidgets.QMessageBox.information(
+                None, APP_TITLE, f"{e}\n\nPress OK to return to options."
+            )
+            continue
+        if not filtered:
+            QtWidgets.QMessageBox.information(
+                None,
+                APP_TITLE,
+                "No markers on the selected timelines match the marker filter.\n\n"
+                "Press OK to return to options.",
+            )
+            continue
 
-        # Set timecode
-        currentTimeline.SetCurrentTimecode(timecode_to_set)
-
-        # Delete stills if requested
-        if delete_stills:
-            resolve.OpenPage("color")
-            gallery = currentProject.GetGallery()
-            currentStillAlbum = gallery.GetCurrentStillAlbum()
-            stills = currentStillAlbum.GetStills()
-            if stills:
-                success = currentStillAlbum.DeleteStills(stills)
-                if success:
-                    print("All stills have been successfully deleted.")
-                else:
-                    print("Failed to delete stills.")
-            else:
-                print("No stills found in the album.")
+        # Ask user for output path up front, so capture can stream straight into it
+        full_path = get_save_file_name(project_name)
+        if not full_path:
+            print("No output folder and filename selected.")
+            continue
 
-        # Prepare to collect marker-based data
-        timecodes = []
-        metadata_list = []
+        output_path, excel_filename = os.path.split(full_path)
+        excel_filename = output_file_name(excel_filename)
 
-        # Focus the timeline cross-platform
-        focus_on_timeline()
-        keyboard = Controller()
+        # Pick up an interrupted export of the same file, or create subfolder if needed
+        layout = batch_layout(
+            os.path.join(output_path, os.path.splitext(excel_filename)[0]), excel_filename, timelines, batch_mode
+        )
+        journals = [entry["journal"] for entry in layout if entry["journal"].exists()]
+        resume = bool(journals) and ask_resume_export(
+            excel_filename, sum(len(journal.load()[1]) for journal in journals)
+        )
+        if resume:
+            output_path = os.path.join(output_path, os.path.splitext(excel_filename)[0])
+        else:
+            output_path, excel_filename = ask_create_subfolder(output_path, excel_filename)
+            if not output_path:
+                continue
+            layout = batch_layout(output_path, excel_filename, timelines, batch_mode)
 
-        # For each marker
-        for i, (frame_id, marker) in enumerate(markers.items()):
-            numMarkersToEnd = len(markers) - (i + 1)
-            print("Number of markers until the end of the timeline:", numMarkersToEnd)
+        if THUMBNAIL_FIELD not in selected_fields:
+            # Metadata-only export: rows come straight from the markers and the
+            # item index, the playhead never moves and no stills are grabbed.
+            print("No thumbnail column selected, exporting metadata only.")
 
-            # Press "0" to jump to next marker
-            keyboard.press("0")
-            keyboard.release("0")
-            time.sleep(0.2)
+        # Name the thumbnails here, the prompts about existing files need the GUI
+        # thread. Thumbnails of a resumed run are already there and are reused.
+        try:
+            plan = plan_timelines(
+                layout, selected_fields, thumbnail_options, not resume, marker_filter, timecode_to_set
+            )
+        except ValueError as e:
+            QtWidgets.QMessageBox.information(
+                None, APP_TITLE, f"{e}\n\nPress OK to return to options."
+            )
+            continue
+        if plan is None:
+            continue
 
-            # Get the new timecode
-            currentTimecode = currentTimeline.GetCurrentTimecode()
-            timecodes.append(currentTimecode)
-
-            # Grab still
-            currentTimeline.GrabStill()
-
-            # Also gather clip metadata at this marker
-            clip_metadata = {}
-            current_clip = currentTimeline.GetCurrentVideoItem()
-            if current_clip:
-                clip_metadata["Clip Name"] = current_clip.GetName()
-                clip_metadata.update(_collect_timeline_item_metadata(current_clip))
-                mp_item = current_clip.GetMediaPoolItem()
-                if mp_item:
-                    props = mp_item.GetClipProperty()
-                    for k, v in props.items():
-                        clip_metadata[k] = v
-            else:
-                clip_metadata["Clip Name"] = "N/A"
-                clip_metadata["Record In"] = ""
-                clip_metadata["Record Out"] = ""
-                clip_metadata["Source In"] = ""
-                clip_metadata["Source Out"] = ""
-                clip_metadata["Record Duration"] = ""
-                clip_metadata["Source Start Time"] = ""
-                clip_metadata["Source End Time"] = ""
-                clip_metadata["Track Type"] = ""
-                clip_metadata["Track Index"] = ""
-
-            metadata_list.append(clip_metadata)
-
-            if numMarkersToEnd == 0:
-                break
+        # Capture and export on a worker thread, with progress and a Stop button
+        export_thread = ExportThread(currentProject, layout, plan, {
+            "selected_fields": selected_fields,
+            "image_size": image_size,
+            "start_timecode": timecode_to_set,
+            "thumbnail_options": thumbnail_options,
+            "delete_stills": delete_stills,
+            "cache": metadata_cache,
+            "thumbnail_store": thumbnail_store,
+            "item_indexes": item_indexes,
+            "resume": resume,
+            "profiler": RunProfiler.from_settings(os.path.join(output_path, excel_filename)),
+        })
+        progress_dialog = ExportProgressDialog(sum(len(markers) for _, markers, _ in plan))
+        export_thread.progress.connect(progress_dialog.set_progress)
+        # Accessibility permission and the key binding only matter once keys are pressed
+        export_thread.keyboard_needed.connect(
+            lambda: export_thread.answer_keyboard(confirm_keyboard_navigation())
+        )
+        export_thread.finished.connect(progress_dialog.accept)
+        progress_dialog.cancel_requested.connect(export_thread.requestInterruption)
+        export_thread.start()
+        progress_dialog.exec()
+        export_thread.wait()
 
-        # Ask user for output path
-        full_path = get_save_file_name(project_name)
-        if not full_path:
-            print("No output folder and filename selected.")
+        if export_thread.error is not None:
+            QtWidgets.QMessageBox.critical(
+                None,
+                APP_TITLE,
+                f"The export failed:\n{export_thread.error}\n\n"
+                "Markers finished so far are kept. Export to the same file again and choose Resume to continue.",
+            )
             continue
-
-        output_path, excel_filename = os.path.split(full_path)
-        if not excel_filename.endswith(".xlsx"):
-            excel_filename += ".xlsx"
-
-        # Create subfolder if needed
-        output_path, excel_filename = ask_create_subfolder(output_path, excel_filename)
-        if output_path:
-            export_markers(
-                currentTimeline, output_path, timecodes, excel_filename,
-                metadata_list, selected_fields, image_size
+        summaries = export_thread.summaries or []
+        if any(summary["cancelled"] for summary in summaries) or len(summaries) < len(plan):
+            written = sum(summary["written"] for summary in summaries)
+            QtWidgets.QMessageBox.information(
+                None,
+                APP_TITLE,
+                f"Export stopped after {written} of {progress_dialog.total} markers.\n\n"
+                "Export to the same file again and choose Resume to continue.",
             )
-            print("DONE")
-            open_folder_in_explorer(output_path)
-            break
+        print("Metadata cache:", metadata_cache.stats())
+        print("DONE")
+        open_folder_in_explorer(output_path)
+        break
+
+    if discovery is not None and discovery.isRunning():
+        print("Finishing the metadata field scan for the next run...")
+        discovery.wait()
@@ -0,0 +1,202 @@
+"""
+A stand-in for the parts of the DaVinci Resolve scripting API the export uses:
+one timeline of clips with a marker on each, and a still album whose exported
+stills are solid-color images that depend on the grabbed frame.
+"""
+import os
+
+from PIL import Image
+
+import ShotlistCreator
+
+
+class Still:
+    def __init__(self, number, frame):
+        self.frame = frame
+        self.label = f"1.1.{number}"
+
+
+class Album:
+    def __init__(self):
+        self.stills = []
+
+    def GetStills(self):
+        return list(self.stills)
+
+    def GetLabel(self, still):
+        return still.label
+
+    def SetLabel(self, still, label):
+        still.label = label
+        return True
+
+    def DeleteStills(self, stills):
+        self.stills = [s for s in self.stills if s not in stills]
+        return True
+
+    def ExportStills(self, stills, path, prefix, still_format):
+        for still in stills:
+            color = (still.frame * 7 % 256, still.frame * 3 % 256, 100)
+            Image.new("RGB", (640, 360), color).save(os.path.join(path, f"{prefix}_{still.label}.{still_format}"))
+            with open(os.path.join(path, f"{prefix}_{still.label}.drx"), "w") as f:
+                f.write("drx")
+        return True
+
+
+class MediaPoolItem:
+    def __init__(self, number):
+        self.number = number
+
+    def GetUniqueId(self):
+        return f"mp{self.number}"
+
+    def GetClipProperty(self):
+        return {"Clip Name": f"clip{self.number}.mov", "FPS": "24", "File Path": f"/media/clip{self.number}.mov"}
+
+
+class TimelineItem:
+    def __init__(self, number, start, end):
+        self.number = number
+        self.start = start
+        self.end = end
+        self.version = "Version 1"
+
+    def GetUniqueId(self):
+        return f"item{self.number}"
+
+    def GetName(self):
+        return f"clip{self.number}.mov"
+
+    def GetProperty(self):
+        return {"ZoomX": 1.0}
+
+    def GetStart(self, subframe=False):
+        return self.start
+
+    def GetEnd(self, subframe=False):
+        return self.end
+
+    def GetDuration(self, subframe=False):
+        return self.end - self.start
+
+    def GetSourceStartFrame(self):
+        return 1000
+
+    def GetSourceEndFrame(self):
+        return 1000 + self.end - self.start
+
+    def GetMediaPoolItem(self):
+        return MediaPoolItem(self.number)
+
+    def GetCurrentVersion(self):
+        return {"versionName": self.version, "versionType": 0}
+
+    def GetNumNodes(self):
+        return 1
+
+    def GetLUT(self, node):
+        return ""
+
+
+class Timeline:
+    COLORS = ["Red", "Blue", "Green"]
+
+    def __init__(self, marker_count, unique_id="tl1", name="Timeline 1"):
+        self.start = 86400
+        self.current = self.start
+        self.unique_id = unique_id
+        self.name = name
+        self.items = [
+            TimelineItem(i, self.start + i * 100, self.start + (i + 1) * 100) for i in range(max(marker_count, 1))
+        ]
+        self.markers = {
+            float(i * 100 + 10): {
+                "name": f"M{i}", "note": f"note {i}", "duration": 1, "color": self.COLORS[i % 3], "customData": "",
+            }
+            for i in range(marker_count)
+        }
+        self.album = None
+
+    def GetUniqueId(self):
+        return self.unique_id
+
+    def GetName(self):
+        return self.name
+
+    def GetSetting(self, key):
+        return {"timelineFrameRate": "24", "timelineDropFrameTimecode": "0"}.get(key)
+
+    def GetStartFrame(self):
+        return self.start
+
+    def GetEndFrame(self):
+        return self.start + len(self.items) * 100
+
+    def GetStartTimecode(self):
+        return "01:00:00:00"
+
+    def GetTrackCount(self, track_type):
+        return 1 if track_type == "video" else 0
+
+    def GetItemListInTrack(self, track_type, index):
+        return list(self.items)
+
+    def GetIsTrackEnabled(self, track_type, index):
+        return True
+
+    def GetMarkers(self):
+        return dict(self.markers)
+
+    def SetCurrentTimecode(self, timecode):
+        self.current = ShotlistCreator.timecode_to_frames(timecode, 24)
+        return True
+
+    def GetCurrentTimecode(self):
+        return ShotlistCreator.frames_to_timecode(self.current, 24)
+
+    def GetCurrentVideoItem(self):
+        return None
+
+    def GrabStill(self):
+        still = Still(len(self.album.stills) + 1, self.current)
+        self.album.stills.append(still)
+        return still
+
+
+class Gallery:
+    def __init__(self, album):
+        self.album = album
+
+    def GetCurrentStillAlbum(self):
+        return self.album
+
+
+class Project:
+    def __init__(self, timelines):
+        self.album = Album()
+        self.timelines = timelines
+        self.current = timelines[0]
+        for timeline in timelines:
+            timeline.album = self.album
+
+    def GetName(self):
+        return "Project"
+
+    def GetUniqueId(self):
+        return "project1"
+
+    def GetGallery(self):
+        return Gallery(self.album)
+
+    def GetCurrentTimeline(self):
+        return self.current
+
+    def SetCurrentTimeline(self, timeline):
+        self.current = timeline
+        return True
+
+    def GetTimelineCount(self):
+        return len(self.timelines)
+
+    def GetTimelineByIndex(self, index):
+        return self.timelines[index - 1]
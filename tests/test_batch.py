@@ -0,0 +1,44 @@
+import os
+import zipfile
+
+import pytest
+
+import ShotlistCreator
+from fake_resolve import Project, Timeline
+
+FIELDS = ["Frame", "Name", "Clip Name", "Still/Thumbnail"]
+
+
+@pytest.mark.parametrize("keep_files", [True, False])
+def test_sheets_batch_writes_one_workbook(tmp_path, keep_files):
+    timelines = [Timeline(4, "tl1", "A"), Timeline(3, "tl2", "B")]
+    project = Project(timelines)
+    layout = ShotlistCreator.batch_layout(str(tmp_path), "shot.xlsx", timelines, "sheets")
+
+    summaries = ShotlistCreator.export_timelines(
+        project, layout, FIELDS, 160, "01:00:00:00", {"keep_files": keep_files}, ask=False,
+    )
+
+    assert [(s["timeline"], s["written"]) for s in summaries] == [("A", 4), ("B", 3)]
+    with zipfile.ZipFile(tmp_path / "shot.xlsx") as workbook:
+        pictures = [workbook.read(f"xl/drawings/drawing{n}.xml").count(b"<xdr:pic>") for n in (1, 2)]
+    assert pictures == [4, 3]
+    for entry in layout:
+        assert not entry["journal"].exists()
+        assert not os.path.exists(entry["journal"].thumbnail_dir)
+    assert project.GetCurrentTimeline() is timelines[0]
+
+
+def test_journals_survive_a_failed_workbook_close(tmp_path, monkeypatch):
+    timelines = [Timeline(2, "tl1", "A"), Timeline(2, "tl2", "B")]
+    layout = ShotlistCreator.batch_layout(str(tmp_path), "shot.xlsx", timelines, "sheets")
+
+    def fail_close(self):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ShotlistCreator.ShotlistWorkbook, "close", fail_close)
+    with pytest.raises(OSError):
+        ShotlistCreator.export_timelines(
+            Project(timelines), layout, FIELDS, 160, "01:00:00:00", {"keep_files": False}, ask=False,
+        )
+    assert all(entry["journal"].exists() for entry in layout)
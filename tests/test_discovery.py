@@ -0,0 +1,75 @@
+import time
+
+import ShotlistCreator
+from fake_resolve import MediaPoolItem, Project, Timeline, TimelineItem
+
+
+class VariedMediaPoolItem(MediaPoolItem):
+    def GetClipProperty(self):
+        # Slower on some items, so batches finish out of order
+        time.sleep(0.001 * (self.number % 3))
+        props = super().GetClipProperty()
+        props[f"Camera {self.number % 7}"] = "A"
+        if self.number % 5 == 0:
+            props["Reel Name"] = f"R{self.number}"
+        if self.number == 290:
+            props["Late Key"] = "only on the last batch"
+        return props
+
+
+class VariedTimelineItem(TimelineItem):
+    def GetProperty(self):
+        return {"ZoomX": 1.0, f"Transform {self.number % 4}": 0}
+
+    def GetMediaPoolItem(self):
+        # Generators and titles have no media pool item
+        return None if self.number % 11 == 0 else VariedMediaPoolItem(self.number)
+
+
+class VariedTimeline(Timeline):
+    def __init__(self, item_count):
+        super().__init__(0)
+        self.items = [
+            VariedTimelineItem(i, self.start + i * 10, self.start + (i + 1) * 10) for i in range(item_count)
+        ]
+
+
+def discover(timeline, persistent_cache, should_stop=None):
+    return ShotlistCreator.discover_timeline_fields(
+        Project([timeline]), timeline, ShotlistCreator.MetadataCache(), persistent_cache, should_stop=should_stop,
+    )[0]
+
+
+def test_stopped_scan_keeps_the_clip_properties_it_fetched(tmp_path):
+    ShotlistCreator._save_settings({"discovery_workers": 1})
+    persistent_cache = ShotlistCreator.PersistentMetadataCache(str(tmp_path / "cache.sqlite3"))
+    timeline = Timeline(100)
+    batches = []
+    discover(timeline, persistent_cache, should_stop=lambda: batches.append(1) or len(batches) > 2)
+
+    # Two batches were scanned: their clip properties are kept, the incomplete field list is not
+    stored = persistent_cache.load_clip_properties("project1")
+    assert len(stored) == 2 * ShotlistCreator.DISCOVERY_BATCH_SIZE
+    assert persistent_cache.get_fields(
+        "project1", timeline.GetUniqueId(), ShotlistCreator.timeline_fingerprint(timeline)
+    ) is None
+
+    fields = discover(timeline, persistent_cache)
+    assert "File Path" in fields
+    assert len(persistent_cache.load_clip_properties("project1")) == 100
+    assert persistent_cache.get_fields(
+        "project1", timeline.GetUniqueId(), ShotlistCreator.timeline_fingerprint(timeline)
+    ) == fields
+
+
+def test_concurrent_discovery_gives_the_serial_field_list():
+    # Ten batches over four workers
+    timeline = VariedTimeline(300)
+    serial = ShotlistCreator.gather_all_metadata_keys_from_timeline(
+        timeline, cache=ShotlistCreator.MetadataCache(), workers=1
+    )
+    concurrent = ShotlistCreator.gather_all_metadata_keys_from_timeline(
+        timeline, cache=ShotlistCreator.MetadataCache(), workers=4
+    )
+    assert concurrent == serial
+    assert {"Camera 6", "Reel Name", "Late Key", f"{ShotlistCreator.TIMELINE_PREFIX} Transform 3"} <= set(serial)
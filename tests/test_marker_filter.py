@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import ShotlistCreator
+from ShotlistCreator import QtWidgets
+from fake_resolve import Timeline
+
+
+@pytest.fixture
+def dialog(monkeypatch):
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    warnings = []
+    monkeypatch.setattr(QtWidgets.QMessageBox, "warning", lambda *args: warnings.append(args[-1]))
+    dialog = ShotlistCreator.UserInputDialog(
+        ShotlistCreator.STANDARD_FIELDS, marker_timelines={1: Timeline(6)}
+    )
+    dialog.warnings = warnings
+    yield dialog
+    dialog.deleteLater()
+    app.processEvents()
+
+
+def test_range_is_checked_at_the_timeline_rate():
+    marker_filter = ShotlistCreator.MarkerFilter({"start": "01:00:00:30"})
+    with pytest.raises(ValueError, match="Timeline 1"):
+        marker_filter.apply(Timeline(6), Timeline(6).GetMarkers())
+    assert len(ShotlistCreator.MarkerFilter({"start": "01:00:00:20"}).apply(Timeline(6), Timeline(6).GetMarkers())) == 5
+
+
+def test_dialog_refuses_a_range_past_the_timeline_rate(dialog):
+    dialog.filter_start_input.setText("01:00:00:30")
+    dialog.accept()
+    assert dialog.result() == 0
+    assert "Timeline 1" in dialog.warnings[0]
+
+
+def test_dialog_accepts_a_valid_range(dialog):
+    dialog.filter_start_input.setText("01:00:00:20")
+    dialog.accept()
+    assert dialog.result() == 1
+    assert not dialog.warnings
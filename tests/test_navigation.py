@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import ShotlistCreator
+from ShotlistCreator import QtWidgets
+from fake_resolve import Project, Timeline
+
+
+class SeeklessTimeline(Timeline):
+    """A timeline on which Resolve refuses SetCurrentTimecode()."""
+
+    def SetCurrentTimecode(self, timecode):
+        return False
+
+
+def test_direct_seek_does_not_ask_for_the_keyboard():
+    asked = []
+    navigator = ShotlistCreator.MarkerNavigator(Timeline(3), confirm_keyboard=lambda: asked.append(1) or True)
+    for frame in Timeline(3).GetMarkers():
+        navigator.goto(frame)
+    assert not navigator.use_keyboard
+    assert asked == []
+
+
+def test_refused_keyboard_stops_the_navigator():
+    asked = []
+    navigator = ShotlistCreator.MarkerNavigator(SeeklessTimeline(3), confirm_keyboard=lambda: asked.append(1) or False)
+    with pytest.raises(RuntimeError):
+        navigator.goto(10)
+    assert asked == [1]
+
+
+def test_export_thread_asks_on_the_gui_thread(tmp_path, monkeypatch):
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    timelines = [SeeklessTimeline(2, "tl1", "A"), SeeklessTimeline(2, "tl2", "B")]
+    layout = ShotlistCreator.batch_layout(str(tmp_path), "shot.xlsx", timelines)
+    plan = ShotlistCreator.plan_timelines(layout, ["Frame", ShotlistCreator.THUMBNAIL_FIELD], ask=False)
+    thread = ShotlistCreator.ExportThread(Project(timelines), layout, plan, {
+        "selected_fields": ["Frame", ShotlistCreator.THUMBNAIL_FIELD],
+        "image_size": 160,
+        "start_timecode": "01:00:00:00",
+    })
+    asked = []
+    monkeypatch.setattr(ShotlistCreator, "confirm_keyboard_navigation", lambda: asked.append(1) or False)
+    thread.keyboard_needed.connect(lambda: thread.answer_keyboard(ShotlistCreator.confirm_keyboard_navigation()))
+    thread.finished.connect(app.quit)
+    thread.start()
+    app.exec()
+    thread.wait()
+    assert isinstance(thread.error, RuntimeError)
+    assert asked == [1]
@@ -0,0 +1,38 @@
+import concurrent.futures
+import importlib
+import multiprocessing
+import os
+import subprocess
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def resize_in_worker(source_path):
+    """Resize in the worker and report which heavy modules it loaded."""
+    import ShotlistCreator
+
+    data, width, height = ShotlistCreator.resize_thumbnail((source_path, 80, {"format": "png"}, None))
+    return width, height, "PySide6" in sys.modules
+
+
+def test_spawned_resize_workers_do_not_load_qt(tmp_path):
+    from PIL import Image
+
+    source = tmp_path / "still.png"
+    Image.new("RGB", (640, 360), (10, 20, 30)).save(source)
+    # Spawned workers (the default on Windows and macOS) re-run the main module,
+    # which is this file run as a script, and with it ShotlistCreator's top level
+    result = subprocess.run(
+        [sys.executable, os.path.join(TESTS_DIR, "test_resize.py"), str(source)],
+        env=dict(os.environ, PYTHONPATH=os.path.dirname(TESTS_DIR)), capture_output=True, text=True, timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "(80, 45, False) True"
+
+
+if __name__ == "__main__":
+    # The parent loads Qt as the app does
+    importlib.import_module("ShotlistCreator")
+    with concurrent.futures.ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        print(executor.submit(resize_in_worker, sys.argv[1]).result(), "PySide6" in sys.modules)
@@ -0,0 +1,107 @@
+import json
+import os
+import subprocess
+import sys
+import zipfile
+
+import pytest
+
+FIELDS = ["Frame", "Timecode", "Name", "Color", "Clip Name", "File Path", "Still/Thumbnail"]
+MARKERS = 30
+KILL_AFTER = 12
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def export(output_path, keep_files, resume=False, kill_after=None):
+    """Export the fake timeline into output_path; with kill_after the process dies after that many rows."""
+    import ShotlistCreator
+    from fake_resolve import Project, Timeline
+
+    timeline = Timeline(MARKERS)
+    project = Project([timeline])
+    layout = ShotlistCreator.batch_layout(output_path, "shotlist.xlsx", [timeline])
+
+    def progress(stage, done, total):
+        if kill_after is not None and stage == "write" and done == kill_after:
+            os._exit(3)
+
+    ShotlistCreator.export_timelines(
+        project, layout, FIELDS, 160, "01:00:00:00", {"format": "png", "keep_files": keep_files},
+        resume=resume, ask=False, progress_callback=progress,
+    )
+
+
+def run_export(output_path, home, keep_files, resume=False, kill_after=None):
+    env = dict(
+        os.environ, HOME=str(home), APPDATA=str(home),
+        PYTHONPATH=os.pathsep.join([os.path.dirname(TESTS_DIR), TESTS_DIR]),
+    )
+    args = json.dumps([str(output_path), keep_files, resume, kill_after])
+    return subprocess.run(
+        [sys.executable, os.path.join(TESTS_DIR, "test_resume.py"), args],
+        env=env, capture_output=True, text=True, timeout=300,
+    )
+
+
+def workbook_parts(path):
+    # Everything but the document properties, which hold the creation time
+    with zipfile.ZipFile(path) as workbook:
+        return {
+            name: workbook.read(name) for name in workbook.namelist() if not name.startswith("docProps/")
+        }
+
+
+@pytest.mark.parametrize("keep_files", [True, False])
+def test_killed_run_resumes_to_identical_workbook(tmp_path, keep_files):
+    homes = [tmp_path / "home_reference", tmp_path / "home_resumed"]
+    for home in homes:
+        home.mkdir()
+    reference = tmp_path / "reference"
+    resumed = tmp_path / "resumed"
+    reference.mkdir()
+    resumed.mkdir()
+
+    assert run_export(reference, homes[0], keep_files).returncode == 0
+
+    killed = run_export(resumed, homes[1], keep_files, kill_after=KILL_AFTER)
+    assert killed.returncode == 3
+    journal = resumed / ".shotlist.journal.jsonl"
+    assert journal.exists()
+
+    finished = run_export(resumed, homes[1], keep_files, resume=True)
+    assert finished.returncode == 0, finished.stderr
+    resumed_count = int(finished.stdout.split("Resuming:", 1)[1].split()[0])
+    assert KILL_AFTER - 1 <= resumed_count < MARKERS
+    assert not journal.exists()
+    assert not (resumed / ".shotlist.journal").exists()
+
+    assert workbook_parts(resumed / "shotlist.xlsx") == workbook_parts(reference / "shotlist.xlsx")
+    thumbnails = sorted(name for name in os.listdir(resumed) if name.startswith("thumb"))
+    assert thumbnails == sorted(name for name in os.listdir(reference) if name.startswith("thumb"))
+    assert len(thumbnails) == (MARKERS if keep_files else 0)
+
+
+def test_unkept_thumbnails_are_inserted_from_memory(tmp_path, monkeypatch):
+    import ShotlistCreator
+    from fake_resolve import Project, Timeline
+
+    written = []
+    write_row = ShotlistCreator.ShotlistWorkbookWriter.write_row
+
+    def record_row(self, data_row, thumbnail=None):
+        written.append(dict(thumbnail))
+        return write_row(self, data_row, thumbnail)
+
+    monkeypatch.setattr(ShotlistCreator.ShotlistWorkbookWriter, "write_row", record_row)
+    timeline = Timeline(5)
+    layout = ShotlistCreator.batch_layout(str(tmp_path), "shotlist.xlsx", [timeline])
+    ShotlistCreator.export_timelines(
+        Project([timeline]), layout, FIELDS, 160, "01:00:00:00", {"keep_files": False}, ask=False,
+    )
+    assert len(written) == 5
+    assert all(thumbnail["path"] is None and thumbnail["data"] for thumbnail in written)
+
+
+if __name__ == "__main__":
+    output_path, keep_files, resume, kill_after = json.loads(sys.argv[1])
+    export(output_path, keep_files, resume, kill_after)
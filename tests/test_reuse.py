@@ -0,0 +1,68 @@
+import json
+import os
+
+import ShotlistCreator
+from fake_resolve import Project, Timeline
+
+FIELDS = ["Frame", "Name", "Clip Name", "Still/Thumbnail"]
+
+
+def export(timeline, output_path, fields=FIELDS, image_size=160):
+    layout = ShotlistCreator.batch_layout(str(output_path), "shot.xlsx", [timeline])
+    summaries = ShotlistCreator.export_timelines(
+        Project([timeline]), layout, fields, image_size, "01:00:00:00", ask=False,
+    )
+    return summaries[0]
+
+
+def test_reexport_reuses_thumbnails_of_unchanged_shots(tmp_path):
+    timeline = Timeline(6)
+    assert export(timeline, tmp_path / "v1")["reused"] == 0
+    assert export(timeline, tmp_path / "v2")["reused"] == 6
+
+
+def test_regraded_shot_is_grabbed_again(tmp_path):
+    timeline = Timeline(6)
+    export(timeline, tmp_path / "v1")
+    timeline.items[2].version = "Version 2"
+    summary = export(timeline, tmp_path / "v2")
+    assert summary["reused"] == 5
+    assert summary["written"] == 6
+
+
+def test_manifest_without_grade_is_not_reused(tmp_path):
+    timeline = Timeline(3)
+    export(timeline, tmp_path / "v1")
+    manifest = ShotlistCreator.previous_manifest_path(timeline.GetUniqueId(), 160, "png")
+    assert len(ShotlistCreator.load_reusable_thumbnails(manifest, 160, "png")) == 3
+
+    # A manifest written before grade fingerprints were recorded
+    with open(manifest, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    for marker in data["markers"]:
+        del marker["grade"]
+    with open(manifest, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    assert ShotlistCreator.load_reusable_thumbnails(manifest, 160, "png") == {}
+
+
+def test_exports_without_thumbnails_or_at_another_size_keep_the_manifest(tmp_path):
+    timeline = Timeline(6)
+    export(timeline, tmp_path / "v1")
+    export(timeline, tmp_path / "v2", fields=["Frame", "Name"])
+    export(timeline, tmp_path / "v3", image_size=80)
+    assert export(timeline, tmp_path / "v4")["reused"] == 6
+    assert export(timeline, tmp_path / "v5", image_size=80)["reused"] == 6
+
+
+def test_replacing_the_previous_export_reuses_its_thumbnails(tmp_path):
+    timeline = Timeline(6)
+    for n in range(3):
+        folder, name = ShotlistCreator.prepare_output_folder(str(tmp_path), "shot.xlsx", "replace")
+        assert export(timeline, folder)["reused"] == (6 if n else 0)
+        assert sorted(name for name in os.listdir(folder) if name.endswith(".png")) == [
+            f"thumb{i:03d}.png" for i in range(1, 7)
+        ]
+    # Only the latest set-aside export is kept
+    previous = os.path.join(str(ShotlistCreator._previous_exports_dir()), timeline.GetUniqueId())
+    assert os.listdir(previous) == []
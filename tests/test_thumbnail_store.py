@@ -0,0 +1,60 @@
+import json
+
+import ShotlistCreator
+from ShotlistCreator import ThumbnailStore
+from fake_resolve import Project, Timeline
+
+FIELDS = ["Frame", "Name", "Still/Thumbnail"]
+
+
+def stored_variants(store):
+    return sorted(variant for (variant,) in store._execute("SELECT variant FROM entries"))
+
+
+def test_full_resolution_stills_are_evicted_before_thumbnails(tmp_path):
+    store = ThumbnailStore(str(tmp_path / "store"), max_bytes=10000)
+    for n in range(3):
+        store.put(f"shot{n}", "160.png", data=bytes([n]) * 1000)
+    # Both used more recently than any thumbnail, and together over the quota
+    store.put("shot0", ThumbnailStore.FULL_RESOLUTION, data=b"f" * 6000)
+    store.put("shot1", ThumbnailStore.FULL_RESOLUTION, data=b"g" * 6000)
+
+    assert store.get("shot0", ThumbnailStore.FULL_RESOLUTION) is None
+    assert store.get("shot1", ThumbnailStore.FULL_RESOLUTION) is not None
+    assert all(store.get(f"shot{n}", "160.png") is not None for n in range(3))
+    store.close()
+
+
+def test_thumbnails_are_evicted_least_recently_used_first(tmp_path):
+    store = ThumbnailStore(str(tmp_path / "store"), max_bytes=3500)
+    for n in range(4):
+        store.put(f"shot{n}", "160.png", data=bytes([n]) * 1000)
+    assert store.get("shot0", "160.png") is None
+    assert store.get("shot3", "160.png") is not None
+    store.close()
+
+
+def export(output_path, store, image_size):
+    timeline = Timeline(3)
+    layout = ShotlistCreator.batch_layout(str(output_path), "shot.xlsx", [timeline])
+    ShotlistCreator.export_timelines(
+        Project([timeline]), layout, FIELDS, image_size, "01:00:00:00", thumbnail_store=store, ask=False,
+    )
+
+
+def test_full_resolution_stills_are_only_stored_when_enabled(tmp_path):
+    store = ThumbnailStore(str(tmp_path / "store"))
+    export(tmp_path / "a", store, 160)
+    assert stored_variants(store) == ["160.png"] * 3
+
+    with open(ShotlistCreator._get_config_path(), "w", encoding="utf-8") as f:
+        json.dump({"thumbnail_store_full_resolution": True}, f)
+    # The same shots at another size are grabbed again, and now kept at full size too
+    export(tmp_path / "b", store, 200)
+    assert stored_variants(store) == ["160.png"] * 3 + ["200.png"] * 3 + ["full"] * 3
+    store.close()
+
+
+def test_media_pool_id():
+    cache = ShotlistCreator.MetadataCache()
+    assert cache.media_pool_id(Timeline(2).items[1]) == "mp1"
@@ -0,0 +1,86 @@
+import pytest
+
+import ShotlistCreator
+from ShotlistCreator import frames_to_timecodes, parse_frame_rate, timecodes_to_frames
+from fake_resolve import Timeline
+
+
+@pytest.mark.parametrize("nominal_fps, boundaries", [
+    # 29.97 drops frames ;00 and ;01 each minute, 59.94 drops ;00 to ;03, except every tenth minute
+    (30, {1799: "00:00:59;29", 1800: "00:01:00;02", 17981: "00:09:59;29", 17982: "00:10:00;00",
+          107892: "01:00:00;00"}),
+    (60, {3599: "00:00:59;59", 3600: "00:01:00;04", 35963: "00:09:59;59", 35964: "00:10:00;00",
+          215784: "01:00:00;00"}),
+])
+def test_drop_frame_minute_and_ten_minute_boundaries(nominal_fps, boundaries):
+    frames = list(boundaries)
+    assert frames_to_timecodes(frames, nominal_fps, True) == list(boundaries.values())
+    assert timecodes_to_frames(boundaries.values(), nominal_fps, True) == frames
+
+
+@pytest.mark.parametrize("nominal_fps", [30, 60])
+def test_drop_frame_round_trip(nominal_fps):
+    ten_minutes = _ten_minutes(nominal_fps)
+    frames = [
+        frame
+        for boundary in (0, ten_minutes // 10, 2 * ten_minutes // 10, ten_minutes, 6 * ten_minutes)
+        for frame in range(max(0, boundary - 2 * nominal_fps), boundary + 2 * nominal_fps)
+    ]
+    timecodes = frames_to_timecodes(frames, nominal_fps, True)
+    assert len(set(timecodes)) == len(frames)
+    assert timecodes_to_frames(timecodes, nominal_fps, True) == frames
+
+
+def _ten_minutes(nominal_fps):
+    return ShotlistCreator._drop_frame_constants(nominal_fps)[2]
+
+
+@pytest.mark.parametrize("timecode, nominal_fps", [
+    ("00:01:00;00", 30), ("00:01:00;01", 30), ("01:59:00;01", 30),
+    ("00:01:00;00", 60), ("00:01:00;03", 60),
+])
+def test_skipped_drop_frame_labels_are_rejected(timecode, nominal_fps):
+    with pytest.raises(ValueError):
+        timecodes_to_frames([timecode], nominal_fps, True)
+
+
+def test_tenth_minute_labels_are_not_skipped():
+    assert timecodes_to_frames(["00:10:00;00", "00:10:00;01"], 30, True) == [17982, 17983]
+
+
+@pytest.mark.parametrize("frame_rate, drop_frame, expected", [
+    (23.976, False, (24, False)),
+    ("23.976", True, (24, False)),
+    ("29.97", False, (30, False)),
+    (29.97, True, (30, True)),
+    ("59.94", True, (60, True)),
+    (25, True, (25, False)),
+    ("", False, (24, False)),
+])
+def test_parse_frame_rate(frame_rate, drop_frame, expected):
+    assert parse_frame_rate(frame_rate, drop_frame) == expected
+
+
+@pytest.mark.parametrize("frame_rate, one_hour", [(23.976, 86400), ("29.97", 108000)])
+def test_non_drop_frame_rates_count_every_frame(frame_rate, one_hour):
+    nominal_fps, drop_frame = parse_frame_rate(frame_rate)
+    assert timecodes_to_frames(["01:00:00:00"], nominal_fps, drop_frame) == [one_hour]
+    assert frames_to_timecodes([one_hour + nominal_fps * 60], nominal_fps, drop_frame) == ["01:01:00:00"]
+    with pytest.raises(ValueError):
+        timecodes_to_frames([f"00:00:00:{nominal_fps}"], nominal_fps, drop_frame)
+
+
+class DropFrameTimeline(Timeline):
+    def GetSetting(self, key):
+        return {"timelineFrameRate": "29.97", "timelineDropFrameTimecode": "1"}.get(key)
+
+
+def test_marker_timecodes_count_from_the_timeline_start():
+    assert ShotlistCreator.marker_timecodes(Timeline(0), [0, 10, 24 * 60]) == [
+        "01:00:00:00", "01:00:00:10", "01:01:00:00",
+    ]
+    timeline = DropFrameTimeline(0)
+    timeline.start = 107892
+    assert ShotlistCreator.marker_timecodes(timeline, [0, 1799, 1800]) == [
+        "01:00:00;00", "01:00:59;29", "01:01:00;02",
+    ]
@@ -0,0 +1,75 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import zipfile
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIELDS = ["Frame", "Name", "Color", "Note", "Still/Thumbnail"]
+SMALL, LARGE = 300, 2000
+
+
+def write_workbook(path, rows, constant_memory):
+    """Write rows with distinct in-memory thumbnails; returns the peak RSS in MB."""
+    import resource
+
+    from PIL import Image
+
+    import ShotlistCreator
+
+    buffer = io.BytesIO()
+    Image.effect_noise((160, 90), 64).convert("RGB").save(buffer, "PNG")
+    image_data = buffer.getvalue()
+    writer = ShotlistCreator.ShotlistWorkbookWriter(path, FIELDS, constant_memory)
+    for row in range(rows):
+        data_row = {"Frame": row * 10, "Name": f"M{row}", "Color": "Red", "Note": "note " * 20}
+        # Trailing bytes make every thumbnail a distinct buffer, as real stills are
+        thumbnail = {
+            "name": f"thumb{row + 1:05d}.png", "data": image_data + row.to_bytes(4, "big"), "path": None,
+            "width": 160, "height": 90,
+        }
+        writer.write_row(data_row, thumbnail)
+    writer.close()
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def peak_rss(path, rows, constant_memory):
+    result = subprocess.run(
+        [
+            sys.executable, os.path.join(TESTS_DIR, "test_workbook_writer.py"),
+            json.dumps([str(path), rows, constant_memory]),
+        ],
+        env=dict(os.environ, PYTHONPATH=os.path.dirname(TESTS_DIR)), capture_output=True, text=True, timeout=600,
+    )
+    assert result.returncode == 0, result.stderr
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="ru_maxrss is reported in kilobytes on Linux only")
+def test_constant_memory_peak_rss_is_flat(tmp_path):
+    small = peak_rss(tmp_path / "small.xlsx", SMALL, True)
+    large = peak_rss(tmp_path / "large.xlsx", LARGE, True)
+    # 1,700 more thumbnails of about 20 KB each would be some 35 MB if they were held
+    assert large - small < 10, (small, large)
+
+    with zipfile.ZipFile(tmp_path / "large.xlsx") as workbook:
+        names = workbook.namelist()
+        pictures = workbook.read("xl/drawings/drawing1.xml").count(b"<xdr:pic>")
+    assert pictures == LARGE
+    assert len([name for name in names if name.startswith("xl/media/")]) == LARGE
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="ru_maxrss is reported in kilobytes on Linux only")
+def test_in_memory_mode_grows_with_rows(tmp_path):
+    # The control for the test above: without constant_memory the buffers are kept until close
+    small = peak_rss(tmp_path / "small.xlsx", SMALL, False)
+    large = peak_rss(tmp_path / "large.xlsx", LARGE, False)
+    assert large - small > 40, (small, large)
+
+
+if __name__ == "__main__":
+    path, rows, constant_memory = json.loads(sys.argv[1])
+    print(write_workbook(path, rows, constant_memory))